@@ -10,6 +10,70 @@ class Settings:
     TRUST_SERVER_CERTIFICATE: str = os.getenv("TRUST_SERVER_CERTIFICATE", "yes")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "crm_accounting")  # основная БД
 
+    # Сервер БД: mssql (SQL Server) или sqlite (файл на основную БД и на каждого клиента — для локальных тестов)
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "mssql")
+    SQLITE_DATA_DIR: str = os.getenv("SQLITE_DATA_DIR", "data")
+
+    # Пул engine'ов клиентских БД
+    CLIENT_ENGINE_MAX_COUNT: int = int(os.getenv("CLIENT_ENGINE_MAX_COUNT", 64))  # максимум живых engine'ов
+    CLIENT_ENGINE_IDLE_TIMEOUT: int = int(os.getenv("CLIENT_ENGINE_IDLE_TIMEOUT", 900))  # сек. простоя до dispose()
+    CLIENT_POOL_SIZE: int = int(os.getenv("CLIENT_POOL_SIZE", 5))  # постоянных соединений на клиентскую БД
+    CLIENT_POOL_MAX_OVERFLOW: int = int(os.getenv("CLIENT_POOL_MAX_OVERFLOW", 5))
+
+    # Кэш клиентских организаций (client_id -> database_name, company_name, is_active)
+    TENANT_CACHE_TTL: int = int(os.getenv("TENANT_CACHE_TTL", 60))  # сек.
+    COMPANY_SETTINGS_CACHE_TTL: int = int(os.getenv("COMPANY_SETTINGS_CACHE_TTL", 600))  # сек., шапка портала
+    DASHBOARD_CACHE_TTL: int = int(os.getenv("DASHBOARD_CACHE_TTL", 30))  # сек., счётчики дашборда (0 — без кэша)
+
+    # Пул потоков для блокирующих запросов к БД из async-маршрутов
+    DB_THREAD_POOL_SIZE: int = int(os.getenv("DB_THREAD_POOL_SIZE", 40))
+
+    # Постраничный вывод списков портала (клиенты, отчёты, пользователи, справочник)
+    PORTAL_PAGE_SIZE: int = int(os.getenv("PORTAL_PAGE_SIZE", 50))
+    PORTAL_MAX_PAGE_SIZE: int = int(os.getenv("PORTAL_MAX_PAGE_SIZE", 200))
+
+    # Календарь отчётов: наибольшая длина выбранного периода, дней
+    CALENDAR_MAX_DAYS: int = int(os.getenv("CALENDAR_MAX_DAYS", 93))
+    # Производственный календарь (JSON, см. app/data/production_calendar.json); пусто — файл из поставки
+    PRODUCTION_CALENDAR_PATH: str = os.getenv("PRODUCTION_CALENDAR_PATH", "")
+
+    # Общий бюджет соединений к SQL Server (основная БД + все клиентские)
+    DB_MAX_CONNECTIONS: int = int(os.getenv("DB_MAX_CONNECTIONS", 200))
+    DB_CONNECTION_WAIT_TIMEOUT: int = int(os.getenv("DB_CONNECTION_WAIT_TIMEOUT", 30))  # сек. ожидания слота
+    DB_POOL_COLD_AFTER: int = int(os.getenv("DB_POOL_COLD_AFTER", 300))  # сек. без обращений -> пул «холодный»
+
+    # Фоновое создание клиентских БД
+    PROVISIONING_WORKERS: int = int(os.getenv("PROVISIONING_WORKERS", 2))
+    PROVISIONING_POLL_INTERVAL: int = int(os.getenv("PROVISIONING_POLL_INTERVAL", 2))  # сек.
+    PROVISIONING_MAX_ATTEMPTS: int = int(os.getenv("PROVISIONING_MAX_ATTEMPTS", 5))
+    PROVISIONING_RETRY_DELAY: int = int(os.getenv("PROVISIONING_RETRY_DELAY", 10))  # сек., удваивается с каждой попыткой
+    PROVISIONING_JOB_TIMEOUT: int = int(os.getenv("PROVISIONING_JOB_TIMEOUT", 600))  # сек., после — задание считается зависшим
+
+    # Проверять штамп схемы всех клиентских БД при старте
+    VERIFY_TENANT_SCHEMAS_ON_STARTUP: bool = os.getenv("VERIFY_TENANT_SCHEMAS_ON_STARTUP", "no").lower() in ("1", "true", "yes")
+
+    # Запас заранее созданных пустых клиентских БД (0 — не использовать)
+    SPARE_DATABASE_POOL_SIZE: int = int(os.getenv("SPARE_DATABASE_POOL_SIZE", 2))
+
+    # Ночной пересчёт счётчиков дашборда всех клиентских БД (час по локальному времени, -1 — выключен)
+    DASHBOARD_RECONCILE_HOUR: int = int(os.getenv("DASHBOARD_RECONCILE_HOUR", 3))
+
+    # Ночное проставление статуса «просрочен» (час по локальному времени, -1 — выключено)
+    OVERDUE_SWEEP_HOUR: int = int(os.getenv("OVERDUE_SWEEP_HOUR", 1))
+    OVERDUE_SWEEP_WORKERS: int = int(os.getenv("OVERDUE_SWEEP_WORKERS", 4))  # клиентских БД одновременно
+
+    # Запросы админки по всем клиентским БД
+    ANALYTICS_FANOUT_WORKERS: int = int(os.getenv("ANALYTICS_FANOUT_WORKERS", 16))  # клиентских БД одновременно
+    ANALYTICS_TENANT_TIMEOUT: float = float(os.getenv("ANALYTICS_TENANT_TIMEOUT", 10))  # сек. на запрос к одной БД
+
+    # Импорт клиентов из CSV/XLSX
+    CLIENT_IMPORT_BATCH_SIZE: int = int(os.getenv("CLIENT_IMPORT_BATCH_SIZE", 1000))  # строк в одной вставке (не больше 2000)
+    CLIENT_IMPORT_MAX_ERRORS: int = int(os.getenv("CLIENT_IMPORT_MAX_ERRORS", 100))  # сколько ошибочных строк перечислять в ответе
+
+    # Пул проверки паролей (bcrypt)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))  # сверх этого — отказ 503
+
     # Секреты / JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
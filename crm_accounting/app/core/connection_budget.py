@@ -0,0 +1,198 @@
+# app/core/connection_budget.py
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAIN_POOL_NAME = "main"
+
+
+class _PoolState:
+    """
+    Счётчики одного пула (одного engine): открытые физические соединения, выданные сессиям и ожидающие слота.
+    """
+
+    __slots__ = ("name", "engine", "open", "in_use", "waiting", "last_used", "retired")
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.last_used = time.monotonic()
+        self.retired = False  # engine закрыт (unregister)
+
+
+class ConnectionBudget:
+    """
+    Общий лимит открытых соединений к SQL Server для всех пулов приложения
+    (основная БД + все engine'ы клиентских БД).
+
+    Каждое новое физическое соединение занимает слот бюджета (событие do_connect),
+    закрытие соединения слот освобождает (события close / close_detached).
+    Если бюджет исчерпан:
+      1) у «холодных» клиентов (без выданных соединений дольше cold_after секунд) закрываются
+         простаивающие соединения в пулах;
+      2) если слотов всё равно нет — запрос ждёт освобождения не дольше wait_timeout секунд,
+         после чего поднимается sqlalchemy.exc.TimeoutError (как при исчерпании обычного пула).
+    """
+
+    def __init__(self, max_connections: int, wait_timeout: float, cold_after: float):
+        self.max_connections = max(1, int(max_connections))
+        self.wait_timeout = float(wait_timeout)
+        self.cold_after = float(cold_after)
+        self._pools: dict[str, _PoolState] = {}
+        self._open_total = 0
+        self._cond = threading.Condition()
+
+    # ---------- регистрация пулов ----------
+
+    def register(self, name: str, engine: Engine) -> Engine:
+        """
+        Подключает engine к общему бюджету. Возвращает тот же engine.
+        Обработчики привязаны к счётчикам именно этого engine, а не к имени БД: после вытеснения
+        и пересоздания engine той же БД соединения старого engine не трогают счётчики нового.
+        """
+        state = _PoolState(name, engine)
+        with self._cond:
+            self._pools[name] = state
+
+        @event.listens_for(engine, "do_connect")
+        def _do_connect(dialect, conn_rec, cargs, cparams):
+            self.acquire(state)
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception:
+                self.release(state)
+                raise
+
+        @event.listens_for(engine, "close")
+        def _close(dbapi_connection, connection_record):
+            self.release(state)
+
+        @event.listens_for(engine, "close_detached")
+        def _close_detached(dbapi_connection):
+            self.release(state)
+
+        @event.listens_for(engine, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._cond:
+                state.in_use += 1
+                state.last_used = time.monotonic()
+
+        @event.listens_for(engine, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            with self._cond:
+                if state.in_use > 0:
+                    state.in_use -= 1
+                    state.last_used = time.monotonic()
+                retired = state.retired
+            if retired and connection_record is not None:
+                # соединение вернулось в пул уже закрытого engine'а — оттуда его никто не возьмёт
+                # и не закроет; закрываем сразу, чтобы освободить слот бюджета (событие close)
+                connection_record.invalidate()
+
+        return engine
+
+    def unregister(self, name: str) -> None:
+        """
+        Убирает пул из учёта (после dispose() engine'а).
+        Соединения, закрытые позже, вернут слоты в общий счётчик и изменят только счётчики своего (убранного) пула.
+        """
+        with self._cond:
+            state = self._pools.pop(name, None)
+            if state is not None:
+                state.retired = True
+
+    # ---------- слоты ----------
+
+    def acquire(self, state: _PoolState) -> None:
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            exhausted = self._open_total >= self.max_connections
+        if exhausted:
+            self.shrink_cold_pools(exclude=state.name)
+
+        with self._cond:
+            state.waiting += 1
+            try:
+                while self._open_total >= self.max_connections:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.warning(
+                            f"Бюджет соединений исчерпан ({self._open_total}/{self.max_connections}), "
+                            f"пул {state.name} не дождался слота за {self.wait_timeout} сек."
+                        )
+                        raise PoolTimeoutError(
+                            f"Connection budget of {self.max_connections} exhausted, "
+                            f"timed out after {self.wait_timeout} seconds"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                state.waiting -= 1
+
+            self._open_total += 1
+            state.open += 1
+            state.last_used = time.monotonic()
+
+    def release(self, state: _PoolState) -> None:
+        with self._cond:
+            if self._open_total > 0:
+                self._open_total -= 1
+            if state.open > 0:
+                state.open -= 1
+            self._cond.notify()
+
+    # ---------- сжатие холодных пулов ----------
+
+    def shrink_cold_pools(self, exclude: str | None = None) -> int:
+        """
+        Закрывает простаивающие соединения у пулов, которые не выдавали соединений дольше cold_after секунд
+        и в которых сейчас нет занятых соединений. Возвращает количество сжатых пулов.
+        """
+        now = time.monotonic()
+        with self._cond:
+            cold = [
+                (state.last_used, name, state.engine)
+                for name, state in self._pools.items()
+                if name not in (exclude, MAIN_POOL_NAME)
+                and state.open > 0
+                and state.in_use == 0
+                and now - state.last_used >= self.cold_after
+            ]
+        cold.sort()
+
+        for _, name, engine in cold:
+            # dispose() закрывает соединения, лежащие в пуле, и создаёт пустой пул — engine остаётся рабочим
+            engine.dispose()
+            logger.info(f"Пул {name} сжат: простаивающие соединения закрыты")
+        return len(cold)
+
+    # ---------- статистика ----------
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_connections": self.max_connections,
+                "open_total": self._open_total,
+                "pools": {
+                    name: {"open": s.open, "in_use": s.in_use, "waiting": s.waiting}
+                    for name, s in self._pools.items()
+                },
+            }
+
+
+# singleton
+connection_budget = ConnectionBudget(
+    max_connections=settings.DB_MAX_CONNECTIONS,
+    wait_timeout=settings.DB_CONNECTION_WAIT_TIMEOUT,
+    cold_after=settings.DB_POOL_COLD_AFTER,
+)
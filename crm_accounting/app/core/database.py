@@ -1,10 +1,11 @@
 # app/core/database.py
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import inspect
 from sqlalchemy.orm import sessionmaker, declarative_base
-from urllib.parse import quote_plus
 import logging
 
 from app.core.config import settings
+from app.core.connection_budget import connection_budget, MAIN_POOL_NAME
+from app.core.db_backend import db_backend
 
 logger = logging.getLogger(__name__)
 
@@ -12,33 +13,14 @@ logger = logging.getLogger(__name__)
 Base = declarative_base()
 
 
-# ---------- helpers ----------
-
-def _build_main_mssql_url() -> str:
-    """
-    Формирует URL для SQLAlchemy с Windows Authentication:
-    mssql+pyodbc://@SERVER/DATABASE?driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes&TrustServerCertificate=yes
-    """
-    server = settings.DB_SERVER
-    database = settings.DATABASE_NAME
-    driver = quote_plus(settings.DB_DRIVER)
-    trust = "yes" if str(settings.TRUST_SERVER_CERTIFICATE).lower() in ("1", "true", "yes") else "no"
-
-    return (
-        f"mssql+pyodbc://@{server}/{database}"
-        f"?driver={driver}&trusted_connection=yes&TrustServerCertificate={trust}"
-    )
-
-
 # ---------- engine / session ----------
 
-MAIN_DB_URL = _build_main_mssql_url()
-_main_engine = create_engine(
+MAIN_DB_URL = db_backend.main_url()
+_main_engine = db_backend.create_engine(
     MAIN_DB_URL,
     pool_pre_ping=True,
-    future=True,
-    fast_executemany=True
 )
+connection_budget.register(MAIN_POOL_NAME, _main_engine)
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -62,10 +44,19 @@ def get_main_db():
 
 def check_and_create_tables(base_metadata=None):
     """
-    Проверяет и создаёт таблицы основной БД, если они отсутствуют.
+    Проверяет и создаёт таблицы основной БД, если они отсутствуют,
+    и индексы, добавленные в модели после создания таблиц (create_all их к существующим таблицам не добавляет).
     """
     if base_metadata is None:
         base_metadata = Base.metadata
-    insp = inspect(_main_engine)
     base_metadata.create_all(_main_engine, checkfirst=True)
+    with _main_engine.begin() as conn:
+        existing = {}
+        for table in base_metadata.sorted_tables:
+            for index in table.indexes:
+                if table.name not in existing:
+                    existing[table.name] = {i["name"] for i in inspect(conn).get_indexes(table.name)}
+                if index.name not in existing[table.name]:
+                    index.create(conn)
+                    logger.info(f"Создан индекс {index.name} основной БД")
     logger.info("Проверка/создание таблиц основной БД завершена")
@@ -0,0 +1,223 @@
+# app/core/db_backend.py
+import logging
+import os
+import re
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from urllib.parse import quote_plus
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_DB_NAME_RE = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+def _check_database_name(database_name: str) -> str:
+    # имя БД подставляется в CREATE DATABASE / путь к файлу — только буквы, цифры и "_"
+    if not _DB_NAME_RE.match(database_name or ""):
+        raise ValueError(f"Недопустимое имя БД: {database_name!r}")
+    return database_name
+
+
+class DatabaseBackend(ABC):
+    """
+    Сервер БД, на котором живут основная и клиентские базы: URL подключения,
+    параметры engine'ов и создание новых клиентских БД.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def main_url(self) -> str:
+        ...
+
+    @abstractmethod
+    def client_url(self, database_name: str) -> str:
+        ...
+
+    def engine_options(self) -> dict:
+        """Дополнительные параметры create_engine, специфичные для драйвера."""
+        return {}
+
+    def configure_engine(self, engine: Engine) -> None:
+        """Настройка только что созданного engine (обработчики событий и т.п.)."""
+
+    @contextmanager
+    def query_timeout(self, connection, seconds: float):
+        """
+        Ограничение времени запросов на соединении SQLAlchemy в пределах блока with
+        (после блока соединение возвращается в пул без ограничения).
+        """
+        yield connection
+
+    def create_engine(self, url: str, **kwargs) -> Engine:
+        engine = create_engine(url, future=True, **{**self.engine_options(), **kwargs})
+        self.configure_engine(engine)
+        return engine
+
+    @abstractmethod
+    def database_exists(self, database_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def create_database(self, database_name: str) -> bool:
+        """Создаёт БД, если её нет. Возвращает True, если БД была создана."""
+
+
+class MSSQLBackend(DatabaseBackend):
+    """
+    SQL Server с Windows Authentication (pyodbc).
+    """
+
+    name = "mssql"
+
+    @staticmethod
+    def _trust() -> str:
+        return "yes" if str(settings.TRUST_SERVER_CERTIFICATE).lower() in ("1", "true", "yes") else "no"
+
+    def _url(self, database_name: str) -> str:
+        """
+        mssql+pyodbc://@SERVER/DATABASE?driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes&TrustServerCertificate=yes
+        """
+        driver = quote_plus(settings.DB_DRIVER)
+        return (
+            f"mssql+pyodbc://@{settings.DB_SERVER}/{database_name}"
+            f"?driver={driver}&trusted_connection=yes&TrustServerCertificate={self._trust()}"
+        )
+
+    def main_url(self) -> str:
+        return self._url(settings.DATABASE_NAME)
+
+    def client_url(self, database_name: str) -> str:
+        return self._url(database_name)
+
+    def engine_options(self) -> dict:
+        return {"fast_executemany": True}
+
+    @contextmanager
+    def query_timeout(self, connection, seconds: float):
+        # pyodbc: Connection.timeout — таймаут запроса в секундах (0 — без ограничения)
+        dbapi_connection = connection.connection.dbapi_connection
+        dbapi_connection.timeout = max(1, int(seconds))
+        try:
+            yield connection
+        finally:
+            dbapi_connection.timeout = 0
+
+    def _master_conn(self):
+        """
+        Прямое подключение pyodbc к master, чтобы выполнить CREATE DATABASE.
+        """
+        import pyodbc
+
+        conn_str = (
+            f"DRIVER={{{settings.DB_DRIVER}}};"
+            f"SERVER={settings.DB_SERVER};"
+            f"DATABASE=master;"
+            f"Trusted_Connection=Yes;"
+            f"TrustServerCertificate={'Yes' if self._trust() == 'yes' else 'No'};"
+        )
+        return pyodbc.connect(conn_str, autocommit=True)
+
+    def database_exists(self, database_name: str) -> bool:
+        with self._master_conn() as conn:
+            row = conn.cursor().execute("SELECT DB_ID(?)", database_name).fetchone()
+            return bool(row and row[0] is not None)
+
+    def create_database(self, database_name: str) -> bool:
+        _check_database_name(database_name)
+        with self._master_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT DB_ID(?)", database_name)
+            row = cur.fetchone()
+            if row and row[0] is not None:
+                return False
+            cur.execute(f"CREATE DATABASE [{database_name}]")
+            return True
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    Файловые БД SQLite: основная — {SQLITE_DATA_DIR}/{DATABASE_NAME}.db,
+    клиентские — {SQLITE_DATA_DIR}/tenants/{database_name}.db.
+    Нужен для локального запуска и нагрузочных тестов без SQL Server.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, data_dir: str):
+        self.data_dir = os.path.abspath(data_dir)
+        self.tenants_dir = os.path.join(self.data_dir, "tenants")
+
+    def _main_path(self) -> str:
+        return os.path.join(self.data_dir, f"{_check_database_name(settings.DATABASE_NAME)}.db")
+
+    def _client_path(self, database_name: str) -> str:
+        return os.path.join(self.tenants_dir, f"{_check_database_name(database_name)}.db")
+
+    def main_url(self) -> str:
+        os.makedirs(self.data_dir, exist_ok=True)
+        return f"sqlite:///{self._main_path()}"
+
+    def client_url(self, database_name: str) -> str:
+        return f"sqlite:///{self._client_path(database_name)}"
+
+    def engine_options(self) -> dict:
+        # соединения пула используются из разных потоков (run_db, воркеры);
+        # timeout — сколько ждать снятия блокировки записи другим соединением
+        return {"connect_args": {"check_same_thread": False, "timeout": 30}}
+
+    def configure_engine(self, engine: Engine) -> None:
+        @event.listens_for(engine, "connect")
+        def _set_pragmas(dbapi_connection, connection_record):
+            cur = dbapi_connection.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA foreign_keys=ON")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.close()
+
+    @contextmanager
+    def query_timeout(self, connection, seconds: float):
+        # sqlite3 прерывает запрос (OperationalError: interrupted), если обработчик вернул не 0
+        dbapi_connection = connection.connection.dbapi_connection
+        deadline = time.monotonic() + seconds
+        dbapi_connection.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        try:
+            yield connection
+        finally:
+            dbapi_connection.set_progress_handler(None, 0)
+
+    def database_exists(self, database_name: str) -> bool:
+        return os.path.exists(self._client_path(database_name))
+
+    def create_database(self, database_name: str) -> bool:
+        path = self._client_path(database_name)
+        if os.path.exists(path):
+            return False
+        os.makedirs(self.tenants_dir, exist_ok=True)
+        # WAL сохраняется в файле БД: читатели не блокируются писателем
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        return True
+
+
+def _build_backend() -> DatabaseBackend:
+    name = settings.DB_BACKEND.lower()
+    if name == "mssql":
+        return MSSQLBackend()
+    if name == "sqlite":
+        return SQLiteBackend(settings.SQLITE_DATA_DIR)
+    raise ValueError(f"Неизвестный DB_BACKEND: {settings.DB_BACKEND!r} (допустимо: mssql, sqlite)")
+
+
+# singleton
+db_backend = _build_backend()
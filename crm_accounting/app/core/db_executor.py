@@ -0,0 +1,36 @@
+# app/core/db_executor.py
+import functools
+from typing import Any, Callable, TypeVar
+
+import anyio
+from anyio import to_thread
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_limiter: anyio.CapacityLimiter | None = None
+
+
+def _get_limiter() -> anyio.CapacityLimiter:
+    # CapacityLimiter привязан к event loop, поэтому создаётся при первом вызове из async-кода
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(settings.DB_THREAD_POOL_SIZE)
+    return _limiter
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Выполняет блокирующую работу с БД (SQLAlchemy + pyodbc) в отдельном пуле потоков,
+    чтобы не останавливать event loop. Размер пула — settings.DB_THREAD_POOL_SIZE.
+    """
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_get_limiter())
+
+
+def db_pool_stats() -> dict:
+    """Занятые и свободные потоки пула БД (для мониторинга)."""
+    if _limiter is None:
+        return {"total": settings.DB_THREAD_POOL_SIZE, "borrowed": 0, "waiting": 0}
+    stats = _limiter.statistics()
+    return {"total": stats.total_tokens, "borrowed": stats.borrowed_tokens, "waiting": stats.tasks_waiting}
@@ -1,8 +1,13 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
+import asyncio
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +26,88 @@ def get_password_hash(password: str) -> str:
         password = password_bytes.decode('utf-8', 'ignore')
     return pwd_context.hash(password)
 
+class PasswordHashQueueFull(Exception):
+    """Очередь проверки паролей переполнена — запрос нужно отклонить сразу."""
+
+
+class PasswordHasherPool:
+    """
+    Отдельный ограниченный пул потоков для bcrypt (bcrypt отпускает GIL, поэтому потоки работают параллельно).
+    Одновременно выполняется не больше workers операций, ещё max_queue ждут в очереди;
+    при переполнении очереди поднимается PasswordHashQueueFull, а не копится бесконечный хвост запросов.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self._workers = max(1, int(workers))
+        self._max_pending = self._workers + max(0, int(max_queue))
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1000)  # последние времена выполнения, сек.
+
+    def _timed(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._latencies.append(elapsed)
+                self._completed += 1
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._rejected += 1
+                raise PasswordHashQueueFull()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+            completed, rejected = self._completed, self._rejected
+
+        def percentile(q: float):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+
+        return {
+            "workers": self._workers,
+            "in_progress": min(pending, self._workers),
+            "queue_depth": max(0, pending - self._workers),
+            "queue_limit": self._max_pending - self._workers,
+            "completed": completed,
+            "rejected": rejected,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)},
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# singleton
+password_hasher = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -5,7 +5,15 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 
-from app.core.database import _main_engine, check_and_create_tables, get_main_db
+from app.core.config import settings
+from app.core.database import _main_engine, check_and_create_tables, get_main_db, SessionLocal
+from app.core.security import password_hasher
+from app.managers.client_db_manager import client_db_manager
+from app.models.main_db import ClientOrganization
+from app.services.dashboard_rollup import dashboard_reconciler
+from app.services.overdue_sweeper import overdue_sweeper
+from app.services.client_index import client_index_relay
+from app.services.provisioning_service import provisioning_workers
 from app.routes import (
     auth,
     admin,
@@ -71,6 +79,27 @@ app.include_router(client_organizations.router, tags=["client_organizations"])
 # ------------------------------------------------------------
 # События старта и завершения
 # ------------------------------------------------------------
+def verify_tenant_schemas():
+    """
+    Сверяет штамп схемы каждой клиентской БД с текущими моделями и пишет в лог устаревшие.
+    """
+    try:
+        with SessionLocal() as db:
+            names = [
+                row[0]
+                for row in db.query(ClientOrganization.database_name)
+                .filter(ClientOrganization.database_name.isnot(None))
+                .all()
+            ]
+        outdated = client_db_manager.find_outdated_schemas(names)
+        if outdated:
+            logger.warning(f"⚠️ Устаревшая схема в {len(outdated)} из {len(names)} клиентских БД: {', '.join(outdated[:20])}")
+        else:
+            logger.info(f"✅ Схема всех клиентских БД актуальна ({len(names)}).")
+    except Exception as e:
+        logger.error(f"Ошибка проверки схем клиентских БД: {e}")
+
+
 @app.on_event("startup")
 def startup_event():
     """
@@ -83,9 +112,24 @@ def startup_event():
     except Exception as e:
         logger.error(f"Ошибка при инициализации БД: {e}")
 
+    if settings.VERIFY_TENANT_SCHEMAS_ON_STARTUP:
+        verify_tenant_schemas()
+
+    provisioning_workers.start()
+    dashboard_reconciler.start()
+    overdue_sweeper.start()
+    client_index_relay.start()
+
 
 @app.on_event("shutdown")
 def shutdown_event():
+    provisioning_workers.stop()
+    dashboard_reconciler.stop()
+    overdue_sweeper.stop()
+    client_index_relay.stop()
+    password_hasher.shutdown()
+    client_db_manager.dispose_all()
+    _main_engine.dispose()
     logger.info("🛑 Завершение работы приложения.")
 
 
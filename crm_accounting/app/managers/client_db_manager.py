@@ -1,13 +1,18 @@
 # app/managers/client_db_manager.py
 import logging
-from urllib.parse import quote_plus
+import uuid
+from datetime import datetime
 
-import pyodbc
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.connection_budget import connection_budget
+from app.core.db_backend import db_backend
+from app.managers.engine_registry import EngineRegistry
 from app.models.client_template import ClientBase  # metadata клиентской БД
+from app.models.main_db import SpareDatabase
 # Важно: чтобы metadata знала все модели:
 from app.models.client_template import (  # noqa: F401
     ClientUser,
@@ -21,39 +26,24 @@ from app.models.client_template import (  # noqa: F401
     ClientReportHistory,
     CalendarHandbook,
     CalendarEvent,
+    ClientSchemaVersion,
+    ClientSchemaMigration,
+    ClientIndexOutbox,
+    CLIENT_SCHEMA_HASH,
 )
+from app.migrations import MIGRATIONS
 
 logger = logging.getLogger(__name__)
 
 
-def _build_client_url(database_name: str) -> str:
-    """
-    SQLAlchemy URL для клиентской БД с Windows Auth.
-    """
-    server = settings.DB_SERVER
-    driver = quote_plus(settings.DB_DRIVER)
-    trust = "yes" if str(settings.TRUST_SERVER_CERTIFICATE).lower() in ("1", "true", "yes") else "no"
-    return (
-        f"mssql+pyodbc://@{server}/{database_name}"
-        f"?driver={driver}&trusted_connection=yes&TrustServerCertificate={trust}"
-    )
-
-
-def _pyodbc_master_conn():
-    """
-    Прямое подключение pyodbc к master с Windows Auth, чтобы выполнить CREATE DATABASE (если нужно).
-    """
-    driver = settings.DB_DRIVER
-    server = settings.DB_SERVER
-    trust = "yes" if str(settings.TRUST_SERVER_CERTIFICATE).lower() in ("1", "true", "yes") else "no"
-    conn_str = (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server};"
-        f"DATABASE=master;"
-        f"Trusted_Connection=Yes;"
-        f"TrustServerCertificate={'Yes' if trust=='yes' else 'No'};"
+def _create_client_engine(database_name: str):
+    engine = db_backend.create_engine(
+        db_backend.client_url(database_name),
+        pool_pre_ping=True,
+        pool_size=settings.CLIENT_POOL_SIZE,
+        max_overflow=settings.CLIENT_POOL_MAX_OVERFLOW,
     )
-    return pyodbc.connect(conn_str, autocommit=True)
+    return connection_budget.register(database_name, engine)
 
 
 class ClientDBManager:
@@ -61,6 +51,15 @@ class ClientDBManager:
     Управление клиентскими БД: создание, подключение, сессии.
     """
 
+    def __init__(self):
+        # один engine (пул соединений) на клиентскую БД, переиспользуется между запросами
+        self._engines = EngineRegistry(
+            _create_client_engine,
+            max_engines=settings.CLIENT_ENGINE_MAX_COUNT,
+            idle_timeout=settings.CLIENT_ENGINE_IDLE_TIMEOUT,
+            on_dispose=connection_budget.unregister,
+        )
+
     def create_client_database(self, client_org, database_name: str | None = None) -> str:
         """
         Создаёт БД клиента, если её нет, и накатывает структуру таблиц из ClientBase.metadata.
@@ -69,29 +68,15 @@ class ClientDBManager:
         db_name = database_name or (client_org.database_name or f"client_{client_org.id}")
         logger.info(f"Проверка/создание клиентской БД: {db_name}")
 
-        # 1) CREATE DATABASE [db_name] IF NOT EXISTS (через pyodbc в master)
-        with _pyodbc_master_conn() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT DB_ID(?)", db_name)
-            row = cur.fetchone()
-            if row and row[0] is not None:
-                logger.info(f"БД {db_name} уже существует")
-            else:
-                logger.info(f"Создаю БД {db_name}")
-                cur.execute(f"CREATE DATABASE [{db_name}]")
-                logger.info(f"БД {db_name} создана")
+        # 1) CREATE DATABASE [db_name] IF NOT EXISTS (SQL Server) / файл БД (SQLite)
+        created = self._ensure_database(db_name)
 
         # 2) Создание таблиц клиентской схемы
-        url = _build_client_url(db_name)
-        engine = create_engine(url, pool_pre_ping=True, future=True, fast_executemany=True)
-        ClientBase.metadata.create_all(bind=engine, checkfirst=True)
-        logger.info(f"Таблицы для БД {db_name} проверены/созданы")
+        self._ensure_schema(db_name, fresh=created)
 
         # 3) Опционально: начальные данные (например, CompanySettings по умолчанию)
-        SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
-        with SessionLocal() as s:
+        with self.get_client_session(db_name) as s:
             # если нет settings – создадим пустую запись
-            from sqlalchemy import select
             if s.execute(select(CompanySettings).limit(1)).first() is None:
                 s.add(CompanySettings(company_name=client_org.company_name or f"Клиент {client_org.id}"))
             # базовые справочники периодов – по желанию (оставлю пустым)
@@ -99,14 +84,186 @@ class ClientDBManager:
 
         return db_name
 
+    def _ensure_database(self, db_name: str) -> bool:
+        """Создаёт БД, если её нет. Возвращает True, если БД была создана."""
+        if not db_backend.create_database(db_name):
+            logger.info(f"БД {db_name} уже существует")
+            return False
+        logger.info(f"БД {db_name} создана")
+        return True
+
+    def _ensure_schema(self, db_name: str, fresh: bool = False) -> None:
+        """
+        Приводит таблицы БД к ClientBase.metadata. Если штамп schema_version совпадает
+        с CLIENT_SCHEMA_HASH — ограничивается одним запросом, без проверки каждой таблицы.
+        """
+        if not fresh and self.read_schema_hash(db_name) == CLIENT_SCHEMA_HASH:
+            logger.info(f"Схема БД {db_name} актуальна")
+            return
+        self.migrate_database(db_name, fresh=fresh)
+
+    def migrate_database(self, db_name: str, fresh: bool = False) -> list[int]:
+        """
+        Создаёт недостающие таблицы, применяет невыполненные миграции и обновляет штамп схемы.
+        Для только что созданной БД (fresh) миграции не выполняются, а отмечаются как применённые:
+        её таблицы уже соответствуют текущим моделям. Возвращает номера применённых миграций.
+        """
+        engine = self.get_engine(db_name)
+        ClientBase.metadata.create_all(bind=engine, checkfirst=True)
+        applied = self.apply_migrations(db_name, baseline=fresh)
+        with self.get_client_session(db_name) as s:
+            s.query(ClientSchemaVersion).delete()
+            s.add(ClientSchemaVersion(schema_hash=CLIENT_SCHEMA_HASH))
+            s.commit()
+        logger.info(f"Таблицы для БД {db_name} проверены/созданы")
+        return applied
+
+    def apply_migrations(self, db_name: str, baseline: bool = False) -> list[int]:
+        """
+        Применяет миграции, которых ещё нет в schema_migrations, каждую в своей транзакции.
+        При ошибке уже применённые миграции остаются отмеченными — повторный запуск продолжит с упавшей.
+        """
+        engine = self.get_engine(db_name)
+        with engine.connect() as conn:
+            done = set(conn.execute(select(ClientSchemaMigration.version)).scalars())
+
+        applied = []
+        for m in MIGRATIONS:
+            if m.version in done:
+                continue
+            with engine.begin() as conn:
+                if not baseline:
+                    m.upgrade(conn)
+                conn.execute(insert(ClientSchemaMigration).values(version=m.version, name=m.name))
+            applied.append(m.version)
+            if not baseline:
+                logger.info(f"БД {db_name}: применена миграция {m.version} {m.name}")
+        return applied
+
+    def pending_migrations(self, db_name: str) -> list[int]:
+        try:
+            with self.get_engine(db_name).connect() as conn:
+                done = set(conn.execute(select(ClientSchemaMigration.version)).scalars())
+        except DBAPIError:
+            done = set()
+        return [m.version for m in MIGRATIONS if m.version not in done]
+
+    def read_schema_hash(self, db_name: str) -> str | None:
+        """
+        Штамп версии схемы клиентской БД или None, если таблицы schema_version ещё нет.
+        """
+        try:
+            with self.get_engine(db_name).connect() as conn:
+                return conn.execute(select(ClientSchemaVersion.schema_hash).limit(1)).scalar()
+        except DBAPIError:
+            return None
+
+    def is_schema_current(self, db_name: str) -> bool:
+        return self.read_schema_hash(db_name) == CLIENT_SCHEMA_HASH
+
+    def find_outdated_schemas(self, database_names: list[str]) -> list[str]:
+        """
+        Возвращает БД, чей штамп схемы не совпадает с текущими моделями (по одному запросу на БД).
+        """
+        outdated = []
+        for name in database_names:
+            try:
+                if not self.is_schema_current(name):
+                    outdated.append(name)
+            except Exception as e:
+                logger.error(f"Не удалось проверить схему БД {name}: {e}")
+                outdated.append(name)
+        return outdated
+
+    # ---------- запас заранее созданных БД ----------
+
+    def create_spare_database(self) -> str:
+        """
+        Создаёт пустую БД со всей клиентской схемой, ещё не привязанную к организации.
+        """
+        db_name = f"client_spare_{uuid.uuid4().hex[:12]}"
+        self._ensure_database(db_name)
+        self._ensure_schema(db_name, fresh=True)
+        # до выдачи организации к запасной БД никто не обращается — пул соединений ей не нужен
+        self.dispose_engine(db_name)
+        return db_name
+
+    def refill_spare_pool(self, db: Session, limit: int | None = None) -> int:
+        """
+        Досоздаёт запасные БД до settings.SPARE_DATABASE_POOL_SIZE (не больше limit за вызов).
+        Возвращает количество созданных.
+        """
+        target = settings.SPARE_DATABASE_POOL_SIZE
+        available = (
+            db.query(func.count(SpareDatabase.id))
+            .filter(SpareDatabase.status == "available")
+            .scalar()
+        ) or 0
+        missing = max(0, target - available)
+        if limit is not None:
+            missing = min(missing, limit)
+
+        for _ in range(missing):
+            name = self.create_spare_database()
+            db.add(SpareDatabase(database_name=name, status="available"))
+            db.commit()
+            logger.info(f"Запасная клиентская БД {name} готова")
+        return missing
+
+    def claim_spare_database(self, db: Session, client_organization_id: int) -> str | None:
+        """
+        Закрепляет за организацией одну из запасных БД. Коммит — на стороне вызывающего,
+        чтобы закрепление и запись ClientOrganization.database_name прошли в одной транзакции.
+        Возвращает имя БД или None, если запас пуст.
+        """
+        candidates = (
+            db.query(SpareDatabase.id, SpareDatabase.database_name)
+            .filter(SpareDatabase.status == "available")
+            .order_by(SpareDatabase.id)
+            .limit(5)
+            .all()
+        )
+        for spare_id, name in candidates:
+            claimed = db.execute(
+                update(SpareDatabase)
+                .where(SpareDatabase.id == spare_id, SpareDatabase.status == "available")
+                .values(status="claimed", client_organization_id=client_organization_id, claimed_at=datetime.utcnow())
+            ).rowcount
+            if claimed == 1:
+                logger.info(f"Организации {client_organization_id} выдана запасная БД {name}")
+                return name
+        return None
+
+    def spare_pool_stats(self, db: Session) -> dict:
+        rows = db.query(SpareDatabase.status, func.count(SpareDatabase.id)).group_by(SpareDatabase.status).all()
+        counts = {status: count for status, count in rows}
+        return {
+            "target": settings.SPARE_DATABASE_POOL_SIZE,
+            "available": counts.get("available", 0),
+            "claimed": counts.get("claimed", 0),
+        }
+
     # ---------- вспомогательные методы ----------
 
     def get_engine(self, database_name: str):
-        return create_engine(_build_client_url(database_name), pool_pre_ping=True, future=True, fast_executemany=True)
+        return self._engines.get_engine(database_name)
 
     def get_client_session(self, database_name: str):
-        engine = self.get_engine(database_name)
-        return sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)()
+        return self._engines.get_session_factory(database_name)()
+
+    def has_engine(self, database_name: str) -> bool:
+        """Открыт ли уже engine (пул соединений) этой БД."""
+        return database_name in self._engines
+
+    def dispose_engine(self, database_name: str) -> None:
+        self._engines.dispose(database_name)
+
+    def dispose_all(self) -> None:
+        self._engines.dispose_all()
+
+    def connection_stats(self) -> dict:
+        """Открытые/занятые/ожидающие соединения по каждому пулу и в сумме."""
+        return connection_budget.stats()
 
 # singleton
 client_db_manager = ClientDBManager()
@@ -0,0 +1,125 @@
+# app/managers/engine_registry.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class _EngineEntry:
+    """
+    Запись реестра: engine клиентской БД, его sessionmaker и время последнего обращения.
+    """
+
+    __slots__ = ("engine", "session_factory", "last_used")
+
+    def __init__(self, database_name: str, engine: Engine):
+        self.engine = engine
+        # имя БД в session.info — по нему обработчики событий сессии узнают, какую клиентскую БД она меняет
+        self.session_factory = sessionmaker(
+            bind=engine, autocommit=False, autoflush=False, future=True, info={"database_name": database_name}
+        )
+        self.last_used = time.monotonic()
+
+
+class EngineRegistry:
+    """
+    Реестр engine'ов клиентских БД: один engine (и один пул соединений) на database_name.
+
+    - engine создаётся при первом обращении и переиспользуется всеми запросами;
+    - при превышении max_engines вытесняется давно не использованный engine (LRU) с dispose();
+    - engine'ы, простаивающие дольше idle_timeout секунд, закрываются при очередном обращении к реестру.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Engine],
+        max_engines: int,
+        idle_timeout: float,
+        on_dispose: Callable[[str], None] | None = None,
+    ):
+        self._factory = factory
+        self._on_dispose = on_dispose
+        self._max_engines = max(1, int(max_engines))
+        self._idle_timeout = float(idle_timeout)
+        self._entries: "OrderedDict[str, _EngineEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ---------- доступ ----------
+
+    def _entry(self, database_name: str) -> _EngineEntry:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(database_name)
+            if entry is None:
+                logger.info(f"Создаю engine для клиентской БД {database_name}")
+                entry = _EngineEntry(database_name, self._factory(database_name))
+                self._entries[database_name] = entry
+                self._evict_overflow()
+            else:
+                self._entries.move_to_end(database_name)
+            entry.last_used = now
+            return entry
+
+    def get_engine(self, database_name: str) -> Engine:
+        return self._entry(database_name).engine
+
+    def get_session_factory(self, database_name: str) -> sessionmaker:
+        return self._entry(database_name).session_factory
+
+    # ---------- вытеснение ----------
+
+    def _evict_idle(self, now: float) -> None:
+        if self._idle_timeout <= 0:
+            return
+        # OrderedDict упорядочен по давности использования — простаивающие всегда в начале
+        while self._entries:
+            name, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self._idle_timeout:
+                break
+            self._dispose(name)
+
+    def _evict_overflow(self) -> None:
+        while len(self._entries) > self._max_engines:
+            name = next(iter(self._entries))
+            self._dispose(name)
+
+    def _dispose(self, database_name: str) -> None:
+        entry = self._entries.pop(database_name, None)
+        if entry is None:
+            return
+        try:
+            entry.engine.dispose()
+            logger.info(f"Engine клиентской БД {database_name} закрыт")
+        except Exception as e:
+            logger.error(f"Ошибка закрытия engine для БД {database_name}: {e}")
+        if self._on_dispose is not None:
+            self._on_dispose(database_name)
+
+    def dispose(self, database_name: str) -> None:
+        """Закрывает engine конкретной БД (например, после её удаления/переименования)."""
+        with self._lock:
+            self._dispose(database_name)
+
+    def dispose_all(self) -> None:
+        """Закрывает все engine'ы (при завершении приложения)."""
+        with self._lock:
+            for name in list(self._entries):
+                self._dispose(name)
+
+    def sweep(self) -> None:
+        """Принудительно закрывает простаивающие engine'ы."""
+        with self._lock:
+            self._evict_idle(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, database_name: str) -> bool:
+        return database_name in self._entries
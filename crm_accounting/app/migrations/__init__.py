@@ -0,0 +1,42 @@
+# app/migrations/__init__.py
+"""
+Версионные миграции клиентских БД (client_{id}).
+
+Каждая миграция — функция upgrade(conn), выполняемая в отдельной транзакции вместе с записью
+в таблицу schema_migrations клиентской БД. Миграции регистрируются в app/migrations/versions.py
+декоратором @migration(version, name) и должны быть идемпотентными: у старых БД часть изменений
+может уже быть применена через create_all.
+
+Новые БД создаются сразу по текущим моделям, поэтому все миграции отмечаются в них как применённые.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy.engine import Connection
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Регистрирует функцию upgrade(conn) как миграцию с указанным номером."""
+
+    def decorator(func: Callable[[Connection], None]):
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Миграция {version} уже зарегистрирована")
+        MIGRATIONS.append(Migration(version=version, name=name, upgrade=func))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+
+    return decorator
+
+
+# регистрация миграций
+from app.migrations import versions  # noqa: E402,F401
@@ -0,0 +1,37 @@
+# app/migrations/__main__.py
+"""
+Применение миграций ко всем клиентским БД.
+
+    python -m app.migrations                   # все БД, 8 воркеров
+    python -m app.migrations --workers 32
+    python -m app.migrations --database client_5 --database client_7
+    python -m app.migrations --dry-run         # только показать невыполненные миграции
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.migrations.runner import MigrationRunner, discover_tenant_databases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8, help="сколько БД мигрировать одновременно")
+    parser.add_argument("--database", action="append", help="мигрировать только указанные БД")
+    parser.add_argument("--no-spares", action="store_true", help="не трогать запасные БД")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--progress-every", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+
+    names = args.database or discover_tenant_databases(include_spares=not args.no_spares)
+    progress = MigrationRunner(workers=args.workers, progress_every=args.progress_every).run(names, dry_run=args.dry_run)
+
+    print(json.dumps({**progress.summary(), "failed_databases": progress.failed}, ensure_ascii=False, indent=2))
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
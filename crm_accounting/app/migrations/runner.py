@@ -0,0 +1,139 @@
+# app/migrations/runner.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from app.core.database import SessionLocal
+from app.managers.client_db_manager import client_db_manager
+from app.models.main_db import ClientOrganization, SpareDatabase
+
+logger = logging.getLogger(__name__)
+
+
+def discover_tenant_databases(include_spares: bool = True) -> list[str]:
+    """
+    Имена всех клиентских БД: из ClientOrganization.database_name и (опционально) свободные запасные БД.
+    """
+    with SessionLocal() as db:
+        names = [
+            row[0]
+            for row in db.query(ClientOrganization.database_name)
+            .filter(ClientOrganization.database_name.isnot(None))
+            .order_by(ClientOrganization.id)
+            .all()
+        ]
+        if include_spares:
+            names += [
+                row[0]
+                for row in db.query(SpareDatabase.database_name)
+                .filter(SpareDatabase.status == "available")
+                .order_by(SpareDatabase.id)
+                .all()
+            ]
+    # сохраняем порядок, убираем дубли
+    return list(dict.fromkeys(names))
+
+
+@dataclass
+class MigrationProgress:
+    total: int
+    migrated: int = 0
+    up_to_date: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+    durations: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def finished(self) -> int:
+        return self.migrated + self.up_to_date + len(self.failed)
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        rate = self.finished / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.finished
+        return {
+            "total": self.total,
+            "finished": self.finished,
+            "migrated": self.migrated,
+            "up_to_date": self.up_to_date,
+            "failed": len(self.failed),
+            "elapsed_sec": round(elapsed, 1),
+            "tenants_per_sec": round(rate, 2),
+            "eta_sec": round(remaining / rate, 1) if rate > 0 else None,
+        }
+
+
+class MigrationRunner:
+    """
+    Параллельное применение миграций ко всем клиентским БД.
+
+    - не больше workers БД обрабатываются одновременно;
+    - каждая миграция каждой БД фиксируется в её schema_migrations, поэтому после сбоя
+      повторный запуск продолжит с того места, где остановился (актуальные БД проверяются одним запросом);
+    - ошибка в одной БД не останавливает остальные, список упавших — в progress.failed.
+    """
+
+    def __init__(self, workers: int = 8, progress_every: int = 50, on_progress=None):
+        self.workers = max(1, int(workers))
+        self.progress_every = max(1, int(progress_every))
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+
+    def _migrate_one(self, db_name: str, dry_run: bool) -> list[int]:
+        if dry_run:
+            return client_db_manager.pending_migrations(db_name)
+        if not client_db_manager.pending_migrations(db_name) and client_db_manager.is_schema_current(db_name):
+            return []
+        applied = client_db_manager.migrate_database(db_name)
+        # после миграции БД может долго не понадобиться — не держим её пул соединений
+        client_db_manager.dispose_engine(db_name)
+        return applied
+
+    def run(self, database_names: list[str] | None = None, dry_run: bool = False) -> MigrationProgress:
+        if database_names is None:
+            database_names = discover_tenant_databases()
+        progress = MigrationProgress(total=len(database_names))
+        logger.info(f"Миграция {progress.total} клиентских БД, воркеров: {self.workers}{' (dry run)' if dry_run else ''}")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="migrate") as pool:
+            futures = {}
+            for name in database_names:
+                futures[pool.submit(self._timed, self._migrate_one, name, dry_run)] = name
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    applied, elapsed = future.result()
+                except Exception as e:
+                    with self._lock:
+                        progress.failed[name] = str(e)
+                    logger.error(f"Миграция БД {name} не удалась: {e}")
+                else:
+                    with self._lock:
+                        progress.durations[name] = elapsed
+                        if applied:
+                            progress.migrated += 1
+                        else:
+                            progress.up_to_date += 1
+                    if applied:
+                        verb = "ожидают" if dry_run else "применены"
+                        logger.info(f"БД {name}: миграции {applied} {verb} ({elapsed:.2f} сек.)")
+
+                if progress.finished % self.progress_every == 0 or progress.finished == progress.total:
+                    summary = progress.summary()
+                    logger.info(
+                        f"Прогресс миграции: {summary['finished']}/{summary['total']}, "
+                        f"ошибок {summary['failed']}, {summary['tenants_per_sec']} БД/сек, ETA {summary['eta_sec']} сек."
+                    )
+                    if self.on_progress:
+                        self.on_progress(summary)
+
+        return progress
+
+    @staticmethod
+    def _timed(func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - started
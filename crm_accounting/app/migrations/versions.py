@@ -0,0 +1,57 @@
+# app/migrations/versions.py
+"""
+Миграции клиентских БД. Номер версии — возрастающее целое, уже выпущенные миграции не меняются.
+
+Пример:
+
+    @migration(5, "add_reports_status")
+    def _0005(conn):
+        conn.execute(text("ALTER TABLE reports ADD ..."))
+"""
+from sqlalchemy import text  # noqa: F401
+
+from app.migrations import migration
+from app.models.client_template import (
+    CalendarEvent,
+    Client,
+    ClientIndexOutbox,
+    ClientUser,
+    ClientUserClientAccess,
+    DigitalSignature,
+    Report,
+)
+
+
+def _create_indexes(conn, table, names: set[str]) -> None:
+    """Создаёт описанные в модели индексы таблицы, которых ещё нет в БД (create_all их к существующим таблицам не добавляет)."""
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+
+@migration(1, "backfill_dashboard_counters")
+def _0001(conn):
+    # таблицу dashboard_counters создаёт create_all; здесь — первичный расчёт счётчиков
+    from app.services.dashboard_rollup import DashboardRollup, count_dashboard_metrics
+
+    DashboardRollup.store(conn, count_dashboard_metrics(conn))
+
+
+@migration(2, "clients_search_indexes")
+def _0002(conn):
+    _create_indexes(conn, Client.__table__, {f"ix_clients_{c}" for c in ("short_name", "inn", "kpp", "ogrn", "created_at")})
+
+
+@migration(3, "hot_path_indexes")
+def _0003(conn):
+    _create_indexes(conn, Report.__table__, {"ix_reports_status", "ix_reports_client_status", "ix_reports_client_period"})
+    _create_indexes(conn, CalendarEvent.__table__, {"ix_calendar_events_date", "ix_calendar_events_client_date"})
+    _create_indexes(conn, DigitalSignature.__table__, {"ix_digital_signatures_end_date", "ix_digital_signatures_client_end_date"})
+    _create_indexes(conn, ClientUser.__table__, {"ix_client_users_login", "ix_client_users_email"})
+    _create_indexes(conn, ClientUserClientAccess.__table__, {"ix_client_user_client_access_user_client"})
+
+
+@migration(4, "client_index_outbox")
+def _0004(conn):
+    # outbox пишется при каждом изменении Client — таблица нужна до первой записи
+    ClientIndexOutbox.__table__.create(conn, checkfirst=True)
@@ -1,7 +1,8 @@
 # app/models/client_template.py
+import hashlib
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+    Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 )
 from sqlalchemy.orm import relationship, declarative_base
 
@@ -17,8 +18,8 @@ class ClientUser(ClientBase):
     id = Column(Integer, primary_key=True, index=True)
     main_user_id = Column(Integer, nullable=True)
     full_name = Column(String(255), nullable=False)
-    email = Column(String(255), nullable=False)
-    login = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False, index=True)
+    login = Column(String(255), nullable=False, index=True)
     profile_name = Column(String(255), nullable=True)
     hashed_password = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
@@ -38,16 +39,16 @@ class Client(ClientBase):
     __tablename__ = "clients"
 
     id = Column(Integer, primary_key=True, index=True)
-    short_name = Column(String(255), nullable=True)
+    short_name = Column(String(255), nullable=True, index=True)  # сортировка списка клиентов
     full_name = Column(String(255), nullable=True)
-    inn = Column(String(64), nullable=True)
-    kpp = Column(String(64), nullable=True)
-    ogrn = Column(String(64), nullable=True)
+    inn = Column(String(64), nullable=True, index=True)  # поиск по префиксу ИНН/КПП/ОГРН
+    kpp = Column(String(64), nullable=True, index=True)
+    ogrn = Column(String(64), nullable=True, index=True)
     address = Column(String(512), nullable=True)
     email = Column(String(255), nullable=True)
     phone = Column(String(64), nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
@@ -71,6 +72,11 @@ class ClientUserClientAccess(ClientBase):
     user = relationship("ClientUser", back_populates="accesses")
     client = relationship("Client")
 
+    __table_args__ = (
+        # права пользователя на конкретного клиента
+        Index("ix_client_user_client_access_user_client", "user_id", "client_id"),
+    )
+
     def __repr__(self):
         return f"<ClientUserClientAccess(user_id={self.user_id}, client_id={self.client_id}, can_view_calendar={self.can_view_calendar})>"
 
@@ -93,6 +99,13 @@ class DigitalSignature(ClientBase):
 
     client = relationship("Client")
 
+    __table_args__ = (
+        # «истекают в ближайшие N дней» по всем клиентам; client_id в INCLUDE — без обращения к таблице
+        Index("ix_digital_signatures_end_date", "end_date", mssql_include=["client_id", "is_active"]),
+        # ЭЦП клиентов страницы списка (client_id IN (...)) и карточки клиента
+        Index("ix_digital_signatures_client_end_date", "client_id", "end_date"),
+    )
+
     def __repr__(self):
         return f"<DigitalSignature(id={self.id}, owner='{self.owner_name}', end_date={self.end_date})>"
 
@@ -172,6 +185,14 @@ class Report(ClientBase):
     client = relationship("Client")
     report_period = relationship("ReportPeriod")
 
+    __table_args__ = (
+        # счётчики дашборда и выборки по статусу (просроченные, в работе)
+        Index("ix_reports_status", "status", mssql_include=["client_id", "period_id"]),
+        # отчёты клиента с фильтром по статусу, календарь (клиент × период)
+        Index("ix_reports_client_status", "client_id", "status"),
+        Index("ix_reports_client_period", "client_id", "period_id"),
+    )
+
     def __repr__(self):
         return f"<Report(id={self.id}, client_id={self.client_id}, status='{self.status}')>"
 
@@ -231,6 +252,12 @@ class CalendarEvent(ClientBase):
     client = relationship("Client")
     handbook = relationship("CalendarHandbook")
 
+    __table_args__ = (
+        # события за окно дат (месяц/неделя) — по всем клиентам и по одному клиенту
+        Index("ix_calendar_events_date", "date", mssql_include=["client_id", "handbook_id"]),
+        Index("ix_calendar_events_client_date", "client_id", "date"),
+    )
+
     def __repr__(self):
         return f"<CalendarEvent(id={self.id}, title='{self.title}', date={self.date})>"
 
@@ -239,3 +266,94 @@ class CalendarEvent(ClientBase):
 # 12️⃣ Совместимость: Organization
 # ===========================================================
 Organization = Client
+
+
+# ===========================================================
+# 13️⃣ Версия схемы клиентской БД и применённые миграции
+# ===========================================================
+class ClientSchemaVersion(ClientBase):
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    schema_hash = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ClientSchemaVersion(schema_hash='{self.schema_hash}', applied_at={self.applied_at})>"
+
+
+class ClientSchemaMigration(ClientBase):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ClientSchemaMigration(version={self.version}, name='{self.name}')>"
+
+
+# ===========================================================
+# 14️⃣ Счётчики дашборда (одна строка, id = 1)
+# ===========================================================
+class DashboardCounters(ClientBase):
+    """
+    Счётчики дашборда. Поддерживаются инкрементально обработчиками ORM-событий
+    (app/services/dashboard_rollup.py); оконные счётчики («за неделю», «истекают за 30 дней»,
+    «в этом месяце») пересчитываются целиком раз в сутки (reconciled_at).
+    """
+    __tablename__ = "dashboard_counters"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    clients_count = Column(Integer, nullable=False, default=0)
+    new_clients_count = Column(Integer, nullable=False, default=0)
+    reports_count = Column(Integer, nullable=False, default=0)
+    overdue_reports = Column(Integer, nullable=False, default=0)
+    active_reports = Column(Integer, nullable=False, default=0)
+    expiring_signatures_count = Column(Integer, nullable=False, default=0)
+    calendar_events = Column(Integer, nullable=False, default=0)
+    reconciled_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DashboardCounters(clients={self.clients_count}, reports={self.reports_count}, reconciled_at={self.reconciled_at})>"
+
+
+# ===========================================================
+# 15️⃣ Outbox изменений клиентов для global_client_index основной БД
+# ===========================================================
+class ClientIndexOutbox(ClientBase):
+    """
+    Запись «клиент client_id изменён» в той же транзакции, что и изменение Client
+    (app/services/client_index.py). Обработанные записи удаляются.
+    """
+    __tablename__ = "client_index_outbox"
+
+    id = Column(Integer, primary_key=True)
+    client_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ClientIndexOutbox(id={self.id}, client_id={self.client_id})>"
+
+
+def _schema_fingerprint(metadata) -> str:
+    """
+    Хэш структуры клиентской схемы: таблицы, колонки (тип, nullable, PK, FK) и индексы.
+    Любое изменение моделей в этом файле меняет хэш.
+    """
+    parts = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            fks = ",".join(sorted(fk.target_fullname for fk in column.foreign_keys))
+            parts.append(
+                f"  column {column.name} {column.type} nullable={column.nullable} pk={column.primary_key} fk={fks}"
+            )
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            columns = ",".join(str(getattr(c, "name", c)) for c in index.expressions)
+            parts.append(f"  index {index.name} ({columns}) unique={index.unique}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+# вычисляется один раз при импорте; сравнивается со штампом в таблице schema_version каждой клиентской БД
+CLIENT_SCHEMA_HASH = _schema_fingerprint(ClientBase.metadata)
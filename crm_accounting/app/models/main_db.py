@@ -1,5 +1,5 @@
 # app/models/main_db.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -72,9 +72,9 @@ class ClientUser(Base):
     __tablename__ = "client_users"
     
     id = Column(Integer, primary_key=True, index=True)
-    client_organization_id = Column(Integer, ForeignKey('client_organizations.id'), nullable=False)
+    client_organization_id = Column(Integer, ForeignKey('client_organizations.id'), nullable=False, index=True)
     email = Column(String(255), nullable=False)
-    login = Column(String(100), nullable=False)
+    login = Column(String(100), nullable=False, index=True)  # вход клиента (UserService.get_client_user_for_login)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=False)
     phone = Column(String(50), nullable=True)
@@ -101,4 +101,75 @@ class ClientUser(Base):
             "is_active": self.is_active,
             "database_name": self.client_organization.database_name if self.client_organization else None,
             "created_at": self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+
+class ProvisioningJob(Base):
+    """
+    Задание на создание клиентской БД (CREATE DATABASE + таблицы + начальные данные + зеркалирование пользователей).
+    Выполняется фоновыми воркерами, состояние хранится в основной БД.
+    """
+    __tablename__ = "provisioning_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_organization_id = Column(Integer, ForeignKey('client_organizations.id'), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending / running / done / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow)  # не раньше этого времени (backoff повторов)
+    locked_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "client_organization_id": self.client_organization_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class SpareDatabase(Base):
+    """
+    Заранее созданная пустая клиентская БД со всей схемой. При регистрации организация получает
+    одну из них (через ClientOrganization.database_name) вместо CREATE DATABASE.
+    """
+    __tablename__ = "spare_databases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    database_name = Column(String(100), unique=True, nullable=False)
+    status = Column(String(20), nullable=False, default="available", index=True)  # available / claimed
+    client_organization_id = Column(Integer, ForeignKey('client_organizations.id'), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+
+
+class GlobalClientIndex(Base):
+    """
+    Копия реквизитов клиентов всех клиентских БД для поиска из админки («в какой организации
+    клиент с этим ИНН») без подключения к каждой БД. Обновляется из outbox клиентских БД
+    (app/services/client_index.py), полностью перестраивается командой python -m app.services.client_index.
+    """
+    __tablename__ = "global_client_index"
+
+    id = Column(Integer, primary_key=True)
+    client_organization_id = Column(Integer, ForeignKey('client_organizations.id'), nullable=False)
+    client_id = Column(Integer, nullable=False)  # Client.id в клиентской БД
+    inn = Column(String(64), nullable=True, index=True)
+    kpp = Column(String(64), nullable=True, index=True)
+    ogrn = Column(String(64), nullable=True, index=True)
+    short_name = Column(String(255), nullable=True, index=True)
+    full_name = Column(String(255), nullable=True)
+    is_active = Column(Boolean, nullable=True)
+    indexed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("client_organization_id", "client_id", name="uq_global_client_index_org_client"),
+    )
@@ -1,13 +1,24 @@
 # app/routes/admin.py
-from fastapi import APIRouter, Depends, HTTPException, Body
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+import json
 import logging
+import time
 
 from app.core.database import get_main_db
+from app.core.db_executor import run_db, db_pool_stats
+from app.core.security import password_hasher, PasswordHashQueueFull
 from app.models.main_db import ClientOrganization
 from app.managers.client_db_manager import client_db_manager
 from app.services.user_service import UserService
+from app.services.dashboard_rollup import dashboard_reconciler
+from app.services.overdue_sweeper import overdue_sweeper
+from app.services.client_index import ClientIndexService, client_index_relay
+from app.services.tenant_fanout import ANALYTICS_QUERIES, tenant_fanout
+from app.services.provisioning_service import ProvisioningService, provisioning_workers
+from app.utils.dashboard_cache import dashboard_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -23,7 +34,8 @@ async def create_client_organization(
 ):
     """
     Регистрация клиента через JSON-запрос от фронтенда (index.html).
-    Создаёт клиентскую организацию и БД client_{id}, а также пользователя-владельца.
+    Создаёт клиентскую организацию и пользователя-владельца, а создание БД client_{id}
+    ставит в очередь. Ход создания — по status_url из ответа.
     """
     try:
         # 1️⃣ Извлекаем данные из JSON
@@ -42,40 +54,56 @@ async def create_client_organization(
         if not email:
             raise HTTPException(status_code=400, detail="Не указан email пользователя.")
 
-        # 2️⃣ Создаём клиента (автоматически создаёт БД client_{id})
-        client_org = UserService.create_client_organization(
+        # bcrypt — в пуле password_hasher и до создания организации: при переполнении очереди ничего не создаём
+        hashed_password = await password_hasher.hash(password)
+
+        # 2️⃣ Создаём клиента и ставим в очередь создание БД client_{id}
+        client_org, job = await run_db(
+            UserService.create_client_organization,
             db=db,
             company_name=company_name,
             notes=notes
         )
 
-        # 3️⃣ Создаём пользователя-владельца (основная БД + клиентская)
-        UserService.create_client_user(
+        # значения читаем сразу: после следующего commit объекты будут expired
+        client_id, job_id = client_org.id, job.id
+
+        # 3️⃣ Создаём пользователя-владельца (в клиентскую БД он попадёт при её создании)
+        await run_db(
+            UserService.create_client_user,
             db=db,
-            client_organization_id=client_org.id,
+            client_organization_id=client_id,
             email=email,
             login=login,
-            password=password,
+            hashed_password=hashed_password,
             full_name=contact_person or login,
             phone=phone
         )
+        provisioning_workers.notify()
 
-        logger.info(f"✅ Клиент зарегистрирован: {company_name} (DB: {client_org.database_name})")
+        logger.info(f"✅ Клиент зарегистрирован: {company_name} (задание на создание БД #{job_id})")
 
         return JSONResponse(
             {
                 "success": True,
-                "message": f"Клиент '{company_name}' успешно зарегистрирован.",
-                "client_id": client_org.id,
-                "database_name": client_org.database_name
+                "message": f"Клиент '{company_name}' успешно зарегистрирован. База данных создаётся.",
+                "client_id": client_id,
+                "job_id": job_id,
+                "status_url": ProvisioningService.status_url(job_id),
             },
-            status_code=201
+            status_code=202
         )
 
     except HTTPException:
         raise
+    except PasswordHashQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер перегружен, повторите регистрацию через несколько секунд",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
-        db.rollback()
+        await run_db(db.rollback)
         logger.error(f"Ошибка регистрации клиента: {e}")
         raise HTTPException(status_code=500, detail=f"Ошибка регистрации клиента: {e}")
 
@@ -90,16 +118,12 @@ async def create_database_for_client(client_id: int, db: Session = Depends(get_m
     """
     logger.info(f"Создание БД для клиентской организации {client_id}")
 
-    client = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
+    client = await run_db(lambda: db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first())
     if not client:
         raise HTTPException(status_code=404, detail="Клиент не найден")
 
     try:
-        desired_name = client.database_name or f"client_{client.id}"
-        created_name = client_db_manager.create_client_database(client, database_name=desired_name)
-
-        client.database_name = created_name
-        db.commit()
+        created_name = await run_db(UserService.provision_client_database, db, client_id)
 
         logger.info(f"✅ Клиентская БД '{created_name}' успешно создана.")
         return JSONResponse(
@@ -111,6 +135,117 @@ async def create_database_for_client(client_id: int, db: Session = Depends(get_m
         )
 
     except Exception as e:
-        db.rollback()
+        await run_db(db.rollback)
         logger.error(f"Ошибка создания БД для клиента: {e}")
         raise HTTPException(status_code=500, detail=f"Ошибка создания БД: {e}")
+
+
+# ------------------------------------------------------
+# 3️⃣ Статус задания на создание БД
+# ------------------------------------------------------
+@router.get("/provisioning/{job_id}")
+async def provisioning_status(job_id: int, db: Session = Depends(get_main_db)):
+    """
+    Состояние задания на создание клиентской БД: pending / running / done / failed.
+    """
+    job = await run_db(ProvisioningService.get_job, db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задание не найдено")
+    return JSONResponse(job.to_dict())
+
+
+# ------------------------------------------------------
+# 4️⃣ Состояние пулов соединений
+# ------------------------------------------------------
+@router.get("/connections")
+async def connection_stats():
+    """
+    Текущая загрузка общего бюджета соединений: открытые, занятые и ожидающие соединения по каждому пулу.
+    """
+    stats = client_db_manager.connection_stats()
+    stats["db_threads"] = db_pool_stats()
+    return JSONResponse(stats)
+
+
+# ------------------------------------------------------
+# 5️⃣ Метрики
+# ------------------------------------------------------
+@router.get("/metrics")
+async def metrics(db: Session = Depends(get_main_db)):
+    """
+    Метрики внутренних пулов и кэшей приложения.
+    """
+    provisioning = provisioning_workers.stats()
+    provisioning["jobs"] = await run_db(ProvisioningService.status_counts, db)
+    provisioning["spare_databases"] = await run_db(client_db_manager.spare_pool_stats, db)
+    return JSONResponse(
+        {
+            "password_hashing": password_hasher.stats(),
+            "provisioning": provisioning,
+            "dashboard_cache": dashboard_cache.stats(),
+            "dashboard_reconcile": dashboard_reconciler.stats(),
+            "overdue_sweep": overdue_sweeper.stats(),
+            "client_index": client_index_relay.stats(),
+        }
+    )
+
+
+# ------------------------------------------------------
+# 6️⃣ Проставление просрочки вручную
+# ------------------------------------------------------
+@router.post("/overdue-sweep")
+async def run_overdue_sweep():
+    """
+    Внеочередной проход OverdueSweeper по всем клиентским БД: сколько отчётов стали просроченными
+    и сколько занял каждый клиент.
+    """
+    return JSONResponse(await run_db(overdue_sweeper.run_once))
+
+
+# ------------------------------------------------------
+# 7️⃣ Запросы по всем клиентским БД
+# ------------------------------------------------------
+@router.get("/analytics/{query_name}")
+async def tenant_analytics(
+    query_name: str,
+    days: int = Query(30, ge=0, le=366),
+    db: Session = Depends(get_main_db),
+):
+    """
+    Запрос query_name (см. ANALYTICS_QUERIES) по всем активным клиентским БД.
+    Ответ — NDJSON: строка на каждую БД по мере готовности, последней — сводка.
+    """
+    builder = ANALYTICS_QUERIES.get(query_name)
+    if builder is None:
+        raise HTTPException(status_code=404, detail=f"Неизвестный запрос: {query_name}")
+    statement = builder(days)
+    targets = await run_db(tenant_fanout.active_tenants, db)
+
+    def lines():
+        started = time.monotonic()
+        summary = {"databases": len(targets), "rows": 0, "failed": 0, "timed_out": 0}
+        for result in tenant_fanout.stream(statement, targets):
+            summary["rows"] += len(result.rows)
+            summary["failed"] += result.error is not None
+            summary["timed_out"] += result.timed_out
+            yield json.dumps(jsonable_encoder(result.to_dict()), ensure_ascii=False) + "\n"
+        summary["duration_sec"] = round(time.monotonic() - started, 2)
+        yield json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# ------------------------------------------------------
+# 8️⃣ Поиск клиента по всем организациям
+# ------------------------------------------------------
+@router.get("/clients/search")
+async def search_clients(
+    q: str = Query(..., min_length=2, max_length=255),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_main_db),
+):
+    """
+    Поиск по global_client_index: ИНН/КПП/ОГРН (префикс) или наименование клиента.
+    Отвечает, в какой организации (клиентской БД) обслуживается клиент.
+    """
+    return JSONResponse(jsonable_encoder(await run_db(ClientIndexService.search, db, q, limit)))
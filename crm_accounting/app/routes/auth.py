@@ -5,7 +5,10 @@ from sqlalchemy.orm import Session
 import logging
 
 from app.core.database import get_main_db
+from app.core.db_executor import run_db
+from app.core.security import password_hasher, PasswordHashQueueFull
 from app.services.user_service import UserService
+from app.services.provisioning_service import ProvisioningService, provisioning_workers
 from app.utils import templates
 
 logger = logging.getLogger(__name__)
@@ -90,34 +93,51 @@ async def register_submit(
     """
     Обработка отправки формы регистрации:
     1) создаёт клиента в основной БД,
-    2) автоматически создаёт клиентскую БД client_{id},
-    3) создаёт пользователя-владельца (в основной и клиентской БД),
+    2) ставит в очередь создание клиентской БД client_{id},
+    3) создаёт пользователя-владельца (в клиентскую БД он попадёт при её создании),
     4) редиректит на /login.
     """
     try:
-        # 1) Создаём клиентскую организацию (автосоздание БД внутри)
-        client_org = UserService.create_client_organization(
+        # bcrypt — в пуле password_hasher и до создания организации: при переполнении очереди ничего не создаём
+        hashed_password = await password_hasher.hash(password)
+
+        # 1) Создаём клиентскую организацию (БД создаётся в фоне)
+        client_org, job = await run_db(
+            UserService.create_client_organization,
             db=db,
             company_name=company_name,
             notes=notes
         )
 
-        # 2) Создаём владельца (основная + зеркалирование в клиентскую БД)
-        UserService.create_client_user(
+        # значения читаем сразу: после следующего commit объекты будут expired
+        client_id, job_id = client_org.id, job.id
+
+        # 2) Создаём владельца (в клиентскую БД он попадёт при её создании)
+        await run_db(
+            UserService.create_client_user,
             db=db,
-            client_organization_id=client_org.id,
+            client_organization_id=client_id,
             email=email,
             login=login,
-            password=password,
+            hashed_password=hashed_password,
             full_name=contact_person or login,
             phone=phone
         )
+        provisioning_workers.notify()
 
-        logger.info(f"✅ Регистрация клиента завершена: {company_name} (DB={client_org.database_name})")
+        logger.info(f"✅ Регистрация клиента принята: {company_name} (задание на создание БД #{job_id})")
 
         # после регистрации — на страницу входа
-        return RedirectResponse(url="/login", status_code=303)
-
+        response = RedirectResponse(url="/login", status_code=303)
+        response.headers["X-Provisioning-Status-Url"] = ProvisioningService.status_url(job_id)
+        return response
+
+    except PasswordHashQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер перегружен, повторите регистрацию через несколько секунд",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         logger.error(f"Ошибка при регистрации клиента: {e}")
         # Показать ошибку на форме (если есть шаблон). Если нет — текст.
@@ -1,61 +1,143 @@
 # app/routes/calendar.py
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
 import logging
+from datetime import date, datetime, timedelta
 
-from app.core.database import get_main_db
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.db_executor import run_db
 from app.utils import templates
 from app.utils.client_utils import get_client_company_settings, get_today_date
-from app.models.main_db import ClientOrganization
+from app.utils.tenant_context import TenantContext, get_tenant_context
 from app.managers.client_db_manager import client_db_manager
-from app.models.client_template import CalendarHandbook, Client, Report, ReportPeriod
+from app.models.client_template import CalendarEvent, CalendarHandbook, Client, Report, ReportPeriod, ReportTemplate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+CALENDAR_STATUSES = ["не сдан", "в работе", "сдан", "не сдается"]
+
+
+class CalendarWindow:
+    """
+    Видимый период календаря (dependency): start_date/end_date из формы или, если их нет,
+    месяц (view=month) либо неделя (view=week), в которые попадает сегодняшний день.
+    Длина периода — не больше CALENDAR_MAX_DAYS.
+    """
+
+    def __init__(
+        self,
+        start_date: date | None = Query(None),
+        end_date: date | None = Query(None),
+        view: str = Query("month", pattern="^(month|week)$"),
+    ):
+        today = date.today()
+        if view == "week":
+            default_start = today - timedelta(days=today.weekday())
+            default_end = default_start + timedelta(days=6)
+        else:
+            default_start = today.replace(day=1)
+            default_end = (default_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+        self.view = view
+        self.selected = start_date is not None and end_date is not None
+        self.start = start_date or default_start
+        self.end = end_date or default_end
+        if self.end < self.start:
+            raise HTTPException(status_code=400, detail="Дата окончания периода раньше даты начала")
+        if (self.end - self.start).days + 1 > settings.CALENDAR_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"Период календаря — не больше {settings.CALENDAR_MAX_DAYS} дней")
+
+
+def _calendar_query(window: CalendarWindow):
+    """
+    События календаря за период одним запросом: клиент, название отчёта (из справочника
+    или заголовок события), отчётный период — последний закончившийся до срока, и статус
+    отчёта клиента за этот период по шаблону с тем же названием.
+    """
+    report_name = func.coalesce(CalendarHandbook.name, CalendarEvent.title)
+    period_id = (
+        select(ReportPeriod.id)
+        .where(ReportPeriod.end_date < CalendarEvent.date)
+        .order_by(ReportPeriod.end_date.desc())
+        .limit(1)
+        .correlate(CalendarEvent)
+        .scalar_subquery()
+    )
+    status = (
+        select(Report.status)
+        .join(ReportTemplate, ReportTemplate.id == Report.template_id)
+        .where(
+            Report.client_id == CalendarEvent.client_id,
+            Report.period_id == ReportPeriod.id,
+            ReportTemplate.name == report_name,
+        )
+        .order_by(Report.id.desc())
+        .limit(1)
+        .correlate(CalendarEvent, CalendarHandbook, ReportPeriod)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            CalendarEvent.id,
+            CalendarEvent.date,
+            CalendarEvent.client_id,
+            func.coalesce(Client.short_name, Client.full_name).label("client_name"),
+            report_name.label("report_name"),
+            ReportPeriod.name.label("period"),
+            status.label("status"),
+        )
+        .join(Client, Client.id == CalendarEvent.client_id)
+        .outerjoin(CalendarHandbook, CalendarHandbook.id == CalendarEvent.handbook_id)
+        .outerjoin(ReportPeriod, ReportPeriod.id == period_id)
+        .where(
+            CalendarEvent.date >= datetime.combine(window.start, datetime.min.time()),
+            CalendarEvent.date < datetime.combine(window.end + timedelta(days=1), datetime.min.time()),
+        )
+        .order_by(CalendarEvent.date, report_name, CalendarEvent.id)
+    )
+
+
+def _load_calendar(database_name: str, window: CalendarWindow) -> tuple[list[dict], list[dict]]:
+    """
+    Сетка календаря: колонки — (дата, отчёт, период), строки — клиенты, у которых есть события
+    в периоде. Ячейки строки — только существующие события ({номер колонки: событие}),
+    пустые ячейки дорисовывает шаблон: объём данных растёт с числом событий, а не «клиенты × колонки».
+    """
+    with client_db_manager.get_client_session(database_name) as session:
+        rows = session.execute(_calendar_query(window)).all()
+
+    columns: dict[tuple, int] = {}
+    clients: dict[int, dict] = {}
+    for row in rows:
+        key = (row.date.date(), row.report_name, row.period)
+        index = columns.setdefault(key, len(columns))
+        client_row = clients.setdefault(row.client_id, {"name": row.client_name or f"Клиент #{row.client_id}", "cells": {}})
+        client_row["cells"].setdefault(index, {"calendar_entry_id": row.id, "status": row.status})
+
+    date_columns = [{"due_date": d, "report_name": name, "period": period or "", "date_span": 0} for d, name, period in columns]
+    # colspan заголовка даты — у первой колонки каждой даты (колонки идут по дате)
+    first = None
+    for column in date_columns:
+        if first is None or first["due_date"] != column["due_date"]:
+            first = column
+        first["date_span"] += 1
+    clients_data = sorted(clients.values(), key=lambda c: c["name"].lower())
+    return date_columns, clients_data
+
 
 @router.get("/client/{client_id}/calendar", response_class=HTMLResponse)
 async def client_calendar_page(
     client_id: int,
     request: Request,
-    db: Session = Depends(get_main_db),
+    tenant: TenantContext = Depends(get_tenant_context),
+    window: CalendarWindow = Depends(),
 ):
-    org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
-    if not org or not org.database_name:
-        raise HTTPException(status_code=404, detail="База клиента не найдена")
-
-    session = client_db_manager.get_client_session(org.database_name)
-    try:
-        handbook = session.query(CalendarHandbook).all()
-        reports = {r.id: r for r in session.query(Report).all()}
-        try:
-            periods = {p.id: p for p in session.query(ReportPeriod).all()}
-        except Exception:
-            periods = {}
-        clients = {c.id: c for c in session.query(Client).all()}
-
-        events = []
-        for h in handbook:
-            due = None
-            for attr in ("due_date", "deadline_date", "next_due_date"):
-                if hasattr(h, attr):
-                    due = getattr(h, attr)
-                    break
-            events.append({
-                "id": h.id,
-                "client": clients.get(getattr(h, "client_id", None)),
-                "report": reports.get(getattr(h, "report_id", None)),
-                "period": periods.get(getattr(h, "period_id", None)),
-                "due_date": due,
-                "status": getattr(h, "status", None),
-                "comment": getattr(h, "comment", None),
-            })
-    finally:
-        session.close()
-
-    company_settings = get_client_company_settings(db, client_id)
-    client = {"id": client_id, "name": org.company_name or "Клиент"}
+    date_columns, clients_data = await run_db(_load_calendar, tenant.database_name, window)
+    company_settings = await run_db(get_client_company_settings, tenant)
+    client = {"id": client_id, "name": tenant.display_name}
 
     return templates.TemplateResponse(
         "client/calendar.html",
@@ -63,7 +145,14 @@ async def client_calendar_page(
             "request": request,
             "client_id": client_id,
             "client": client,                   # ✅
-            "events": events,
+            "date_columns": date_columns,
+            "clients_data": clients_data,
+            "allowed_statuses": CALENDAR_STATUSES,
+            "view": window.view,
+            "selected_start_date": window.start.isoformat() if window.selected else None,
+            "selected_end_date": window.end.isoformat() if window.selected else None,
+            "start_date_default": window.start.isoformat(),
+            "end_date_default": window.end.isoformat(),
             "company_settings": company_settings,
             "today": get_today_date(),
         },
@@ -1,22 +1,28 @@
 # app/routes/calendar_handbook.py
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 import logging
+from datetime import date
 
-from app.core.database import get_main_db
+from app.core.db_executor import run_db
 from app.utils import templates
 from app.utils.client_utils import get_client_company_settings
-from app.models.main_db import ClientOrganization
+from app.utils.tenant_context import TenantContext, get_tenant_context
 from app.managers.client_db_manager import client_db_manager
 from app.models.client_template import CalendarHandbook
+from app.services.calendar_service import CalendarService
+from app.utils.pagination import Page, PageParams, keyset_page
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _load_handbook(session):
-    return session.query(CalendarHandbook).order_by(CalendarHandbook.id.desc()).all()
+def _load_handbook(database_name: str, params: PageParams) -> Page:
+    session = client_db_manager.get_client_session(database_name)
+    try:
+        return keyset_page(session.query(CalendarHandbook), CalendarHandbook.id, params)
+    finally:
+        session.close()
 
 
 @router.get("/client/{client_id}/calendar_handbook", response_class=HTMLResponse)
@@ -24,20 +30,12 @@ def _load_handbook(session):
 async def calendar_handbook_page(
     client_id: int,
     request: Request,
-    db: Session = Depends(get_main_db),
+    tenant: TenantContext = Depends(get_tenant_context),
+    params: PageParams = Depends(),
 ):
-    org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
-    if not org or not org.database_name:
-        raise HTTPException(status_code=404, detail="База клиента не найдена")
-
-    session = client_db_manager.get_client_session(org.database_name)
-    try:
-        handbook = _load_handbook(session)
-    finally:
-        session.close()
-
-    company_settings = get_client_company_settings(db, client_id)
-    client = {"id": client_id, "name": org.company_name or "Клиент"}
+    page = await run_db(_load_handbook, tenant.database_name, params)
+    company_settings = await run_db(get_client_company_settings, tenant)
+    client = {"id": client_id, "name": tenant.display_name}
 
     return templates.TemplateResponse(
         "client/calendar_handbook.html",
@@ -45,7 +43,25 @@ async def calendar_handbook_page(
             "request": request,
             "client_id": client_id,
             "client": client,                   # ✅
-            "handbook": handbook,
+            "handbook": page.items,
+            "page": page.with_links(request),
             "company_settings": company_settings,
         },
     )
+
+
+@router.post("/client/{client_id}/calendar_handbook/fill")
+@router.post("/client/{client_id}/calendar-handbook/fill")  # алиас
+async def fill_calendar_from_handbook(
+    client_id: int,
+    year: int | None = Query(None, ge=2000, le=2100),
+    tenant: TenantContext = Depends(get_tenant_context),
+):
+    """Создаёт сроки по правилам справочника для всех активных клиентов на год (по умолчанию — текущий)."""
+    year = year or date.today().year
+    result = await run_db(CalendarService.generate_deadlines, tenant.database_name, date(year, 1, 1), date(year, 12, 31))
+    return JSONResponse({
+        "success": True,
+        "message": f"Календарь на {year} год: добавлено сроков — {result['created']}, уже были — {result['skipped']}",
+        **result,
+    })
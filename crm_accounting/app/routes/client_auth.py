@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_main_db
+from app.core.security import PasswordHashQueueFull
 from app.services.user_service import UserService
 from pydantic import BaseModel
 import logging
@@ -23,7 +24,7 @@ async def client_login(login_data: ClientLogin, db: Session = Depends(get_main_d
         logger.info(f"Попытка входа с логином: {login_data.login}")
         
         # Используем новый сервис аутентификации
-        user = UserService.authenticate_client_user(db, login_data.login, login_data.password)
+        user = await UserService.authenticate_client_user(db, login_data.login, login_data.password)
         
         if not user:
             logger.warning(f"Пользователь с логином '{login_data.login}' не найден или неверный пароль")
@@ -51,6 +52,12 @@ async def client_login(login_data: ClientLogin, db: Session = Depends(get_main_d
         
     except HTTPException:
         raise
+    except PasswordHashQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер перегружен, повторите вход через несколько секунд",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         logger.error(f"Ошибка входа клиента: {str(e)}")
         logger.error(traceback.format_exc())
@@ -1,40 +1,123 @@
 # app/routes/client_clients.py
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import HTMLResponse, StreamingResponse
+import json
 import logging
+from datetime import date, datetime, timedelta
 
-from app.core.database import get_main_db
+from sqlalchemy import or_
+
+from app.core.db_executor import run_db
 from app.utils import templates
 from app.utils.client_utils import get_client_company_settings
-from app.models.main_db import ClientOrganization
+from app.utils.tenant_context import TenantContext, get_tenant_context
 from app.managers.client_db_manager import client_db_manager
-from app.models.client_template import Client
+from app.models.client_template import Client, DigitalSignature
+from app.services.client_import import ClientImport
+from app.utils.pagination import Page, PageParams, keyset_page
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/client/{client_id}/clients", response_class=HTMLResponse)
-async def client_clients_page(
-    client_id: int,
-    request: Request,
-    db: Session = Depends(get_main_db),
-):
-    org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
-    if not org:
-        raise HTTPException(status_code=404, detail="Клиентская организация не найдена")
-    if not org.database_name:
-        raise HTTPException(status_code=404, detail="У клиента ещё нет базы данных")
+# сортировка только по индексированным колонкам
+SORT_COLUMNS = {
+    "id": Client.id,
+    "name": Client.short_name,
+    "inn": Client.inn,
+    "created_at": Client.created_at,
+}
+
 
-    session = client_db_manager.get_client_session(org.database_name)
+class ClientFilters:
+    """
+    Поиск и фильтры списка клиентов (dependency):
+    q — цифры ищутся как префикс ИНН/КПП/ОГРН, иначе — подстрока наименования;
+    active — 1/0; created_from/created_to — дата добавления; sort/order — сортировка.
+    """
+
+    def __init__(
+        self,
+        q: str | None = Query(None, max_length=255),
+        active: str | None = Query(None, pattern="^[01]?$"),
+        created_from: date | None = Query(None),
+        created_to: date | None = Query(None),
+        sort: str = Query("id", pattern="^(" + "|".join(SORT_COLUMNS) + ")$"),
+        order: str = Query("desc", pattern="^(asc|desc)$"),
+    ):
+        self.q = (q or "").strip()
+        self.active = active or None
+        self.created_from = created_from
+        self.created_to = created_to
+        self.sort = sort
+        self.order = order
+
+    def apply(self, query):
+        if self.q:
+            if self.q.isdigit():
+                query = query.filter(or_(
+                    Client.inn.startswith(self.q, autoescape=True),
+                    Client.kpp.startswith(self.q, autoescape=True),
+                    Client.ogrn.startswith(self.q, autoescape=True),
+                ))
+            else:
+                query = query.filter(or_(
+                    Client.short_name.contains(self.q, autoescape=True),
+                    Client.full_name.contains(self.q, autoescape=True),
+                ))
+        if self.active is not None:
+            query = query.filter(Client.is_active == (self.active == "1"))
+        if self.created_from:
+            query = query.filter(Client.created_at >= self.created_from)
+        if self.created_to:
+            query = query.filter(Client.created_at < self.created_to + timedelta(days=1))
+        return query
+
+    def as_dict(self) -> dict:
+        return {
+            "q": self.q,
+            "active": self.active or "",
+            "created_from": self.created_from.isoformat() if self.created_from else "",
+            "created_to": self.created_to.isoformat() if self.created_to else "",
+            "sort": self.sort,
+            "order": self.order,
+        }
+
+
+def _load_clients(database_name: str, filters: ClientFilters, params: PageParams) -> tuple[Page, list[dict]]:
+    """
+    Страница клиентов с учётом фильтров и их ЭЦП (одним дополнительным запросом на всю страницу).
+    """
+    session = client_db_manager.get_client_session(database_name)
     try:
-        clients = session.query(Client).order_by(Client.id.desc()).all()
+        sort_column = SORT_COLUMNS[filters.sort]
+        page = keyset_page(
+            filters.apply(session.query(Client)),
+            Client.id,
+            params,
+            sort_column=None if sort_column is Client.id else sort_column,
+            descending=filters.order == "desc",
+        )
+        signatures: dict[int, list[DigitalSignature]] = {c.id: [] for c in page.items}
+        if signatures:
+            for sig in session.query(DigitalSignature).filter(DigitalSignature.client_id.in_(signatures)).all():
+                signatures[sig.client_id].append(sig)
+        return page, [{"client": c, "signatures": signatures[c.id]} for c in page.items]
     finally:
         session.close()
 
-    company_settings = get_client_company_settings(db, client_id)
-    client = {"id": client_id, "name": org.company_name or "Клиент"}
+
+@router.get("/client/{client_id}/clients", response_class=HTMLResponse)
+async def client_clients_page(
+    client_id: int,
+    request: Request,
+    tenant: TenantContext = Depends(get_tenant_context),
+    filters: ClientFilters = Depends(),
+    params: PageParams = Depends(),
+):
+    page, clients_with_signatures = await run_db(_load_clients, tenant.database_name, filters, params)
+    company_settings = await run_db(get_client_company_settings, tenant)
+    client = {"id": client_id, "name": tenant.display_name}
 
     return templates.TemplateResponse(
         "client/clients.html",
@@ -42,7 +125,34 @@ async def client_clients_page(
             "request": request,
             "client_id": client_id,
             "client": client,                   # ✅ для client_base.html
-            "clients": clients,
+            "clients": page.items,
+            "clients_with_signatures": clients_with_signatures,
+            "today_plus_10": datetime.now() + timedelta(days=10),
+            "page": page.with_links(request),
+            "filters": filters.as_dict(),
             "company_settings": company_settings,
         },
     )
+
+
+@router.post("/client/{client_id}/clients/import")
+async def import_clients(
+    client_id: int,
+    file: UploadFile = File(...),
+    tenant: TenantContext = Depends(get_tenant_context),
+):
+    """
+    Импорт клиентов из CSV/XLSX (колонки ИНН, Наименование; необязательные — КПП, ОГРН,
+    Полное наименование, Адрес, Email, Телефон). Клиенты с уже существующим ИНН пропускаются.
+    Ответ — NDJSON: строка о ходе импорта после каждой пачки, последней — сводка с ошибками.
+    """
+    try:
+        job = await run_db(ClientImport, tenant.database_name, file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines():
+        for item in job.run():
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
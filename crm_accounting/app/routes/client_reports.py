@@ -1,42 +1,43 @@
 # app/routes/client_reports.py
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
 import logging
 
-from app.core.database import get_main_db
+from app.core.db_executor import run_db
 from app.utils import templates
 from app.utils.client_utils import get_client_company_settings
-from app.models.main_db import ClientOrganization
+from app.utils.tenant_context import TenantContext, get_tenant_context
 from app.managers.client_db_manager import client_db_manager
 from app.models.client_template import Report, ReportPeriod  # при отсутствии period можно убрать
+from app.utils.pagination import Page, PageParams, keyset_page
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/client/{client_id}/reports", response_class=HTMLResponse)
-async def client_reports_page(
-    client_id: int,
-    request: Request,
-    db: Session = Depends(get_main_db),
-):
-    org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
-    if not org or not org.database_name:
-        raise HTTPException(status_code=404, detail="База клиента не найдена")
-
-    session = client_db_manager.get_client_session(org.database_name)
+def _load_reports(database_name: str, params: PageParams) -> tuple[Page, list]:
+    session = client_db_manager.get_client_session(database_name)
     try:
-        reports = session.query(Report).order_by(Report.id.desc()).all()
+        page = keyset_page(session.query(Report), Report.id, params)
         try:
             periods = session.query(ReportPeriod).all()
         except Exception:
             periods = []
     finally:
         session.close()
+    return page, periods
 
-    company_settings = get_client_company_settings(db, client_id)
-    client = {"id": client_id, "name": org.company_name or "Клиент"}
+
+@router.get("/client/{client_id}/reports", response_class=HTMLResponse)
+async def client_reports_page(
+    client_id: int,
+    request: Request,
+    tenant: TenantContext = Depends(get_tenant_context),
+    params: PageParams = Depends(),
+):
+    page, periods = await run_db(_load_reports, tenant.database_name, params)
+    company_settings = await run_db(get_client_company_settings, tenant)
+    client = {"id": client_id, "name": tenant.display_name}
 
     return templates.TemplateResponse(
         "client/reports.html",
@@ -44,7 +45,8 @@ async def client_reports_page(
             "request": request,
             "client_id": client_id,
             "client": client,                   # ✅
-            "reports": reports,
+            "reports": page.items,
+            "page": page.with_links(request),
             "periods": periods,
             "company_settings": company_settings,
         },
@@ -1,38 +1,40 @@
 # app/routes/client_settings.py
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, File, UploadFile
+from fastapi.responses import HTMLResponse, JSONResponse
 import logging
+import os
 
-from app.core.database import get_main_db
+from app.core.db_executor import run_db
 from app.utils import templates
-from app.utils.client_utils import get_client_company_settings
-from app.models.main_db import ClientOrganization
+from app.utils.client_utils import get_client_company_settings, update_client_company_settings
+from app.utils.tenant_context import TenantContext, get_tenant_context
 from app.managers.client_db_manager import client_db_manager
 from app.models.client_template import CompanySettings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+LOGOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "logos")
+LOGO_EXTENSIONS = (".png", ".jpg", ".jpeg")
 
-@router.get("/client/{client_id}/settings", response_class=HTMLResponse)
-async def client_settings_page(
-    client_id: int,
-    request: Request,
-    db: Session = Depends(get_main_db),
-):
-    org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
-    if not org or not org.database_name:
-        raise HTTPException(status_code=404, detail="База клиента не найдена")
 
-    session = client_db_manager.get_client_session(org.database_name)
+def _load_settings(database_name: str):
+    session = client_db_manager.get_client_session(database_name)
     try:
-        cs = session.query(CompanySettings).first()
+        return session.query(CompanySettings).first()
     finally:
         session.close()
 
-    company_settings = get_client_company_settings(db, client_id)
-    client = {"id": client_id, "name": org.company_name or "Клиент"}
+
+@router.get("/client/{client_id}/settings", response_class=HTMLResponse)
+async def client_settings_page(
+    client_id: int,
+    request: Request,
+    tenant: TenantContext = Depends(get_tenant_context),
+):
+    cs = await run_db(_load_settings, tenant.database_name)
+    company_settings = await run_db(get_client_company_settings, tenant)
+    client = {"id": client_id, "name": tenant.display_name}
 
     return templates.TemplateResponse(
         "client/settings.html",
@@ -44,3 +46,37 @@ async def client_settings_page(
             "settings": cs,
         },
     )
+
+
+@router.post("/client/{client_id}/settings/company")
+async def update_company_settings(
+    client_id: int,
+    company_name: str = Form(...),
+    logo: UploadFile | None = File(None),
+    tenant: TenantContext = Depends(get_tenant_context),
+):
+    """
+    Сохранение названия компании и логотипа. Шапка портала обновляется сразу (кэш пишется вместе с БД).
+    """
+    company_name = company_name.strip()
+    if not company_name:
+        raise HTTPException(status_code=400, detail="Не указано название компании")
+
+    logo_path = None
+    if logo is not None and logo.filename:
+        ext = os.path.splitext(logo.filename)[1].lower()
+        if ext not in LOGO_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="Допустимые форматы логотипа: PNG, JPG, JPEG")
+        os.makedirs(LOGOS_DIR, exist_ok=True)
+        file_name = f"client_{client_id}{ext}"
+        with open(os.path.join(LOGOS_DIR, file_name), "wb") as f:
+            f.write(await logo.read())
+        logo_path = f"/static/logos/{file_name}"
+
+    try:
+        result = await run_db(update_client_company_settings, tenant, company_name, logo_path=logo_path)
+    except Exception as e:
+        logger.error(f"Ошибка сохранения настроек компании для клиента {client_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Ошибка сохранения настроек: {e}")
+
+    return JSONResponse({"success": True, "company_name": result.company_name, "logo": result.logo})
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.models.main_db import User
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password, create_access_token
 from datetime import timedelta
 from app.core.config import settings
 
@@ -15,8 +15,8 @@ class AuthService:
         return user
     
     @staticmethod
-    def create_user(db: Session, email: str, password: str, full_name: str, is_superuser: bool = False):
-        hashed_password = get_password_hash(password)
+    def create_user(db: Session, email: str, hashed_password: str, full_name: str, is_superuser: bool = False):
+        # пароль хешируют заранее: hashed_password = await password_hasher.hash(password)
         user = User(
             email=email,
             hashed_password=hashed_password,
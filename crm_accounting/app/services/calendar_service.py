@@ -0,0 +1,154 @@
+# app/services/calendar_service.py
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import CalendarEvent, CalendarHandbook, Client
+from app.services.dashboard_rollup import DashboardRollup
+from app.utils.business_calendar import business_calendar
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 1000
+
+
+@dataclass
+class DeadlineOccurrences:
+    """Сроки по правилам справочника: параллельные массивы id правила и даты (datetime64[D])."""
+    handbook_ids: np.ndarray
+    dates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def expand_rules(handbook_ids, days, months, start: date, end: date) -> DeadlineOccurrences:
+    """
+    Разворачивает правила повторения в конкретные даты в [start, end].
+
+    days — день месяца (1..31), months — месяц (1..12) для ежегодных сроков или 0 для ежемесячных.
+    День, которого нет в месяце (31 число в апреле, 29–31 февраля), переносится на последний день месяца.
+    Вычисление — матрица «правило × месяц» без циклов по Python.
+    """
+    handbook_ids = np.asarray(handbook_ids, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+
+    month_starts = np.arange(np.datetime64(start, "M"), np.datetime64(end, "M") + 1)
+    first_days = month_starts.astype("datetime64[D]")
+    month_lengths = ((month_starts + 1).astype("datetime64[D]") - first_days).astype(np.int64)
+    month_numbers = month_starts.astype(np.int64) % 12 + 1
+
+    # [правило, месяц]
+    offsets = np.minimum(days[:, None], month_lengths[None, :]) - 1
+    dates = first_days[None, :] + offsets.astype("timedelta64[D]")
+    mask = (months[:, None] == 0) | (months[:, None] == month_numbers[None, :])
+    mask &= (dates >= np.datetime64(start, "D")) & (dates <= np.datetime64(end, "D"))
+
+    rule_index, _ = np.nonzero(mask)
+    return DeadlineOccurrences(handbook_ids=handbook_ids[rule_index], dates=dates[mask])
+
+
+def _event_keys(client_ids: np.ndarray, handbook_ids: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """
+    Ключи событий (клиент, правило, день) для np.unique / np.isin: строка из трёх int64,
+    просмотренная как один np.void — сравнение точное при любых id (без упаковки в биты).
+    """
+    columns = np.column_stack([
+        np.asarray(client_ids, dtype=np.int64),
+        np.asarray(handbook_ids, dtype=np.int64),
+        dates.astype("datetime64[D]").astype(np.int64),
+    ])
+    return np.ascontiguousarray(columns).view(np.dtype((np.void, columns.itemsize * 3))).ravel()
+
+
+class CalendarService:
+
+    @staticmethod
+    def generate_deadlines(database_name: str, start: date, end: date) -> dict:
+        """
+        Создаёт события календаря «правило справочника × активный клиент × срок» за период.
+        Учитываются активные записи справочника с заполненным днём (default_day); срок, выпавший
+        на выходной или праздник, переносится на следующий рабочий день (business_calendar);
+        уже существующие события (тот же клиент, правило и день) не дублируются.
+        """
+        started = time.perf_counter()
+        with client_db_manager.get_client_session(database_name) as session:
+            rules = session.execute(
+                select(CalendarHandbook.id, CalendarHandbook.name, CalendarHandbook.default_day, CalendarHandbook.default_month)
+                .where(CalendarHandbook.is_active.isnot(False), CalendarHandbook.default_day.between(1, 31))
+            ).all()
+            client_ids = np.fromiter(
+                session.execute(select(Client.id).where(Client.is_active.isnot(False))).scalars(), dtype=np.int64
+            )
+            if not rules or not len(client_ids):
+                return {"created": 0, "skipped": 0, "rules": len(rules), "clients": len(client_ids)}
+
+            titles = {r.id: r.name for r in rules}
+            occurrences = expand_rules(
+                [r.id for r in rules],
+                [r.default_day for r in rules],
+                [r.default_month if r.default_month and 1 <= r.default_month <= 12 else 0 for r in rules],
+                start,
+                end,
+            )
+            occurrences.dates = business_calendar.next_working_days(occurrences.dates)
+            # два срока одного правила могут после переноса совпасть
+            _, first = np.unique(_event_keys(np.zeros(len(occurrences)), occurrences.handbook_ids, occurrences.dates), return_index=True)
+            occurrences = DeadlineOccurrences(occurrences.handbook_ids[first], occurrences.dates[first])
+            if not len(occurrences):
+                return {"created": 0, "skipped": 0, "rules": len(rules), "clients": len(client_ids)}
+
+            # декартово произведение «срок × клиент»
+            event_clients = np.tile(client_ids, len(occurrences))
+            event_handbooks = np.repeat(occurrences.handbook_ids, len(client_ids))
+            event_dates = np.repeat(occurrences.dates, len(client_ids))
+
+            # перенос может вывести срок за end (31 декабря -> январь следующего года):
+            # уже созданные события ищем в границах перенесённых дат, а не [start, end]
+            first_day, last_day = occurrences.dates.min().item(), occurrences.dates.max().item()
+            existing = session.execute(
+                select(CalendarEvent.client_id, CalendarEvent.handbook_id, CalendarEvent.date).where(
+                    CalendarEvent.handbook_id.in_(titles),
+                    CalendarEvent.client_id.isnot(None),
+                    CalendarEvent.date >= datetime.combine(first_day, datetime.min.time()),
+                    CalendarEvent.date < datetime.combine(last_day + timedelta(days=1), datetime.min.time()),
+                )
+            ).all()
+            keep = np.ones(len(event_dates), dtype=bool)
+            if existing:
+                existing_keys = _event_keys(
+                    np.array([e.client_id for e in existing]),
+                    np.array([e.handbook_id for e in existing]),
+                    np.array([e.date for e in existing], dtype="datetime64[us]"),
+                )
+                keep = ~np.isin(_event_keys(event_clients, event_handbooks, event_dates), existing_keys)
+
+            event_clients, event_handbooks = event_clients[keep].tolist(), event_handbooks[keep].tolist()
+            event_dates = event_dates[keep].astype("datetime64[s]").tolist()
+            rows = [
+                {"client_id": c, "handbook_id": h, "date": d, "title": titles[h]}
+                for c, h, d in zip(event_clients, event_handbooks, event_dates)
+            ]
+            for i in range(0, len(rows), INSERT_BATCH_SIZE):
+                session.execute(insert(CalendarEvent), rows[i:i + INSERT_BATCH_SIZE])
+            session.commit()
+
+        if rows:
+            # массовая вставка идёт в обход ORM — счётчики дашборда пересчитываем целиком
+            DashboardRollup.reconcile(database_name)
+
+        result = {
+            "created": len(rows),
+            "skipped": int((~keep).sum()),
+            "rules": len(rules),
+            "clients": len(client_ids),
+            "duration_sec": round(time.perf_counter() - started, 2),
+        }
+        logger.info(f"Сроки календаря {start}..{end} для БД {database_name}: {result}")
+        return result
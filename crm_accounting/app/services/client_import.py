@@ -0,0 +1,264 @@
+# app/services/client_import.py
+"""
+Массовый импорт клиентов (Client) из CSV или XLSX в клиентскую БД.
+
+Файл читается потоком (csv.reader / openpyxl в режиме read_only), строки проверяются и пишутся
+пачками: каждая пачка — одна транзакция с INSERT executemany (на MSSQL — fast_executemany
+engine). Дубли по ИНН отсекаются для каждой пачки запросом по индексу clients.inn, поэтому
+память не зависит от размера файла, а повторная загрузка того же файла ничего не добавит.
+"""
+import codecs
+import csv
+import io
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Iterator
+
+from openpyxl import load_workbook
+from sqlalchemy import func, insert, literal, select
+
+from app.core.config import settings
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import Client, ClientIndexOutbox
+from app.services.client_index import client_index_relay
+from app.services.dashboard_rollup import DashboardRollup
+
+logger = logging.getLogger(__name__)
+
+# заголовок колонки (без регистра) -> поле Client
+COLUMN_ALIASES = {
+    "inn": ("инн", "inn"),
+    "kpp": ("кпп", "kpp"),
+    "ogrn": ("огрн", "огрнип", "ogrn"),
+    "short_name": ("краткое наименование", "наименование", "short_name", "name"),
+    "full_name": ("полное наименование", "full_name"),
+    "address": ("адрес", "address"),
+    "email": ("email", "e-mail", "эл. почта", "электронная почта"),
+    "phone": ("телефон", "phone"),
+}
+_HEADER_FIELDS = {alias: name for name, aliases in COLUMN_ALIASES.items() for alias in aliases}
+_MAX_LENGTHS = {name: Client.__table__.c[name].type.length for name in COLUMN_ALIASES}
+
+# MSSQL принимает не больше 2100 параметров в запросе — столько же ИНН в проверке дублей
+MAX_BATCH_SIZE = 2000
+
+_INN10_WEIGHTS = (2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN12_WEIGHTS = ((7, 2, 4, 10, 3, 5, 9, 4, 6, 8), (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8))
+_KPP_RE = re.compile(r"^\d{4}[0-9A-Z]{2}\d{3}$")
+
+
+def _digits(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+def _check_digit(value: str, weights: tuple) -> int:
+    return sum(int(d) * w for d, w in zip(value, weights)) % 11 % 10
+
+
+def is_valid_inn(inn: str) -> bool:
+    """ИНН организации (10 цифр) или ИП/физлица (12 цифр) с контрольными цифрами."""
+    if not _digits(inn):
+        return False
+    if len(inn) == 10:
+        return _check_digit(inn, _INN10_WEIGHTS) == int(inn[9])
+    if len(inn) == 12:
+        return _check_digit(inn, _INN12_WEIGHTS[0]) == int(inn[10]) and _check_digit(inn, _INN12_WEIGHTS[1]) == int(inn[11])
+    return False
+
+
+def is_valid_kpp(kpp: str) -> bool:
+    return bool(_KPP_RE.match(kpp))
+
+
+def is_valid_ogrn(ogrn: str) -> bool:
+    """ОГРН (13 цифр) или ОГРНИП (15 цифр) с контрольной цифрой."""
+    if not _digits(ogrn):
+        return False
+    if len(ogrn) == 13:
+        return int(ogrn[:12]) % 11 % 10 == int(ogrn[12])
+    if len(ogrn) == 15:
+        return int(ogrn[:14]) % 13 % 10 == int(ogrn[14])
+    return False
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _csv_rows(file) -> Iterator[list]:
+    """Строки CSV: кодировка UTF-8 (с BOM или без) или cp1251, разделитель ; , или табуляция."""
+    head = file.read(64 * 1024)
+    file.seek(0)
+    encoding = "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+    except UnicodeDecodeError:
+        encoding = "cp1251"  # выгрузки из Excel/1С для русской локали
+    first_line = head.decode(encoding, errors="ignore").split("\n", 1)[0]
+    delimiter = max(";,\t", key=first_line.count)
+    # errors="replace": битый байт в середине файла портит одно поле, а не прерывает импорт
+    text = io.TextIOWrapper(file, encoding=encoding, errors="replace", newline="")
+    try:
+        yield from csv.reader(text, delimiter=delimiter)
+    finally:
+        if not file.closed:
+            text.detach()  # файл закрывает владелец (UploadFile)
+
+
+def _xlsx_rows(file) -> Iterator[tuple]:
+    """Строки первого листа XLSX; read_only — без загрузки всей книги в память."""
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def open_rows(file, filename: str | None) -> Iterator:
+    """Итератор строк файла по расширению (или сигнатуре ZIP для XLSX). ValueError — формат не поддерживается."""
+    name = (filename or "").lower()
+    signature = file.read(4)
+    file.seek(0)
+    if name.endswith(".xlsx") or (not name.endswith((".csv", ".txt")) and signature == b"PK\x03\x04"):
+        return _xlsx_rows(file)
+    if name.endswith((".csv", ".txt")) or not name:
+        return _csv_rows(file)
+    raise ValueError("Поддерживаются файлы CSV и XLSX")
+
+
+class ClientImport:
+    """
+    Импорт одного файла. Конструктор читает заголовок (ValueError — файл не подходит),
+    run() выполняет импорт и отдаёт ход работы: {"progress": ...} после каждой пачки,
+    последним — {"summary": ...} с первыми max_errors ошибочными строками.
+    """
+
+    def __init__(self, database_name: str, file, filename: str | None,
+                 batch_size: int | None = None, max_errors: int | None = None):
+        self.database_name = database_name
+        self.batch_size = max(1, min(batch_size or settings.CLIENT_IMPORT_BATCH_SIZE, MAX_BATCH_SIZE))
+        self.max_errors = settings.CLIENT_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        self.stats = {"rows": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+        self.errors: list[dict] = []
+        self._rows = open_rows(file, filename)
+        self._line = 0
+        self._columns = self._read_header()
+
+    def _read_header(self) -> dict[str, int]:
+        try:
+            for header in self._rows:
+                self._line += 1
+                values = [_text(v).lower() for v in header]
+                if not any(values):
+                    continue
+                columns: dict[str, int] = {}
+                for i, value in enumerate(values):
+                    name = _HEADER_FIELDS.get(value)
+                    if name and name not in columns:
+                        columns[name] = i
+                if "inn" not in columns:
+                    raise ValueError("В первой строке файла нет колонки «ИНН»")
+                if "short_name" not in columns and "full_name" not in columns:
+                    raise ValueError("В первой строке файла нет колонки «Наименование»")
+                return columns
+        except ValueError:
+            raise
+        except Exception as e:
+            # csv.Error, повреждённый XLSX (zipfile/openpyxl)
+            raise ValueError(f"Не удалось прочитать файл: {e}")
+        raise ValueError("Файл пуст")
+
+    def _error(self, message: str) -> None:
+        self.stats["invalid"] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": self._line, "error": message})
+
+    def _parse(self, values) -> dict | None:
+        row = {}
+        for name, i in self._columns.items():
+            raw = values[i] if i < len(values) else None
+            value = _text(raw)
+            # Excel хранит ИНН/КПП числом и теряет ведущий ноль (регионы 01–09)
+            if isinstance(raw, (int, float)) and name in ("inn", "kpp"):
+                value = value.zfill(9 if name == "kpp" else (10 if len(value) <= 10 else 12))
+            if len(value) > _MAX_LENGTHS[name]:
+                self._error(f"Поле {name}: длиннее {_MAX_LENGTHS[name]} символов")
+                return None
+            row[name] = value or None
+
+        if not row.get("inn"):
+            self._error("Не указан ИНН")
+        elif not is_valid_inn(row["inn"]):
+            self._error(f"Некорректный ИНН: {row['inn']}")
+        elif row.get("kpp") and not is_valid_kpp(row["kpp"]):
+            self._error(f"Некорректный КПП: {row['kpp']}")
+        elif row.get("ogrn") and not is_valid_ogrn(row["ogrn"]):
+            self._error(f"Некорректный ОГРН: {row['ogrn']}")
+        elif not row.get("short_name") and not row.get("full_name"):
+            self._error("Не указано наименование")
+        else:
+            # в списке клиентов выводится и сортируется краткое наименование
+            row["short_name"] = row.get("short_name") or row["full_name"]
+            return row
+        return None
+
+    def _batches(self) -> Iterator[dict[str, dict]]:
+        """Пачки проверенных строк: ИНН -> строка (дубли внутри пачки отброшены)."""
+        batch: dict[str, dict] = {}
+        for values in self._rows:
+            self._line += 1
+            if not any(_text(v) for v in values):
+                continue
+            self.stats["rows"] += 1
+            row = self._parse(values)
+            if row is None:
+                continue
+            if row["inn"] in batch:
+                self.stats["duplicates"] += 1
+                continue
+            batch[row["inn"]] = row
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def _insert(self, engine, batch: dict[str, dict]) -> int:
+        with engine.begin() as conn:
+            existing = set(conn.execute(select(Client.inn).where(Client.inn.in_(list(batch)))).scalars())
+            rows = [row for inn, row in batch.items() if inn not in existing]
+            self.stats["duplicates"] += len(batch) - len(rows)
+            if not rows:
+                return 0
+            last_id = conn.execute(select(func.max(Client.id))).scalar() or 0
+            conn.execute(insert(Client), rows)
+            # вставка в обход ORM — outbox индекса клиентов пишем сами, той же транзакцией
+            conn.execute(insert(ClientIndexOutbox).from_select(
+                ["client_id", "created_at"],
+                select(Client.id, literal(datetime.utcnow())).where(Client.id > last_id),
+            ))
+        return len(rows)
+
+    def run(self) -> Iterator[dict]:
+        started = time.monotonic()
+        engine = client_db_manager.get_engine(self.database_name)
+        try:
+            for batch in self._batches():
+                self.stats["inserted"] += self._insert(engine, batch)
+                yield {"progress": {**self.stats, "elapsed_sec": round(time.monotonic() - started, 1)}}
+        finally:
+            # и при обрыве загрузки: уже вставленные пачки зафиксированы
+            if self.stats["inserted"]:
+                DashboardRollup.reconcile(self.database_name)
+                client_index_relay.notify(self.database_name)
+            logger.info(
+                f"Импорт клиентов в БД {self.database_name}: добавлено {self.stats['inserted']} из "
+                f"{self.stats['rows']} строк за {time.monotonic() - started:.1f} сек."
+            )
+        yield {"summary": {**self.stats, "errors": self.errors, "duration_sec": round(time.monotonic() - started, 1)}}
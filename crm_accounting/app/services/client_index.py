@@ -0,0 +1,340 @@
+# app/services/client_index.py
+"""
+Глобальный индекс клиентов (global_client_index основной БД).
+
+Изменение Client в клиентской БД пишет строку в client_index_outbox той же транзакцией
+(обработчики ниже). После commit ClientIndexRelay разбирает outbox этой БД: читает текущие
+реквизиты изменённых клиентов, обновляет их строки в индексе и удаляет обработанные записи.
+Обработка идемпотентна; если процесс упал до неё, outbox разберут при следующем изменении
+в этой БД или при старте приложения.
+
+Правило: строки индекса одной организации пишут строго по очереди. Любой писатель (разбор
+outbox, полная перестройка — в любом процессе) блокирует строку организации в
+client_organizations (_lock_organization) до чтения данных клиентской БД и держит блокировку
+до commit индекса. Иначе устаревший снимок, прочитанный до чужой записи, мог бы её затереть,
+а outbox с изменением к тому времени уже был бы удалён. Массовые вставки в обход ORM (benchmarks.seed и т.п.)
+в outbox не попадают — для них и для первичного заполнения есть полная перестройка:
+
+    python -m app.services.client_index [--database client_1] [--workers 8]
+"""
+import argparse
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from sqlalchemy import and_, delete, event, insert, or_, select, update
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app.core.database import SessionLocal, check_and_create_tables
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import Client, ClientIndexOutbox
+from app.models.main_db import ClientOrganization, GlobalClientIndex
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("inn", "kpp", "ogrn", "short_name", "full_name", "is_active")
+BATCH_SIZE = 500
+
+
+class ClientIndexService:
+
+    @staticmethod
+    def organization_ids(database_names: list[str] | None = None) -> dict[str, int]:
+        """Имя клиентской БД -> id организации (по ClientOrganization.database_name)."""
+        with SessionLocal() as db:
+            query = select(ClientOrganization.database_name, ClientOrganization.id).where(
+                ClientOrganization.database_name.isnot(None)
+            )
+            if database_names is not None:
+                query = query.where(ClientOrganization.database_name.in_(database_names))
+            return {name: org_id for name, org_id in db.execute(query).all()}
+
+    @staticmethod
+    def _index_rows(organization_id: int, clients) -> list[dict]:
+        now = datetime.utcnow()
+        return [
+            {"client_organization_id": organization_id, "client_id": c.id, "indexed_at": now,
+             **{name: getattr(c, name) for name in INDEXED_FIELDS}}
+            for c in clients
+        ]
+
+    @staticmethod
+    def _lock_organization(db: Session, organization_id: int) -> None:
+        """
+        Блокирует строку организации до конца транзакции db (пустой UPDATE: на MSSQL — блокировка
+        строки, на SQLite — блокировка записи всей основной БД). Так писатели индекса одной
+        организации выполняются по очереди, в том числе из разных процессов.
+        """
+        db.execute(
+            update(ClientOrganization)
+            .where(ClientOrganization.id == organization_id)
+            .values(updated_at=ClientOrganization.updated_at)  # явное значение — без onupdate
+        )
+
+    @staticmethod
+    def sync_tenant(database_name: str, organization_id: int) -> int:
+        """Разбирает outbox клиентской БД пачками по BATCH_SIZE. Возвращает число обработанных записей."""
+        engine = client_db_manager.get_engine(database_name)
+        processed = 0
+        while True:
+            with SessionLocal() as db:
+                ClientIndexService._lock_organization(db, organization_id)
+                with engine.connect() as conn:
+                    outbox = conn.execute(
+                        select(ClientIndexOutbox.id, ClientIndexOutbox.client_id).order_by(ClientIndexOutbox.id).limit(BATCH_SIZE)
+                    ).all()
+                    if not outbox:
+                        db.rollback()
+                        return processed
+                    client_ids = sorted({row.client_id for row in outbox})
+                    clients = conn.execute(
+                        select(Client.id, *(getattr(Client, name) for name in INDEXED_FIELDS)).where(Client.id.in_(client_ids))
+                    ).all()
+
+                # клиентов, которых нет в БД, удалили — их строки из индекса просто убираем
+                db.execute(delete(GlobalClientIndex).where(
+                    GlobalClientIndex.client_organization_id == organization_id,
+                    GlobalClientIndex.client_id.in_(client_ids),
+                ))
+                if clients:
+                    db.execute(insert(GlobalClientIndex), ClientIndexService._index_rows(organization_id, clients))
+                db.commit()
+
+            # удаляем по id: записи, появившиеся после чтения, останутся до следующего прохода
+            with engine.begin() as conn:
+                conn.execute(delete(ClientIndexOutbox).where(ClientIndexOutbox.id.in_([row.id for row in outbox])))
+            processed += len(outbox)
+
+    @staticmethod
+    def rebuild_tenant(database_name: str, organization_id: int) -> int:
+        """Перестраивает строки индекса одной клиентской БД целиком. Возвращает число клиентов."""
+        engine = client_db_manager.get_engine(database_name)
+        with SessionLocal() as db:
+            ClientIndexService._lock_organization(db, organization_id)
+            with engine.connect() as conn:
+                # outbox, накопленный до снимка, покрывается перестройкой
+                outbox_ids = conn.execute(select(ClientIndexOutbox.id)).scalars().all()
+                clients = conn.execute(select(Client.id, *(getattr(Client, name) for name in INDEXED_FIELDS))).all()
+
+            db.execute(delete(GlobalClientIndex).where(GlobalClientIndex.client_organization_id == organization_id))
+            rows = ClientIndexService._index_rows(organization_id, clients)
+            for i in range(0, len(rows), BATCH_SIZE):
+                db.execute(insert(GlobalClientIndex), rows[i:i + BATCH_SIZE])
+            db.commit()
+
+        for i in range(0, len(outbox_ids), BATCH_SIZE):
+            with engine.begin() as conn:
+                conn.execute(delete(ClientIndexOutbox).where(ClientIndexOutbox.id.in_(outbox_ids[i:i + BATCH_SIZE])))
+        return len(clients)
+
+    @staticmethod
+    def _rebuild_and_close(database_name: str, organization_id: int) -> int:
+        was_open = client_db_manager.has_engine(database_name)
+        try:
+            return ClientIndexService.rebuild_tenant(database_name, organization_id)
+        finally:
+            # не держим пулы соединений БД, которые открыли только ради перестройки
+            if not was_open:
+                client_db_manager.dispose_engine(database_name)
+
+    @staticmethod
+    def rebuild(database_names: list[str] | None = None, workers: int = 4) -> dict:
+        """Полная перестройка индекса по клиентским БД организаций (по умолчанию — всех)."""
+        organizations = ClientIndexService.organization_ids(database_names)
+        with SessionLocal() as db:
+            # строки организаций, у которых больше нет клиентской БД
+            if database_names is None:
+                db.execute(delete(GlobalClientIndex).where(
+                    GlobalClientIndex.client_organization_id.notin_(list(organizations.values()) or [0])
+                ))
+                db.commit()
+
+        started = time.monotonic()
+        clients, failed = 0, {}
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="client-index") as pool:
+            futures = {
+                pool.submit(ClientIndexService._rebuild_and_close, name, org_id): name
+                for name, org_id in organizations.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    clients += future.result()
+                except Exception as e:
+                    failed[name] = str(e)
+                    logger.error(f"Перестройка индекса клиентов БД {name} не удалась: {e}")
+        return {
+            "databases": len(organizations),
+            "clients": clients,
+            "failed": failed,
+            "duration_sec": round(time.monotonic() - started, 1),
+        }
+
+    @staticmethod
+    def search(db: Session, q: str, limit: int = 50) -> list[dict]:
+        """
+        Поиск клиентов по всем организациям: цифры — префикс ИНН/КПП/ОГРН (по индексам),
+        иначе — подстрока наименования.
+        """
+        q = q.strip()
+        if q.isdigit():
+            # префикс из цифр — диапазон [q, q с последней цифрой + 1): поиск по индексу на любой СУБД,
+            # в отличие от LIKE 'q%' (SQLite без NOCASE/case_sensitive_like индекс не использует)
+            upper = q[:-1] + chr(ord(q[-1]) + 1)
+            condition = or_(*(
+                and_(column >= q, column < upper)
+                for column in (GlobalClientIndex.inn, GlobalClientIndex.kpp, GlobalClientIndex.ogrn)
+            ))
+        else:
+            condition = or_(
+                GlobalClientIndex.short_name.contains(q, autoescape=True),
+                GlobalClientIndex.full_name.contains(q, autoescape=True),
+            )
+        rows = db.execute(
+            select(GlobalClientIndex, ClientOrganization.company_name, ClientOrganization.database_name)
+            .join(ClientOrganization, ClientOrganization.id == GlobalClientIndex.client_organization_id)
+            .where(condition)
+            .order_by(GlobalClientIndex.short_name, GlobalClientIndex.id)
+            .limit(limit)
+        ).all()
+        return [
+            {
+                "organization_id": entry.client_organization_id,
+                "organization_name": company_name,
+                "database_name": database_name,
+                "client_id": entry.client_id,
+                **{name: getattr(entry, name) for name in INDEXED_FIELDS},
+            }
+            for entry, company_name, database_name in rows
+        ]
+
+
+class ClientIndexRelay:
+    """
+    Фоновый поток, разбирающий outbox клиентских БД, о которых сообщили notify()
+    (после commit сессии, изменившей клиентов). При старте проверяет outbox всех БД.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._organizations: dict[str, int] = {}
+        self._synced = 0
+        self._errors = 0
+
+    def notify(self, database_name: str) -> None:
+        with self._lock:
+            if database_name in self._pending:
+                return
+            self._pending.add(database_name)
+        self._queue.put(database_name)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="client-index-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _organization_id(self, database_name: str) -> int | None:
+        if database_name not in self._organizations:
+            self._organizations.update(ClientIndexService.organization_ids([database_name]))
+        return self._organizations.get(database_name)
+
+    def _loop(self) -> None:
+        try:
+            for name in ClientIndexService.organization_ids():
+                self.notify(name)
+        except Exception as e:
+            logger.error(f"Не удалось получить список клиентских БД для индекса клиентов: {e}")
+
+        while True:
+            name = self._queue.get()
+            if name is None:
+                return
+            with self._lock:
+                self._pending.discard(name)
+            was_open = client_db_manager.has_engine(name)
+            try:
+                organization_id = self._organization_id(name)
+                if organization_id is not None:
+                    self._synced += ClientIndexService.sync_tenant(name, organization_id)
+            except Exception as e:
+                self._errors += 1
+                logger.error(f"Обновление индекса клиентов из БД {name} не удалось: {e}")
+            finally:
+                if not was_open:
+                    client_db_manager.dispose_engine(name)
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "synced": self._synced, "errors": self._errors}
+
+
+# singleton
+client_index_relay = ClientIndexRelay()
+
+
+# ---------- outbox при изменении Client ----------
+
+def _enqueue(connection, target) -> None:
+    connection.execute(insert(ClientIndexOutbox).values(client_id=target.id, created_at=datetime.utcnow()))
+    session = object_session(target)
+    if session is not None:
+        session.info["client_index_dirty"] = True
+
+
+@event.listens_for(Client, "after_insert")
+def _client_inserted(mapper, connection, target):
+    _enqueue(connection, target)
+
+
+@event.listens_for(Client, "after_update")
+def _client_updated(mapper, connection, target):
+    if any(attributes.get_history(target, name).has_changes() for name in INDEXED_FIELDS):
+        _enqueue(connection, target)
+
+
+@event.listens_for(Client, "after_delete")
+def _client_deleted(mapper, connection, target):
+    _enqueue(connection, target)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session):
+    if session.info.pop("client_index_dirty", False) and "database_name" in session.info:
+        client_index_relay.notify(session.info["database_name"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction):
+    session.info.pop("client_index_dirty", None)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Полная перестройка global_client_index основной БД")
+    parser.add_argument("--database", action="append", help="имя клиентской БД (можно несколько раз); по умолчанию — все")
+    parser.add_argument("--workers", type=int, default=4, help="клиентских БД одновременно")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # перестройку могут запустить до первого старта приложения с новой таблицей
+    check_and_create_tables()
+    result = ClientIndexService.rebuild(args.database, args.workers)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
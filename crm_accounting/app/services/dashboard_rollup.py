@@ -0,0 +1,283 @@
+# app/services/dashboard_rollup.py
+import logging
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import case, event, func, insert, select, true, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import attributes
+
+from app.core.config import settings
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import CalendarEvent, Client, DashboardCounters, DigitalSignature, Report
+from app.utils.daily_job import DailyJob
+from app.utils.dashboard_cache import dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_REPORT_STATUS = "просрочен"
+ACTIVE_REPORT_STATUSES = ("в работе", "подготовлен")
+COUNTERS_ROW_ID = 1
+
+
+@dataclass(frozen=True)
+class DashboardMetrics:
+    """
+    Счётчики дашборда клиента.
+    """
+    clients_count: int = 0
+    new_clients_count: int = 0
+    reports_count: int = 0
+    overdue_reports: int = 0
+    active_reports: int = 0
+    expiring_signatures_count: int = 0
+    calendar_events: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+METRIC_FIELDS = tuple(f.name for f in fields(DashboardMetrics))
+
+
+@dataclass(frozen=True)
+class _Windows:
+    """Границы оконных счётчиков на конкретный день."""
+    new_clients_since: datetime
+    expiring_from: datetime
+    expiring_until: datetime
+    month_start: datetime
+    month_end: datetime
+
+    @classmethod
+    def for_day(cls, today: date) -> "_Windows":
+        start = datetime.combine(today, datetime.min.time())
+        month_start = start.replace(day=1)
+        month_end = month_start.replace(year=today.year + 1, month=1) if today.month == 12 else month_start.replace(month=today.month + 1)
+        return cls(
+            new_clients_since=start - timedelta(days=7),
+            expiring_from=start,
+            expiring_until=start + timedelta(days=30),
+            month_start=month_start,
+            month_end=month_end,
+        )
+
+
+def count_dashboard_metrics(conn, today: date | None = None) -> DashboardMetrics:
+    """
+    Полный пересчёт счётчиков одним запросом: по одному агрегату с условными суммами на таблицу,
+    агрегаты объединены в одну строку. conn — Connection или Session клиентской БД.
+    """
+    w = _Windows.for_day(today or date.today())
+
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    clients = select(
+        func.count(Client.id).label("clients_count"),
+        count_if(Client.created_at >= w.new_clients_since).label("new_clients_count"),
+    ).subquery()
+    reports = select(
+        func.count(Report.id).label("reports_count"),
+        count_if(Report.status == OVERDUE_REPORT_STATUS).label("overdue_reports"),
+        count_if(Report.status.in_(ACTIVE_REPORT_STATUSES)).label("active_reports"),
+    ).subquery()
+    signatures = select(
+        func.count(DigitalSignature.id).label("expiring_signatures_count"),
+    ).where(
+        DigitalSignature.end_date >= w.expiring_from,
+        DigitalSignature.end_date <= w.expiring_until,
+    ).subquery()
+    events = select(
+        func.count(CalendarEvent.id).label("calendar_events"),
+    ).where(
+        CalendarEvent.date >= w.month_start,
+        CalendarEvent.date < w.month_end,
+    ).subquery()
+
+    stmt = select(clients, reports, signatures, events).select_from(
+        clients.join(reports, true()).join(signatures, true()).join(events, true())
+    )
+    row = conn.execute(stmt).one()
+    return DashboardMetrics(**{name: int(value or 0) for name, value in row._mapping.items()})
+
+
+class DashboardRollup:
+    """
+    Счётчики дашборда из таблицы dashboard_counters (одна строка на клиентскую БД).
+
+    Строка обновляется инкрементально при flush ORM (см. обработчики ниже). Оконные счётчики
+    со временем «устаревают», поэтому строка целиком пересчитывается раз в сутки:
+    ночным DashboardReconciler или, если он не успел, при первом чтении за день.
+    Массовые операции в обход ORM (bulk insert, query.update/delete) счётчики не меняют —
+    расхождение исправит ближайший пересчёт.
+    """
+
+    @staticmethod
+    def read(database_name: str) -> DashboardMetrics:
+        today_start = datetime.combine(date.today(), datetime.min.time())
+        try:
+            with client_db_manager.get_engine(database_name).connect() as conn:
+                row = conn.execute(
+                    select(DashboardCounters).where(DashboardCounters.id == COUNTERS_ROW_ID)
+                ).first()
+        except DBAPIError as e:
+            # таблицы ещё нет (БД не мигрирована) — считаем напрямую
+            logger.warning(f"dashboard_counters недоступна в БД {database_name}: {e.__class__.__name__}")
+            with client_db_manager.get_engine(database_name).connect() as conn:
+                return count_dashboard_metrics(conn)
+
+        if row is None or row.reconciled_at is None or row.reconciled_at < today_start:
+            return DashboardRollup.reconcile(database_name)
+        return DashboardMetrics(**{name: row._mapping[name] for name in METRIC_FIELDS})
+
+    @staticmethod
+    def store(conn, metrics: DashboardMetrics) -> None:
+        """Записывает пересчитанные счётчики (UPDATE, а если строки нет — INSERT)."""
+        values = {**metrics.as_dict(), "reconciled_at": datetime.now()}
+        updated = conn.execute(
+            update(DashboardCounters).where(DashboardCounters.id == COUNTERS_ROW_ID).values(**values)
+        ).rowcount
+        if not updated:
+            conn.execute(insert(DashboardCounters).values(id=COUNTERS_ROW_ID, **values))
+
+    @staticmethod
+    def reconcile(database_name: str) -> DashboardMetrics:
+        """Полный пересчёт счётчиков клиентской БД."""
+        with client_db_manager.get_engine(database_name).begin() as conn:
+            metrics = count_dashboard_metrics(conn)
+            DashboardRollup.store(conn, metrics)
+        dashboard_cache.invalidate(database_name)
+        return metrics
+
+
+# ---------- инкрементальное обновление при flush ----------
+
+def _value(target, attr: str, old: bool):
+    """Текущее значение атрибута или (old=True) значение до изменения в этой транзакции."""
+    if old:
+        history = attributes.get_history(target, attr)
+        if history.deleted:
+            return history.deleted[0]
+    return getattr(target, attr)
+
+
+def _client_counters(target, old: bool, w: _Windows) -> dict:
+    created_at = _value(target, "created_at", old)
+    return {
+        "clients_count": 1,
+        "new_clients_count": int(created_at is None or created_at >= w.new_clients_since),
+    }
+
+
+def _report_counters(target, old: bool, w: _Windows) -> dict:
+    status = _value(target, "status", old)
+    return {
+        "reports_count": 1,
+        "overdue_reports": int(status == OVERDUE_REPORT_STATUS),
+        "active_reports": int(status in ACTIVE_REPORT_STATUSES),
+    }
+
+
+def _signature_counters(target, old: bool, w: _Windows) -> dict:
+    end_date = _value(target, "end_date", old)
+    return {"expiring_signatures_count": int(end_date is not None and w.expiring_from <= end_date <= w.expiring_until)}
+
+
+def _event_counters(target, old: bool, w: _Windows) -> dict:
+    event_date = _value(target, "date", old)
+    return {"calendar_events": int(event_date is not None and w.month_start <= event_date < w.month_end)}
+
+
+def _apply(connection, deltas: dict) -> None:
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    # если строки ещё нет, UPDATE ничего не изменит — её создаст пересчёт при первом чтении
+    connection.execute(
+        update(DashboardCounters)
+        .where(DashboardCounters.id == COUNTERS_ROW_ID)
+        .values({name: getattr(DashboardCounters, name) + delta for name, delta in deltas.items()})
+    )
+
+
+def _track(model, attrs: tuple[str, ...], counters) -> None:
+    # active_history: при присваивании атрибуту с истёкшим значением (после commit) SQLAlchemy
+    # сначала загрузит старое значение — иначе в after_update его не будет в истории
+    for attr in attrs:
+        event.listen(getattr(model, attr), "set", lambda target, value, oldvalue, initiator: value,
+                     active_history=True, retval=True)
+
+    def after_insert(mapper, connection, target):
+        _apply(connection, counters(target, False, _Windows.for_day(date.today())))
+
+    def after_delete(mapper, connection, target):
+        old = counters(target, True, _Windows.for_day(date.today()))
+        _apply(connection, {name: -value for name, value in old.items()})
+
+    def after_update(mapper, connection, target):
+        w = _Windows.for_day(date.today())
+        old, new = counters(target, True, w), counters(target, False, w)
+        _apply(connection, {name: new[name] - old[name] for name in new})
+
+    event.listen(model, "after_insert", after_insert)
+    event.listen(model, "after_delete", after_delete)
+    event.listen(model, "after_update", after_update)
+
+
+_track(Client, ("created_at",), _client_counters)
+_track(Report, ("status",), _report_counters)
+_track(DigitalSignature, ("end_date",), _signature_counters)
+_track(CalendarEvent, ("date",), _event_counters)
+
+
+# ---------- ночной пересчёт ----------
+
+class DashboardReconciler(DailyJob):
+    """
+    Раз в сутки (в hour часов по локальному времени) пересчитывает dashboard_counters
+    всех клиентских БД. hour < 0 — выключен.
+    """
+
+    name = "dashboard-reconcile"
+
+    def __init__(self, hour: int):
+        super().__init__(hour)
+        self._last_run: dict = {}
+
+    def run_once(self, database_names: list[str] | None = None) -> dict:
+        from app.migrations.runner import discover_tenant_databases
+
+        if database_names is None:
+            database_names = discover_tenant_databases(include_spares=False)
+        started = time.monotonic()
+        failed = []
+        for name in database_names:
+            if self._stopping.is_set():
+                break
+            was_open = client_db_manager.has_engine(name)
+            try:
+                DashboardRollup.reconcile(name)
+            except Exception as e:
+                failed.append(name)
+                logger.error(f"Пересчёт счётчиков дашборда БД {name} не удался: {e}")
+            finally:
+                # не держим пулы соединений БД, которые открыли только ради пересчёта
+                if not was_open:
+                    client_db_manager.dispose_engine(name)
+        self._last_run = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "databases": len(database_names),
+            "failed": failed,
+            "duration_sec": round(time.monotonic() - started, 1),
+        }
+        logger.info(f"Счётчики дашборда пересчитаны: {len(database_names) - len(failed)} из {len(database_names)} БД")
+        return self._last_run
+
+    def stats(self) -> dict:
+        return {"hour": self._hour, "last_run": self._last_run}
+
+
+# singleton
+dashboard_reconciler = DashboardReconciler(hour=settings.DASHBOARD_RECONCILE_HOUR)
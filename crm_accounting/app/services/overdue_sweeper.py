@@ -0,0 +1,127 @@
+# app/services/overdue_sweeper.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+
+from sqlalchemy import func, insert, literal, null, or_, select, update
+
+from app.core.config import settings
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import ClientReportHistory, Report, ReportPeriod
+from app.services.dashboard_rollup import ACTIVE_REPORT_STATUSES, OVERDUE_REPORT_STATUS, DashboardRollup
+from app.utils.business_calendar import business_calendar
+from app.utils.daily_job import DailyJob
+
+logger = logging.getLogger(__name__)
+
+# статусы несданных отчётов, которые становятся просроченными после срока
+PENDING_REPORT_STATUSES = ("не сдан", *ACTIVE_REPORT_STATUSES)
+OVERDUE_CHANGE_TYPE = "status"
+
+
+def _pending_overdue(cutoff: datetime) -> tuple:
+    """Условие «отчёт не сдан, а срок периода прошёл» — одно и то же для истории и UPDATE."""
+    expired_periods = select(ReportPeriod.id).where(ReportPeriod.end_date < cutoff)
+    return (
+        or_(Report.status.is_(None), Report.status.in_(PENDING_REPORT_STATUSES)),
+        Report.period_id.in_(expired_periods),
+    )
+
+
+def sweep_tenant(database_name: str, today: date | None = None) -> dict:
+    """
+    Переводит в «просрочен» несданные отчёты клиентской БД, у которых прошёл срок периода
+    (ReportPeriod.end_date с переносом на рабочий день, см. business_calendar.deadline_cutoff).
+    Два set-based запроса в одной транзакции: INSERT ... SELECT в историю (со старым статусом
+    в комментарии), затем UPDATE reports по тому же условию.
+    """
+    started = time.perf_counter()
+    cutoff = datetime.combine(business_calendar.deadline_cutoff(today), datetime.min.time())
+    condition = _pending_overdue(cutoff)
+    comment = literal(f"Статус изменён на «{OVERDUE_REPORT_STATUS}»: срок сдачи прошёл. Был: ") + func.coalesce(Report.status, "—")
+
+    with client_db_manager.get_engine(database_name).begin() as conn:
+        history = conn.execute(
+            insert(ClientReportHistory).from_select(
+                ["report_id", "changed_by", "change_type", "comment", "timestamp"],
+                select(Report.id, null(), literal(OVERDUE_CHANGE_TYPE), comment, literal(datetime.utcnow())).where(*condition),
+            )
+        ).rowcount
+        updated = conn.execute(
+            update(Report).where(*condition).values(status=OVERDUE_REPORT_STATUS)
+        ).rowcount
+
+    if updated:
+        # UPDATE в обход ORM — счётчики дашборда пересчитываем целиком
+        DashboardRollup.reconcile(database_name)
+    return {"updated": updated, "history": history, "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+class OverdueSweeper(DailyJob):
+    """
+    Раз в сутки (в hour часов) проставляет статус «просрочен» во всех клиентских БД:
+    по одному sweep_tenant на БД, не больше workers БД одновременно. hour < 0 — выключен.
+    """
+
+    name = "overdue-sweep"
+
+    def __init__(self, hour: int, workers: int):
+        super().__init__(hour)
+        self._workers = max(1, int(workers))
+        self._last_run: dict = {}
+
+    def _sweep_one(self, name: str, today: date | None) -> dict:
+        if self._stopping.is_set():
+            return {"skipped": True}
+        was_open = client_db_manager.has_engine(name)
+        try:
+            return sweep_tenant(name, today)
+        finally:
+            # не держим пулы соединений БД, которые открыли только ради прохода
+            if not was_open:
+                client_db_manager.dispose_engine(name)
+
+    def run_once(self, database_names: list[str] | None = None, today: date | None = None) -> dict:
+        """Один проход по database_names (по умолчанию — все клиентские БД, кроме запасных)."""
+        from app.migrations.runner import discover_tenant_databases
+
+        if database_names is None:
+            database_names = discover_tenant_databases(include_spares=False)
+        started = time.monotonic()
+        tenants, failed = {}, {}
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="overdue-sweep") as pool:
+            futures = {pool.submit(self._sweep_one, name, today): name for name in database_names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    tenants[name] = future.result()
+                except Exception as e:
+                    failed[name] = str(e)
+                    logger.error(f"Проставление просрочки в БД {name} не удалось: {e}")
+
+        swept = {name: r for name, r in tenants.items() if not r.get("skipped")}
+        slowest = sorted(swept.items(), key=lambda item: item[1]["duration_ms"], reverse=True)[:10]
+        self._last_run = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "databases": len(database_names),
+            "swept": len(swept),
+            "updated": sum(r["updated"] for r in swept.values()),
+            "changed_databases": sum(1 for r in swept.values() if r["updated"]),
+            "slowest": dict(slowest),
+            "failed": failed,
+            "duration_sec": round(time.monotonic() - started, 1),
+        }
+        logger.info(
+            f"Просрочка проставлена: {self._last_run['updated']} отчётов в {len(swept)} из {len(database_names)} БД "
+            f"за {self._last_run['duration_sec']} сек."
+        )
+        # в stats() — только сводка, полный разбор по БД — в результате вызова
+        return {**self._last_run, "tenants": swept}
+
+    def stats(self) -> dict:
+        return {"hour": self._hour, "workers": self._workers, "last_run": self._last_run}
+
+
+# singleton
+overdue_sweeper = OverdueSweeper(hour=settings.OVERDUE_SWEEP_HOUR, workers=settings.OVERDUE_SWEEP_WORKERS)
@@ -0,0 +1,218 @@
+# app/services/provisioning_service.py
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.managers.client_db_manager import client_db_manager
+from app.models.main_db import ProvisioningJob
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+
+class ProvisioningService:
+    """
+    Очередь заданий на создание клиентских БД. Состояние заданий хранится в основной БД (provisioning_jobs),
+    поэтому задание переживает перезапуск приложения и может быть взято любым экземпляром.
+    """
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> ProvisioningJob | None:
+        return db.query(ProvisioningJob).filter(ProvisioningJob.id == job_id).first()
+
+    @staticmethod
+    def status_url(job_id: int) -> str:
+        return f"/api/admin/provisioning/{job_id}"
+
+    @staticmethod
+    def claim_next(db: Session) -> ProvisioningJob | None:
+        """
+        Берёт в работу одно готовое к выполнению задание: pending с наступившим run_after
+        или running, «зависшее» дольше PROVISIONING_JOB_TIMEOUT (воркер упал).
+        Захват — условным UPDATE, поэтому одно задание не возьмут два воркера.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.PROVISIONING_JOB_TIMEOUT)
+        candidates = (
+            db.query(ProvisioningJob.id, ProvisioningJob.status)
+            .filter(
+                or_(
+                    (ProvisioningJob.status == "pending") & (ProvisioningJob.run_after <= now),
+                    (ProvisioningJob.status == "running") & (ProvisioningJob.locked_at < stale_before),
+                )
+            )
+            .order_by(ProvisioningJob.id)
+            .limit(5)
+            .all()
+        )
+        for job_id, status in candidates:
+            stmt = (
+                update(ProvisioningJob)
+                .where(ProvisioningJob.id == job_id, ProvisioningJob.status == status)
+                .values(status="running", locked_at=now, started_at=now, attempts=ProvisioningJob.attempts + 1)
+            )
+            if status == "running":
+                stmt = stmt.where(ProvisioningJob.locked_at < stale_before)
+            claimed = db.execute(stmt).rowcount
+            db.commit()
+            if claimed == 1:
+                return ProvisioningService.get_job(db, job_id)
+        return None
+
+    @staticmethod
+    def run_job(db: Session, job: ProvisioningJob) -> bool:
+        """
+        Выполняет задание. При ошибке планирует повтор с экспоненциальной задержкой,
+        после PROVISIONING_MAX_ATTEMPTS попыток помечает задание как failed.
+        """
+        job_id, client_id, attempts = job.id, job.client_organization_id, job.attempts
+        try:
+            UserService.provision_client_database(db, client_id)
+        except Exception as e:
+            db.rollback()
+            failed = attempts >= settings.PROVISIONING_MAX_ATTEMPTS
+            delay = settings.PROVISIONING_RETRY_DELAY * (2 ** (attempts - 1))
+            db.execute(
+                update(ProvisioningJob)
+                .where(ProvisioningJob.id == job_id)
+                .values(
+                    status="failed" if failed else "pending",
+                    last_error=str(e)[:4000],
+                    locked_at=None,
+                    run_after=datetime.utcnow() + timedelta(seconds=delay),
+                    finished_at=datetime.utcnow() if failed else None,
+                )
+            )
+            db.commit()
+            if failed:
+                logger.error(f"Задание #{job_id} (организация {client_id}) провалено после {attempts} попыток: {e}")
+            else:
+                logger.warning(f"Задание #{job_id} (организация {client_id}), попытка {attempts}: {e}; повтор через {delay} сек.")
+            return False
+
+        db.execute(
+            update(ProvisioningJob)
+            .where(ProvisioningJob.id == job_id)
+            .values(status="done", last_error=None, locked_at=None, finished_at=datetime.utcnow())
+        )
+        db.commit()
+        logger.info(f"Задание #{job_id}: БД организации {client_id} создана")
+        return True
+
+    @staticmethod
+    def status_counts(db: Session) -> dict:
+        rows = db.query(ProvisioningJob.status, func.count(ProvisioningJob.id)).group_by(ProvisioningJob.status).all()
+        return {status: count for status, count in rows}
+
+
+class ProvisioningWorkerPool:
+    """
+    Фоновые потоки, выполняющие задания ProvisioningService.
+    Воркеры опрашивают очередь раз в poll_interval секунд; notify() будит их сразу после постановки задания.
+    В простое первый воркер пополняет запас пустых БД до SPARE_DATABASE_POOL_SIZE.
+    """
+
+    def __init__(self, workers: int, poll_interval: float):
+        self._workers = max(0, int(workers))
+        self._poll_interval = float(poll_interval)
+        self._threads: list[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._in_progress = 0
+        self._succeeded = 0
+        self._failed_attempts = 0
+        self._finished_at = deque(maxlen=1000)  # monotonic-время успешных заданий
+        self._durations = deque(maxlen=1000)  # длительность успешных заданий, сек.
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping.clear()
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._loop, args=(i == 0,), name=f"provisioning-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Запущено воркеров создания БД: {self._workers}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def _loop(self, refill_spares: bool) -> None:
+        while not self._stopping.is_set():
+            try:
+                worked = self._run_once()
+                if not worked and refill_spares:
+                    # в простое первый воркер пополняет запас пустых БД (по одной за проход,
+                    # чтобы не задерживать новые задания)
+                    worked = self._refill_spares() > 0
+            except Exception as e:
+                logger.error(f"Ошибка воркера создания БД: {e}")
+                worked = False
+            if not worked:
+                self._wakeup.wait(self._poll_interval)
+                self._wakeup.clear()
+
+    def _run_once(self) -> bool:
+        with SessionLocal() as db:
+            job = ProvisioningService.claim_next(db)
+            if job is None:
+                return False
+
+            with self._lock:
+                self._in_progress += 1
+            started = time.monotonic()
+            ok = False
+            try:
+                ok = ProvisioningService.run_job(db, job)
+            finally:
+                with self._lock:
+                    self._in_progress -= 1
+                    if ok:
+                        self._succeeded += 1
+                        self._durations.append(time.monotonic() - started)
+                        self._finished_at.append(time.monotonic())
+                    else:
+                        self._failed_attempts += 1
+            return True
+
+    def _refill_spares(self) -> int:
+        if settings.SPARE_DATABASE_POOL_SIZE <= 0:
+            return 0
+        with SessionLocal() as db:
+            return client_db_manager.refill_spare_pool(db, limit=1)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            durations = list(self._durations)
+            last_minute = sum(1 for t in self._finished_at if now - t <= 60)
+            return {
+                "workers": self._workers,
+                "in_progress": self._in_progress,
+                "succeeded": self._succeeded,
+                "failed_attempts": self._failed_attempts,
+                "completed_last_minute": last_minute,
+                "avg_duration_sec": round(sum(durations) / len(durations), 2) if durations else None,
+            }
+
+
+# singleton
+provisioning_workers = ProvisioningWorkerPool(
+    workers=settings.PROVISIONING_WORKERS,
+    poll_interval=settings.PROVISIONING_POLL_INTERVAL,
+)
@@ -0,0 +1,133 @@
+# app/services/tenant_fanout.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from app.core.config import settings
+from app.core.db_backend import db_backend
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import Client, DigitalSignature, Report
+from app.models.main_db import ClientOrganization
+from app.services.dashboard_rollup import OVERDUE_REPORT_STATUS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TenantTarget:
+    organization_id: int
+    organization_name: str | None
+    database_name: str
+
+
+@dataclass
+class TenantResult:
+    organization_id: int
+    organization_name: str | None
+    database_name: str
+    rows: list[dict] = field(default_factory=list)
+    error: str | None = None
+    timed_out: bool = False
+    duration_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class TenantFanout:
+    """
+    Выполнение одного запроса к моделям ClientBase во всех клиентских БД: не больше workers БД
+    одновременно, у каждой — таймаут запроса timeout сек. (db_backend.query_timeout). Результаты
+    отдаются по мере готовности; ошибка или таймаут одной БД не прерывают остальные.
+    """
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = max(1, int(workers))
+        self.timeout = float(timeout)
+
+    @staticmethod
+    def active_tenants(db: Session) -> list[TenantTarget]:
+        rows = db.execute(
+            select(ClientOrganization.id, ClientOrganization.company_name, ClientOrganization.database_name)
+            .where(ClientOrganization.is_active.isnot(False), ClientOrganization.database_name.isnot(None))
+            .order_by(ClientOrganization.id)
+        ).all()
+        return [TenantTarget(r.id, r.company_name, r.database_name) for r in rows]
+
+    def _run_one(self, target: TenantTarget, statement: Executable) -> TenantResult:
+        result = TenantResult(target.organization_id, target.organization_name, target.database_name)
+        started = time.perf_counter()
+        was_open = client_db_manager.has_engine(target.database_name)
+        try:
+            with client_db_manager.get_engine(target.database_name).connect() as conn:
+                with db_backend.query_timeout(conn, self.timeout):
+                    result.rows = [dict(row._mapping) for row in conn.execute(statement)]
+        except OperationalError as e:
+            result.timed_out = time.perf_counter() - started >= self.timeout
+            result.error = "Превышено время ожидания" if result.timed_out else str(e.orig)
+        except Exception as e:
+            result.error = str(e)
+        finally:
+            # не держим пулы соединений БД, которые открыли только ради этого запроса
+            if not was_open:
+                client_db_manager.dispose_engine(target.database_name)
+        result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if result.error:
+            logger.warning(f"Запрос к БД {target.database_name} не выполнен: {result.error}")
+        return result
+
+    def stream(self, statement: Executable, targets: list[TenantTarget]) -> Iterator[TenantResult]:
+        """Результаты по БД в порядке готовности. Если перестать читать, незапущенные запросы отменяются."""
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tenant-fanout")
+        try:
+            futures = [pool.submit(self._run_one, target, statement) for target in targets]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, statement: Executable, targets: list[TenantTarget]) -> list[TenantResult]:
+        return list(self.stream(statement, targets))
+
+
+# singleton
+tenant_fanout = TenantFanout(workers=settings.ANALYTICS_FANOUT_WORKERS, timeout=settings.ANALYTICS_TENANT_TIMEOUT)
+
+
+# ---------- запросы для админки ----------
+
+def expiring_signatures(days: int = 30) -> Executable:
+    """ЭЦП, срок которых истекает в ближайшие days дней."""
+    now = datetime.now()
+    return (
+        select(
+            DigitalSignature.id,
+            DigitalSignature.client_id,
+            func.coalesce(Client.short_name, Client.full_name).label("client_name"),
+            DigitalSignature.owner_name,
+            DigitalSignature.end_date,
+        )
+        .join(Client, Client.id == DigitalSignature.client_id)
+        .where(DigitalSignature.end_date >= now, DigitalSignature.end_date <= now + timedelta(days=days))
+        .order_by(DigitalSignature.end_date)
+    )
+
+
+def overdue_reports() -> Executable:
+    """Число просроченных отчётов (одна строка на БД)."""
+    return select(func.count(Report.id).label("overdue_reports")).where(Report.status == OVERDUE_REPORT_STATUS)
+
+
+# имя -> построитель запроса по горизонту days (дней)
+ANALYTICS_QUERIES: dict[str, Callable[[int], Executable]] = {
+    "expiring-signatures": expiring_signatures,
+    "overdue-reports": lambda days: overdue_reports(),
+}
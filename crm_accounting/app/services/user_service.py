@@ -1,10 +1,12 @@
 # app/services/user_service.py
 import logging
-from sqlalchemy.orm import Session
-from app.models.main_db import ClientUser, ClientOrganization, UserProfile
-from app.core.security import get_password_hash, verify_password
+from sqlalchemy.orm import Session, joinedload
+from app.models.main_db import ClientUser, ClientOrganization, UserProfile, ProvisioningJob
+from app.core.db_executor import run_db
+from app.core.security import password_hasher, PasswordHashQueueFull
 from app.managers.client_db_manager import client_db_manager
 from app.models.client_template import ClientUser as ClientUserTemplate
+from app.utils.tenant_context import tenant_cache
 
 logger = logging.getLogger(__name__)
 
@@ -15,30 +17,60 @@ class UserService:
     """
 
     # ---------------------------------------------------------
-    # 1️⃣ Создание клиентской организации + автосоздание БД
+    # 1️⃣ Создание клиентской организации + постановка задания на создание БД
     # ---------------------------------------------------------
     @staticmethod
-    def create_client_organization(db: Session, company_name: str, notes: str | None = None) -> ClientOrganization:
+    def create_client_organization(db: Session, company_name: str, notes: str | None = None):
+        """
+        Создаёт клиентскую организацию и задание на создание её БД (в одной транзакции).
+        Если в запасе есть заранее созданная БД, она закрепляется за организацией сразу;
+        иначе БД создаётся фоновыми воркерами — см. ProvisioningService.
+        Возвращает (организация, задание).
+        """
         try:
             client = ClientOrganization(company_name=company_name, notes=notes, is_active=True)
             db.add(client)
-            db.commit()
-            db.refresh(client)
+            db.flush()
 
-            # Автоматическое создание клиентской БД
-            db_name = f"client_{client.id}"
-            created_name = client_db_manager.create_client_database(client, database_name=db_name)
-            client.database_name = created_name
+            # если есть готовая запасная БД — организация получает её сразу,
+            # фоновому заданию останется только заполнить начальные данные
+            client.database_name = client_db_manager.claim_spare_database(db, client.id)
+
+            job = ProvisioningJob(client_organization_id=client.id, status="pending")
+            db.add(job)
             db.commit()
             db.refresh(client)
+            db.refresh(job)
 
-            logger.info(f"Клиентская БД создана автоматически: {created_name}")
-            return client
+            logger.info(f"Клиентская организация {client.id} создана, задание на создание БД #{job.id} в очереди")
+            return client, job
         except Exception as e:
             db.rollback()
-            logger.error(f"Ошибка создания клиентской организации/БД: {e}")
+            logger.error(f"Ошибка создания клиентской организации: {e}")
             raise
 
+    @staticmethod
+    def provision_client_database(db: Session, client_organization_id: int) -> str:
+        """
+        Создаёт БД клиента (если её ещё нет), сохраняет её имя в организации
+        и зеркалирует в неё пользователей организации. Повторный вызов безопасен.
+        """
+        client = db.query(ClientOrganization).filter(ClientOrganization.id == client_organization_id).first()
+        if not client:
+            raise ValueError(f"Клиентская организация {client_organization_id} не найдена")
+
+        db_name = client.database_name or f"client_{client.id}"
+        created_name = client_db_manager.create_client_database(client, database_name=db_name)
+        if client.database_name != created_name:
+            client.database_name = created_name
+            db.commit()
+            db.refresh(client)
+        tenant_cache.invalidate(client.id)
+
+        UserService.mirror_client_users(db, client)
+        logger.info(f"Клиентская БД готова: {created_name}")
+        return created_name
+
     # ---------------------------------------------------------
     # 2️⃣ Создание пользователя клиента (основная + клиентская БД)
     # ---------------------------------------------------------
@@ -48,13 +80,15 @@ class UserService:
         client_organization_id: int,
         email: str,
         login: str,
-        password: str,
+        hashed_password: str,
         full_name: str,
         phone: str | None = None
     ):
         """
         Создаёт пользователя клиента в основной БД и дублирует его в клиентской БД.
         Назначает профиль "Владелец", если это первый пользователь клиента.
+        Если БД клиента ещё создаётся, пользователь будет зеркалирован при её создании.
+        Пароль передаётся уже хешированным: bcrypt считается в пуле password_hasher, а не в пуле потоков БД.
         """
         try:
             owner_profile = (
@@ -68,12 +102,15 @@ class UserService:
                 db.commit()
                 db.refresh(owner_profile)
 
-            hashed = get_password_hash(password)
+            client_org = db.query(ClientOrganization).filter(ClientOrganization.id == client_organization_id).first()
+            if not client_org:
+                raise ValueError("Клиентская организация не найдена")
+
             user = ClientUser(
                 client_organization_id=client_organization_id,
                 email=email,
                 login=login,
-                hashed_password=hashed,
+                hashed_password=hashed_password,
                 full_name=full_name,
                 phone=phone,
                 profile_id=owner_profile.id,
@@ -83,24 +120,10 @@ class UserService:
             db.commit()
             db.refresh(user)
 
-            client_org = db.query(ClientOrganization).filter(ClientOrganization.id == client_organization_id).first()
-            if not client_org or not client_org.database_name:
-                raise ValueError("Не найдена клиентская БД для зеркалирования пользователя")
-
-            session = client_db_manager.get_client_session(client_org.database_name)
-            try:
-                tpl_user = ClientUserTemplate(
-                    main_user_id=user.id,
-                    full_name=full_name,
-                    email=email,
-                    login=login,
-                    hashed_password=user.hashed_password,
-                    is_active=True,
-                )
-                session.add(tpl_user)
-                session.commit()
-            finally:
-                session.close()
+            if client_org.database_name:
+                UserService.mirror_client_users(db, client_org)
+            else:
+                logger.info(f"БД организации {client_organization_id} ещё создаётся, пользователь {login} будет зеркалирован позже")
 
             logger.info(f"Пользователь {login} создан успешно (организация ID={client_organization_id})")
             return user
@@ -110,22 +133,75 @@ class UserService:
             logger.error(f"Ошибка создания пользователя клиента: {e}")
             raise
 
+    @staticmethod
+    def mirror_client_users(db: Session, client_org: ClientOrganization) -> int:
+        """
+        Дублирует в клиентскую БД пользователей организации из основной БД, которых там ещё нет
+        (сверка по main_user_id). Возвращает количество добавленных.
+        """
+        users = db.query(ClientUser).filter(ClientUser.client_organization_id == client_org.id).all()
+        if not users:
+            return 0
+
+        session = client_db_manager.get_client_session(client_org.database_name)
+        try:
+            existing = {
+                row[0]
+                for row in session.query(ClientUserTemplate.main_user_id)
+                .filter(ClientUserTemplate.main_user_id.in_([u.id for u in users]))
+                .all()
+            }
+            added = 0
+            for user in users:
+                if user.id in existing:
+                    continue
+                session.add(ClientUserTemplate(
+                    main_user_id=user.id,
+                    full_name=user.full_name,
+                    email=user.email,
+                    login=user.login,
+                    hashed_password=user.hashed_password,
+                    is_active=user.is_active,
+                ))
+                added += 1
+            session.commit()
+            return added
+        finally:
+            session.close()
+
     # ---------------------------------------------------------
     # 3️⃣ Аутентификация пользователя клиента (вход)
     # ---------------------------------------------------------
     @staticmethod
-    def authenticate_client_user(db: Session, login: str, password: str):
+    def get_client_user_for_login(db: Session, login: str):
+        """
+        Загружает пользователя клиента вместе с организацией и сразу освобождает соединение основной БД,
+        чтобы оно не удерживалось на время проверки пароля.
+        """
+        user = (
+            db.query(ClientUser)
+            .options(joinedload(ClientUser.client_organization))
+            .filter(ClientUser.login == login)
+            .first()
+        )
+        db.close()
+        return user
+
+    @staticmethod
+    async def authenticate_client_user(db: Session, login: str, password: str):
         """
         Проверяет логин и пароль пользователя клиента.
         Возвращает объект пользователя при успешной проверке.
+        Поиск пользователя выполняется в пуле потоков БД, bcrypt — в отдельном пуле password_hasher;
+        при переполнении его очереди поднимается PasswordHashQueueFull.
         """
         try:
-            user = db.query(ClientUser).filter(ClientUser.login == login).first()
+            user = await run_db(UserService.get_client_user_for_login, db, login)
             if not user:
                 logger.warning(f"Попытка входа: пользователь '{login}' не найден.")
                 return None
 
-            if not verify_password(password, user.hashed_password):
+            if not await password_hasher.verify(password, user.hashed_password):
                 logger.warning(f"Попытка входа: неверный пароль для '{login}'.")
                 return None
 
@@ -136,6 +212,9 @@ class UserService:
             logger.info(f"Пользователь '{login}' успешно аутентифицирован.")
             return user
 
+        except PasswordHashQueueFull:
+            logger.warning(f"Попытка входа '{login}' отклонена: очередь проверки паролей переполнена.")
+            raise
         except Exception as e:
             logger.error(f"Ошибка аутентификации пользователя '{login}': {e}")
             raise
@@ -2,6 +2,7 @@ import logging
 from app.managers.client_db_manager import client_db_manager
 from app.core.database import get_main_db
 from app.models.main_db import ClientOrganization
+from app.utils.tenant_context import tenant_cache
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,7 @@ def create_database_for_client(client_id: int, db: Session):
         # Обновляем запись клиента
         client.database_name = database_name
         db.commit()
+        tenant_cache.invalidate(client_id)
         
         logger.info(f"Автоматически создана БД для клиента {client_id}: {database_name}")
         return True
@@ -0,0 +1,160 @@
+# app/utils/business_calendar.py
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALENDAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "production_calendar.json")
+
+
+def _as_day(value) -> np.datetime64:
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+class _Days:
+    """
+    Предрасчёт на диапазон лет (неизменяемый, заменяется целиком при расширении):
+    working[i]  — i-й день от origin рабочий;
+    rank[i]     — число рабочих дней в [origin, i-й день];
+    positions   — индексы рабочих дней по порядку.
+    """
+
+    __slots__ = ("first_year", "last_year", "origin", "working", "rank", "positions")
+
+    def __init__(self, first_year: int, last_year: int, holidays: set, workdays: set):
+        self.first_year, self.last_year = first_year, last_year
+        self.origin = np.datetime64(f"{first_year}-01-01", "D")
+        days = np.arange(self.origin, np.datetime64(f"{last_year + 1}-01-01", "D"))
+        # 1970-01-01 — четверг: (n + 3) % 7 — номер дня недели с понедельника = 0
+        working = (days.astype(np.int64) + 3) % 7 < 5
+        if holidays:
+            working[np.isin(days, np.array(sorted(holidays), dtype="datetime64[D]"))] = False
+        if workdays:
+            working[np.isin(days, np.array(sorted(workdays), dtype="datetime64[D]"))] = True
+        self.working = working
+        self.rank = np.cumsum(working)
+        self.positions = np.flatnonzero(working)
+
+
+class BusinessCalendar:
+    """
+    Производственный календарь: рабочие дни с учётом праздников и переносов.
+
+    Годы из файла берутся как есть, остальные — «суббота и воскресенье выходные». Все операции —
+    O(1) по предрасчитанным массивам (см. _Days); у каждой есть векторный вариант для массивов дат
+    datetime64[D]. Диапазон лет расширяется автоматически при обращении к дате за его пределами.
+    """
+
+    def __init__(self, holidays=(), workdays=(), known_years=()):
+        self._holidays = {_as_day(d) for d in holidays}
+        self._workdays = {_as_day(d) for d in workdays}
+        self.known_years = sorted(set(known_years))
+        self._lock = threading.Lock()
+        this_year = date.today().year
+        self._days = self._build(min([this_year - 1, *self.known_years]), max([this_year + 2, *self.known_years]))
+
+    @classmethod
+    def from_file(cls, path: str) -> "BusinessCalendar":
+        """
+        JSON: {"years": {"2025": {"holidays": ["2025-01-01", ...], "workdays": ["2025-11-01"]}, ...}}.
+        Нет файла — календарь только с выходными (с предупреждением в лог).
+        """
+        if not os.path.exists(path):
+            logger.warning(f"Производственный календарь {path} не найден — праздники не учитываются")
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            years = json.load(f).get("years", {})
+        holidays, workdays = [], []
+        for year, days in years.items():
+            holidays += [date.fromisoformat(d) for d in days.get("holidays", [])]
+            workdays += [date.fromisoformat(d) for d in days.get("workdays", [])]
+        return cls(holidays, workdays, known_years=[int(y) for y in years])
+
+    def _build(self, first_year: int, last_year: int) -> _Days:
+        return _Days(first_year, last_year, self._holidays, self._workdays)
+
+    def _covering(self, lo: np.datetime64, hi: np.datetime64) -> _Days:
+        """Предрасчёт, в который входят дни lo..hi (с запасом в год на «следующий рабочий день»)."""
+        days = self._days
+        lo_year = int(lo.astype("datetime64[Y]").astype(np.int64)) + 1970
+        hi_year = int(hi.astype("datetime64[Y]").astype(np.int64)) + 1970 + 1
+        if days.first_year <= lo_year and hi_year <= days.last_year:
+            return days
+        with self._lock:
+            days = self._days
+            if days.first_year > lo_year or hi_year > days.last_year:
+                days = self._days = self._build(min(days.first_year, lo_year), max(days.last_year, hi_year))
+            return days
+
+    # ---------- одна дата ----------
+
+    def is_working_day(self, day) -> bool:
+        d = _as_day(day)
+        days = self._covering(d, d)
+        return bool(days.working[int((d - days.origin).astype(np.int64))])
+
+    def next_working_day(self, day) -> date:
+        """Сам день, если он рабочий, иначе ближайший следующий рабочий (перенос срока с выходного)."""
+        return self.next_working_days(np.array([_as_day(day)]))[0].item()
+
+    def add_business_days(self, day, n: int) -> date:
+        """n-й рабочий день после day (n=0 — то же, что next_working_day)."""
+        return self.add_business_days_array(np.array([_as_day(day)]), n)[0].item()
+
+    def is_overdue(self, deadline, today=None) -> bool:
+        """Срок прошёл: сегодня позже срока, перенесённого на рабочий день."""
+        return _as_day(today or date.today()) > _as_day(self.next_working_day(deadline))
+
+    def deadline_cutoff(self, today=None) -> date:
+        """
+        Граница просрочки на сегодня: сроки раньше этой даты прошли с учётом переноса на рабочий день
+        (день после последнего рабочего дня до сегодняшнего). Для условий вида end_date < cutoff в SQL.
+        """
+        d = _as_day(today or date.today())
+        days = self._covering(d - np.timedelta64(366, "D"), d)
+        index = int((d - days.origin).astype(np.int64))
+        working_before = int(days.rank[index] - days.working[index])
+        return (days.origin + np.timedelta64(int(days.positions[working_before - 1]) + 1, "D")).item()
+
+    # ---------- массивы дат ----------
+
+    def next_working_days(self, dates) -> np.ndarray:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if not dates.size:
+            return dates
+        days = self._covering(dates.min(), dates.max())
+        index = (dates - days.origin).astype(np.int64)
+        # rank[i] рабочих дней до i включительно: для рабочего дня его позиция — rank - 1, для выходного
+        # следующий рабочий — позиция rank
+        position = days.rank[index] - days.working[index]
+        return days.origin + days.positions[position].astype("timedelta64[D]")
+
+    def add_business_days_array(self, dates, n) -> np.ndarray:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        n = np.asarray(n, dtype=np.int64)
+        if (n < 0).any():
+            raise ValueError("Число рабочих дней должно быть неотрицательным")
+        if not dates.size:
+            return dates
+        # запас на n рабочих дней вперёд: не больше 2n календарных + праздники, берём с избытком
+        days = self._covering(dates.min(), dates.max() + np.timedelta64(int(n.max()) * 2 + 30, "D"))
+        index = (dates - days.origin).astype(np.int64)
+        position = np.where(n == 0, days.rank[index] - days.working[index], days.rank[index] - 1 + n)
+        return days.origin + days.positions[position].astype("timedelta64[D]")
+
+    def overdue_mask(self, deadlines, today=None) -> np.ndarray:
+        """Векторный is_overdue для массива сроков."""
+        return _as_day(today or date.today()) > self.next_working_days(deadlines)
+
+
+# singleton
+business_calendar = BusinessCalendar.from_file(settings.PRODUCTION_CALENDAR_PATH or DEFAULT_CALENDAR_PATH)
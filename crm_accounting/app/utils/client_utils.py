@@ -1,45 +1,117 @@
 # app/utils/client_utils.py
 import logging
+import threading
+import time
 from types import SimpleNamespace
-from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.models.main_db import ClientOrganization
+from app.core.config import settings
 from app.managers.client_db_manager import client_db_manager
 from app.models.client_template import CompanySettings
+from app.utils.tenant_context import TenantContext
 
 logger = logging.getLogger(__name__)
 
 
-def get_client_company_settings(db: Session, client_id: int) -> SimpleNamespace:
+class CompanySettingsCache:
+    """
+    Кэш настроек шапки портала (название компании, логотип) по client_id.
+    Запись обновляется сразу при изменении настроек (write-through), TTL — страховка
+    на случай правки данных в обход приложения.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = float(ttl)
+        self._items: dict[int, tuple[float, SimpleNamespace]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, client_id: int) -> SimpleNamespace | None:
+        with self._lock:
+            item = self._items.get(client_id)
+            if item is not None and item[0] > time.monotonic():
+                return item[1]
+        return None
+
+    def put(self, client_id: int, value: SimpleNamespace) -> None:
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            self._items[client_id] = (time.monotonic() + self._ttl, value)
+
+    def invalidate(self, client_id: int | None = None) -> None:
+        with self._lock:
+            if client_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(client_id, None)
+
+
+# singleton
+company_settings_cache = CompanySettingsCache(ttl=settings.COMPANY_SETTINGS_CACHE_TTL)
+
+
+def _header_settings(cs: CompanySettings | None, tenant: TenantContext) -> SimpleNamespace:
+    company_name = (cs.company_name if cs else None) or tenant.company_name or "Моя компания"
+    logo = cs.logo_path if cs else None
+    return SimpleNamespace(company_name=company_name, logo=logo)
+
+
+def get_client_company_settings(tenant: TenantContext) -> SimpleNamespace:
     """
     Возвращает объект с полями company_name и logo для шапки клиентского портала.
-    Гарантирует наличие полей, даже если запись в клиентской БД отсутствует.
+    Для «тёплых» клиентов берётся из кэша без обращения к клиентской БД.
+    Запись CompanySettings создаётся при создании БД клиента; если её нет — отдаются значения по умолчанию.
     """
-    org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
-    if not org or not org.database_name:
-        return SimpleNamespace(company_name="Моя компания", logo=None)
+    cached = company_settings_cache.get(tenant.id)
+    if cached is not None:
+        return cached
+
+    if not tenant.database_name:
+        return SimpleNamespace(company_name=tenant.company_name or "Моя компания", logo=None)
 
-    session = client_db_manager.get_client_session(org.database_name)
+    session = client_db_manager.get_client_session(tenant.database_name)
     try:
-        cs = session.query(CompanySettings).first()
-        if not cs:
-            cs = CompanySettings(company_name=org.company_name or "Моя компания")
-            session.add(cs)
-            session.commit()
-            session.refresh(cs)
+        cs = session.query(CompanySettings).order_by(CompanySettings.id).first()
+        result = _header_settings(cs, tenant)
+    except Exception as e:
+        logger.error(f"Ошибка получения настроек компании для клиента {tenant.id}: {e}")
+        return SimpleNamespace(company_name=tenant.company_name or "Моя компания", logo=None)
+    finally:
+        session.close()
 
-        company_name = getattr(cs, "company_name", None) or "Моя компания"
-        logo = getattr(cs, "logo", None) if hasattr(cs, "logo") else None
+    company_settings_cache.put(tenant.id, result)
+    return result
 
-        return SimpleNamespace(company_name=company_name, logo=logo)
 
-    except Exception as e:
-        logger.error(f"Ошибка получения настроек компании для клиента {client_id}: {e}")
-        return SimpleNamespace(company_name="Моя компания", logo=None)
+def update_client_company_settings(
+    tenant: TenantContext,
+    company_name: str,
+    logo_path: str | None = None,
+) -> SimpleNamespace:
+    """
+    Сохраняет настройки компании в клиентской БД и сразу обновляет кэш шапки.
+    """
+    session = client_db_manager.get_client_session(tenant.database_name)
+    try:
+        cs = session.query(CompanySettings).order_by(CompanySettings.id).first()
+        if not cs:
+            cs = CompanySettings()
+            session.add(cs)
+        cs.company_name = company_name
+        if logo_path is not None:
+            cs.logo_path = logo_path
+        session.commit()
+        result = _header_settings(cs, tenant)
+    except Exception:
+        session.rollback()
+        company_settings_cache.invalidate(tenant.id)
+        raise
     finally:
         session.close()
 
+    company_settings_cache.put(tenant.id, result)
+    return result
+
 
 def get_today_date() -> str:
     """
@@ -0,0 +1,53 @@
+# app/utils/daily_job.py
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class DailyJob(ABC):
+    """
+    Фоновый поток, раз в сутки (в hour часов по локальному времени) вызывающий run_once().
+    hour < 0 — выключен. Наследники реализуют run_once() и проверяют self._stopping между
+    обработкой клиентских БД, чтобы остановка приложения не ждала конца прохода.
+    """
+
+    name = "daily-job"
+
+    def __init__(self, hour: int):
+        self._hour = int(hour)
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None or self._hour < 0:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _seconds_until_next_run(self) -> float:
+        now = datetime.now()
+        next_run = now.replace(hour=self._hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    def _loop(self) -> None:
+        while not self._stopping.wait(self._seconds_until_next_run()):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Ошибка фонового задания {self.name}: {e}")
+
+    @abstractmethod
+    def run_once(self, database_names: list[str] | None = None) -> dict:
+        """Один проход по клиентским БД (по умолчанию — всем); возвращает сводку."""
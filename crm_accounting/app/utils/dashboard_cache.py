@@ -0,0 +1,138 @@
+# app/utils/dashboard_cache.py
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.client_template import CalendarEvent, Client, DigitalSignature, Report
+
+logger = logging.getLogger(__name__)
+
+# изменение этих моделей меняет данные дашборда
+_DASHBOARD_MODELS = (Client, Report, DigitalSignature, CalendarEvent)
+
+
+class _InFlight:
+    """Вычисление, которое уже выполняет один из потоков; остальные ждут его результат."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+
+
+class DashboardCache:
+    """
+    Read-through кэш данных дашборда по имени клиентской БД с коротким TTL.
+
+    - одновременные промахи по одному ключу схлопываются: считает один поток, остальные ждут
+      его результат (single-flight), поэтому утренний наплыв не множит одинаковые запросы к БД;
+    - запись сбрасывается после commit сессии, изменившей клиентов, отчёты, ЭЦП или события
+      календаря (см. обработчики ниже); TTL ограничивает устаревание при правках из других процессов;
+    - ошибку вычисления получают все ожидающие, в кэш она не попадает.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = float(ttl)
+        self._items: dict[str, tuple[float, Any]] = {}
+        self._in_flight: dict[str, _InFlight] = {}
+        self._generation: dict[str, int] = {}  # счётчик сбросов по ключу
+        self._epoch = 0  # счётчик полных сбросов
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._invalidations = 0
+
+    def get(self, database_name: str, loader: Callable[[str], Any]) -> Any:
+        with self._lock:
+            item = self._items.get(database_name)
+            if item is not None and item[0] > time.monotonic():
+                self._hits += 1
+                return item[1]
+            flight = self._in_flight.get(database_name)
+            if flight is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                self._misses += 1
+                flight = self._in_flight[database_name] = _InFlight()
+                generation = (self._epoch, self._generation.get(database_name, 0))
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader(database_name)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(database_name, None)
+                # если за время вычисления запись сбросили — результат мог устареть, не кэшируем
+                if flight.error is None and self._ttl > 0 and (self._epoch, self._generation.get(database_name, 0)) == generation:
+                    self._items[database_name] = (time.monotonic() + self._ttl, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, database_name: str | None = None) -> None:
+        with self._lock:
+            self._invalidations += 1
+            if database_name is None:
+                self._items.clear()
+                self._epoch += 1
+            else:
+                self._items.pop(database_name, None)
+                self._generation[database_name] = self._generation.get(database_name, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "ttl": self._ttl,
+                "entries": len(self._items),
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "invalidations": self._invalidations,
+                "hit_ratio": round((self._hits + self._coalesced) / lookups, 3) if lookups else None,
+            }
+
+
+# singleton
+dashboard_cache = DashboardCache(ttl=settings.DASHBOARD_CACHE_TTL)
+
+
+# ---------- сброс при записи ----------
+# Сессии клиентских БД несут имя БД в session.info["database_name"] (см. EngineRegistry).
+
+@event.listens_for(Session, "after_flush")
+def _mark_dashboard_dirty(session, flush_context):
+    if "database_name" not in session.info:
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _DASHBOARD_MODELS):
+            session.info["dashboard_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("dashboard_dirty", False):
+        dashboard_cache.invalidate(session.info["database_name"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction):
+    session.info.pop("dashboard_dirty", None)
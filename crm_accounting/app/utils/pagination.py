@@ -0,0 +1,110 @@
+# app/utils/pagination.py
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Query, Request
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query as SAQuery
+
+from app.core.config import settings
+
+
+class PageParams:
+    """
+    Параметры постраничного вывода (dependency): ?after=<id> — следующая страница
+    (записи после указанной), ?before=<id> — предыдущая, ?limit= — размер страницы
+    (не больше PORTAL_MAX_PAGE_SIZE).
+    """
+
+    def __init__(
+        self,
+        after: int | None = Query(None, ge=1),
+        before: int | None = Query(None, ge=1),
+        limit: int = Query(settings.PORTAL_PAGE_SIZE, ge=1),
+    ):
+        self.after = after
+        self.before = before if after is None else None
+        self.limit = min(limit, settings.PORTAL_MAX_PAGE_SIZE)
+
+
+@dataclass
+class Page:
+    items: list[Any]
+    limit: int
+    has_next: bool
+    has_prev: bool
+    first_id: int | None = None
+    last_id: int | None = None
+    next_url: str | None = field(default=None)
+    prev_url: str | None = field(default=None)
+
+    def with_links(self, request: Request) -> "Page":
+        """Ссылки на соседние страницы с сохранением остальных параметров запроса (фильтров и т.п.)."""
+        url = request.url.remove_query_params(["after", "before"])
+
+        def relative(u) -> str:
+            return f"{u.path}?{u.query}"
+
+        if self.has_next and self.last_id is not None:
+            self.next_url = relative(url.include_query_params(after=self.last_id))
+        if self.has_prev and self.first_id is not None:
+            self.prev_url = relative(url.include_query_params(before=self.first_id))
+        return self
+
+
+def _after(sort_column, id_column, value, cursor_id: int, descending: bool):
+    """
+    Условие «строго после курсора» для ORDER BY sort_column, id (в одном направлении).
+    NULL считается меньше любого значения (как в SQL Server и SQLite): при возрастании — в начале, при убывании — в конце.
+    """
+    if descending:
+        if value is None:
+            return and_(sort_column.is_(None), id_column < cursor_id)
+        return or_(sort_column < value, and_(sort_column == value, id_column < cursor_id), sort_column.is_(None))
+    if value is None:
+        return or_(and_(sort_column.is_(None), id_column > cursor_id), sort_column.isnot(None))
+    return or_(sort_column > value, and_(sort_column == value, id_column > cursor_id))
+
+
+def keyset_page(query: SAQuery, id_column, params: PageParams, sort_column=None, descending: bool = True) -> Page:
+    """
+    Страница записей (keyset): ORDER BY [sort_column,] id ... LIMIT limit + 1, продолжение — от записи-курсора
+    (?after=<id> / ?before=<id>), а не через OFFSET. Стоимость запроса не зависит от номера страницы,
+    если по sort_column есть индекс.
+    """
+    limit = params.limit
+    cursor_id = params.before if params.before is not None else params.after
+    backwards = params.before is not None
+    # при движении назад выбираем в обратном порядке и разворачиваем результат
+    desc = descending != backwards
+
+    if cursor_id is not None:
+        if sort_column is None:
+            query = query.filter(id_column < cursor_id if desc else id_column > cursor_id)
+        else:
+            # значение сортировки берём у записи-курсора: в URL остаётся только её id
+            row = query.session.query(sort_column).filter(id_column == cursor_id).first()
+            if row is not None:
+                query = query.filter(_after(sort_column, id_column, row[0], cursor_id, desc))
+            else:
+                query = query.filter(id_column < cursor_id if desc else id_column > cursor_id)
+
+    order = [c.desc() if desc else c.asc() for c in (sort_column, id_column) if c is not None]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    more = len(rows) > limit
+    items = rows[:limit]
+    if backwards:
+        items.reverse()
+        has_next, has_prev = True, more
+    else:
+        has_next, has_prev = more, cursor_id is not None
+
+    key = id_column.key
+    return Page(
+        items=items,
+        limit=limit,
+        has_next=has_next and bool(items),
+        has_prev=has_prev and bool(items),
+        first_id=getattr(items[0], key) if items else None,
+        last_id=getattr(items[-1], key) if items else None,
+    )
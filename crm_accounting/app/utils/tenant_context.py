@@ -0,0 +1,90 @@
+# app/utils/tenant_context.py
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_main_db
+from app.models.main_db import ClientOrganization
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TenantContext:
+    """
+    Данные клиентской организации, нужные каждой странице портала.
+    """
+    id: int
+    database_name: str | None
+    company_name: str | None
+    is_active: bool
+
+    @property
+    def display_name(self) -> str:
+        return self.company_name or "Клиент"
+
+
+class TenantCache:
+    """
+    In-process кэш client_id -> TenantContext с TTL.
+    Кэшируются только организации с уже созданной БД; сброс — через invalidate().
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = float(ttl)
+        self._items: dict[int, tuple[float, TenantContext]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, client_id: int) -> TenantContext | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(client_id)
+            if item is not None and item[0] > now:
+                return item[1]
+
+        org = db.query(ClientOrganization).filter(ClientOrganization.id == client_id).first()
+        if not org:
+            return None
+
+        tenant = TenantContext(
+            id=org.id,
+            database_name=org.database_name,
+            company_name=org.company_name,
+            is_active=org.is_active is not False,  # NULL — как в остальных выборках (isnot(False))
+        )
+        if tenant.database_name and self._ttl > 0:
+            with self._lock:
+                self._items[client_id] = (now + self._ttl, tenant)
+        return tenant
+
+    def invalidate(self, client_id: int | None = None) -> None:
+        """Сбрасывает запись одной организации (или весь кэш, если client_id не указан)."""
+        with self._lock:
+            if client_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(client_id, None)
+
+
+# singleton
+tenant_cache = TenantCache(ttl=settings.TENANT_CACHE_TTL)
+
+
+def get_tenant_context(client_id: int, db: Session = Depends(get_main_db)) -> TenantContext:
+    """
+    Dependency для маршрутов /client/{client_id}/...: возвращает организацию с созданной БД или 404;
+    отключённая организация — 403 (с учётом кэша — не позже чем через TENANT_CACHE_TTL после отключения).
+    """
+    tenant = tenant_cache.get(db, client_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Клиентская организация не найдена")
+    if not tenant.is_active:
+        raise HTTPException(status_code=403, detail="Клиентская организация отключена")
+    if not tenant.database_name:
+        raise HTTPException(status_code=404, detail="База клиента не найдена")
+    return tenant
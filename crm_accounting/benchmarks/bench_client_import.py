@@ -0,0 +1,126 @@
+# benchmarks/bench_client_import.py
+"""
+Импорт клиентов из файла (app.services.client_import) на N строк: время, строк/с и рост
+пикового RSS процесса между прогонами (при потоковом чтении он не должен расти с размером файла).
+
+Файл генерируется заранее: корректные ИНН/КПП/ОГРН, ~1% повторов ИНН и ~0,5% строк с неверным ИНН.
+Клиенты добавляются в указанную клиентскую БД — лучше отдельную организацию из benchmarks.seed.
+
+Запуск из каталога crm_accounting:
+    DB_BACKEND=sqlite python -m benchmarks.bench_client_import --database client_1 --rows 10000,100000
+    DB_BACKEND=sqlite python -m benchmarks.bench_client_import --database client_1 --rows 20000 --format xlsx
+"""
+import argparse
+import csv
+import os
+import random
+import resource
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+from app.services.client_import import ClientImport, is_valid_inn
+from benchmarks.common import save_results
+
+HEADER = ["ИНН", "КПП", "ОГРН", "Наименование", "Полное наименование", "Адрес", "Email", "Телефон"]
+
+
+def _inn(rnd: random.Random) -> str:
+    body = f"{rnd.randint(1, 99):02d}{rnd.randint(0, 9999999):07d}"
+    return next(body + d for d in "0123456789" if is_valid_inn(body + d))
+
+
+def _ogrn(rnd: random.Random) -> str:
+    body = f"1{rnd.randint(0, 10 ** 11 - 1):011d}"
+    return body + str(int(body) % 11 % 10)
+
+
+def _rows(count: int, rnd: random.Random):
+    recent: list[str] = []
+    for i in range(count):
+        roll = rnd.random()
+        if roll < 0.01 and recent:
+            inn = rnd.choice(recent)
+        elif roll < 0.015:
+            inn = "1234567890"  # неверная контрольная цифра
+        else:
+            inn = _inn(rnd)
+            recent = (recent + [inn])[-1000:]
+        yield [
+            inn, f"{inn[:4]}01001", _ogrn(rnd), f"ООО «Импорт {i}»",
+            f"Общество с ограниченной ответственностью «Импорт {i}»",
+            f"г. Москва, ул. Тестовая, д. {i % 300 + 1}", f"client{i}@example.com", f"+7 900 {i % 10 ** 7:07d}",
+        ]
+
+
+def _write_file(path: str, fmt: str, count: int, rnd: random.Random) -> None:
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(HEADER)
+            writer.writerows(_rows(count, rnd))
+        return
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    for row in _rows(count, rnd):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _max_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: КБ
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", required=True, help="клиентская БД, например client_1")
+    parser.add_argument("--rows", default="10000,100000", help="размеры файлов через запятую")
+    parser.add_argument("--format", default="csv", choices=("csv", "xlsx"))
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="по умолчанию — новые ИНН на каждый запуск")
+    parser.add_argument("--output", default=None, help="путь JSON с результатами (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed if args.seed is not None else time.time_ns())
+    runs = {}
+    for count in [int(n) for n in args.rows.split(",")]:
+        fd, path = tempfile.mkstemp(suffix=f".{args.format}")
+        os.close(fd)
+        try:
+            _write_file(path, args.format, count, rnd)
+            rss_before = _max_rss_mb()
+            started = time.perf_counter()
+            with open(path, "rb") as f:
+                job = ClientImport(args.database, f, path, batch_size=args.batch_size)
+                summary = None
+                for item in job.run():
+                    summary = item.get("summary", summary)
+            elapsed = time.perf_counter() - started
+            runs[count] = {
+                "file_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+                "elapsed_sec": round(elapsed, 2),
+                "rows_per_sec": round(count / elapsed),
+                "inserted": summary["inserted"],
+                "duplicates": summary["duplicates"],
+                "invalid": summary["invalid"],
+                "max_rss_mb": _max_rss_mb(),
+                "rss_growth_mb": round(_max_rss_mb() - rss_before, 1),
+            }
+        finally:
+            os.remove(path)
+
+    path = save_results("client_import", {"config": vars(args), "runs": runs}, args.output)
+    print(f"БД: {args.database}, формат: {args.format}")
+    print(f"{'строк':>8s} {'МБ':>6s} {'сек':>7s} {'строк/с':>8s} {'добавлено':>10s} {'дублей':>7s} {'ошибок':>7s} {'RSS, МБ':>8s} {'рост':>6s}")
+    for count, r in runs.items():
+        print(
+            f"{count:8d} {r['file_mb']:6.1f} {r['elapsed_sec']:7.2f} {r['rows_per_sec']:8d} {r['inserted']:10d} "
+            f"{r['duplicates']:7d} {r['invalid']:7d} {r['max_rss_mb']:8.1f} {r['rss_growth_mb']:6.1f}"
+        )
+    print(f"Результаты: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/bench_db_offload.py
+"""
+Конкурентные запросы страниц портала одним воркером на реальной клиентской БД:
+  inline  — загрузчик страницы (_load_clients, _load_calendar) вызывается прямо в async-обработчике (как было раньше);
+  offload — тот же загрузчик уходит в пул потоков через app.core.db_executor.run_db (как в маршрутах сейчас).
+
+Кроме времени и req/s меряется задержка event loop: фоновая задача каждые 5 мс засыпает
+и отмечает, насколько позже проснулась, — столько же ждали бы остальные запросы воркера.
+Сетевая задержка SQL Server добавляется к каждому SQL-запросу (--latency-ms, событие
+before_cursor_execute): pyodbc так же отпускает GIL на время сетевого I/O.
+
+Запуск из каталога crm_accounting (БД — из benchmarks.seed):
+    DB_BACKEND=sqlite python -m benchmarks.seed --tenants 1
+    DB_BACKEND=sqlite python -m benchmarks.bench_db_offload --database client_1 --requests 200 --concurrency 50
+"""
+import argparse
+import time
+
+import anyio
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.db_executor import run_db
+from app.managers.client_db_manager import client_db_manager
+from app.routes.calendar import CalendarWindow, _load_calendar
+from app.routes.client_clients import ClientFilters, _load_clients
+from app.utils.pagination import PageParams
+from benchmarks.common import percentile, save_results, summarize_latencies
+
+LOOP_PROBE_INTERVAL = 0.005
+
+
+def _loaders(database_name: str) -> dict:
+    # параметры — как у страниц без фильтров (значения Query-зависимостей по умолчанию)
+    filters = ClientFilters(q=None, active=None, created_from=None, created_to=None, sort="id", order="desc")
+    params = PageParams(after=None, before=None, limit=settings.PORTAL_PAGE_SIZE)
+    window = CalendarWindow(start_date=None, end_date=None, view="month")
+    return {
+        "clients": lambda: _load_clients(database_name, filters, params),
+        "calendar": lambda: _load_calendar(database_name, window),
+    }
+
+
+def _add_latency(engine, latency: float) -> None:
+    if latency > 0:
+        event.listen(engine, "before_cursor_execute", lambda *args: time.sleep(latency))
+
+
+async def _handler_inline(load) -> None:
+    load()
+
+
+async def _handler_offload(load) -> None:
+    await run_db(load)
+
+
+async def _drive(handler, load, requests: int, concurrency: int) -> dict:
+    semaphore = anyio.Semaphore(concurrency)
+    latencies: list[float] = []
+    loop_lags: list[float] = []
+    errors = 0
+
+    async def probe():
+        while True:
+            started = time.perf_counter()
+            await anyio.sleep(LOOP_PROBE_INTERVAL)
+            loop_lags.append(time.perf_counter() - started - LOOP_PROBE_INTERVAL)
+
+    async def one():
+        nonlocal errors
+        started = time.perf_counter()  # с момента отправки: ожидание в очереди входит в задержку
+        async with semaphore:
+            try:
+                await handler(load)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with anyio.create_task_group() as probe_group:
+        probe_group.start_soon(probe)
+        async with anyio.create_task_group() as tg:
+            for _ in range(requests):
+                tg.start_soon(one)
+        probe_group.cancel_scope.cancel()
+    elapsed = time.perf_counter() - started
+
+    lags = sorted(loop_lags)
+    return {
+        **summarize_latencies(latencies, elapsed, errors),
+        "elapsed_sec": round(elapsed, 3),
+        "loop_lag_p95_ms": round(percentile(lags, 95) * 1000, 2) if lags else None,
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2) if lags else None,
+    }
+
+
+async def main(args) -> None:
+    _add_latency(client_db_manager.get_engine(args.database), args.latency_ms / 1000)
+    loaders = _loaders(args.database)
+    pages = args.pages.split(",")
+
+    runs: dict[str, dict] = {}
+    for page in pages:
+        load = loaders[page]
+        load()  # прогрев: engine, пул соединений, кэш запросов SQLAlchemy
+        for mode, handler in (("inline", _handler_inline), ("offload", _handler_offload)):
+            runs[f"{page}/{mode}"] = await _drive(handler, load, args.requests, args.concurrency)
+
+    path = save_results("db_offload", {"config": vars(args), "runs": runs}, args.output)
+    print(f"БД: {args.database}, запросов: {args.requests}, одновременно: {args.concurrency}, задержка: {args.latency_ms} мс")
+    print(f"{'страница/режим':18s} {'сек':>7s} {'req/s':>7s} {'p50, мс':>8s} {'p95, мс':>8s} {'loop p95':>9s} {'loop max':>9s} {'ошибок':>7s}")
+    for name, r in runs.items():
+        print(
+            f"{name:18s} {r['elapsed_sec']:7.2f} {r['throughput_rps']:7.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+            f"{r['loop_lag_p95_ms']:9.1f} {r['loop_lag_max_ms']:9.1f} {r['errors']:7d}"
+        )
+    for page in pages:
+        inline, offload = runs[f"{page}/inline"], runs[f"{page}/offload"]
+        print(f"{page}: ускорение {inline['elapsed_sec'] / offload['elapsed_sec']:.1f}x")
+    print(f"Результаты: {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", required=True, help="клиентская БД, например client_1")
+    parser.add_argument("--pages", default="clients,calendar", help="через запятую: clients, calendar")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="задержка сети на каждый SQL-запрос")
+    parser.add_argument("--output", default=None, help="путь JSON с результатами (по умолчанию benchmarks/results/)")
+    anyio.run(main, parser.parse_args())
@@ -0,0 +1,110 @@
+# benchmarks/bench_deadlines.py
+"""
+Время разворачивания правил справочника календаря в сроки (app.services.calendar_service):
+  expand  — правила × месяцы периода (NumPy);
+  shift   — перенос сроков с выходных и праздников на рабочий день (business_calendar);
+  cross   — декартово произведение «срок × клиент» и подготовка строк для вставки;
+  insert  — пакетная вставка в calendar_events временной БД SQLite (--no-insert — пропустить).
+
+--refill-database — проверка повторного заполнения на клиентской БД (CalendarService.generate_deadlines
+дважды за год): второй проход не должен добавить ни одного события, иначе код возврата 1.
+
+Запуск из каталога crm_accounting:
+    python -m benchmarks.bench_deadlines --clients 5000 --rules 40 --year 2025
+    DB_BACKEND=sqlite python -m benchmarks.bench_deadlines --no-insert --refill-database client_1 --year 2026
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+
+from app.models.client_template import CalendarEvent, CalendarHandbook, Client, ClientBase
+from app.services.calendar_service import INSERT_BATCH_SIZE, CalendarService, expand_rules
+from app.utils.business_calendar import business_calendar
+from benchmarks.common import save_results
+
+
+def _rules(count: int, rnd: random.Random) -> list[tuple[int, int, int]]:
+    """(id, день, месяц): примерно треть — ежегодные, остальные — ежемесячные; дни 28–31 проверяют перенос на конец месяца."""
+    return [(i, rnd.choice([20, 25, 28, 30, 31]), rnd.choice([0, 0, rnd.randint(1, 12)])) for i in range(1, count + 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--rules", type=int, default=40)
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--no-insert", action="store_true", help="не замерять вставку в БД")
+    parser.add_argument("--refill-database", default=None, help="клиентская БД для проверки повторного заполнения")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="путь JSON с результатами (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    rules = _rules(args.rules, random.Random(args.seed))
+    client_ids = np.arange(1, args.clients + 1, dtype=np.int64)
+    start, end = date(args.year, 1, 1), date(args.year, 12, 31)
+    timings = {}
+
+    t = time.perf_counter()
+    occurrences = expand_rules([r[0] for r in rules], [r[1] for r in rules], [r[2] for r in rules], start, end)
+    timings["expand_ms"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    occurrences.dates = business_calendar.next_working_days(occurrences.dates)
+    timings["shift_ms"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    event_clients = np.tile(client_ids, len(occurrences)).tolist()
+    event_handbooks = np.repeat(occurrences.handbook_ids, len(client_ids)).tolist()
+    event_dates = np.repeat(occurrences.dates, len(client_ids)).astype("datetime64[s]").tolist()
+    rows = [
+        {"client_id": c, "handbook_id": h, "date": d, "title": f"Срок {h}"}
+        for c, h, d in zip(event_clients, event_handbooks, event_dates)
+    ]
+    timings["cross_ms"] = (time.perf_counter() - t) * 1000
+
+    if not args.no_insert:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", future=True)
+            ClientBase.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(Client), [{"id": int(c), "short_name": f"Клиент {c}", "full_name": f"Клиент {c}"} for c in client_ids])
+                conn.execute(insert(CalendarHandbook), [{"id": r[0], "name": f"Срок {r[0]}", "default_day": r[1]} for r in rules])
+            t = time.perf_counter()
+            with engine.begin() as conn:
+                for i in range(0, len(rows), INSERT_BATCH_SIZE):
+                    conn.execute(insert(CalendarEvent), rows[i:i + INSERT_BATCH_SIZE])
+            timings["insert_ms"] = (time.perf_counter() - t) * 1000
+            engine.dispose()
+
+    refill = None
+    if args.refill_database:
+        refill = [CalendarService.generate_deadlines(args.refill_database, start, end) for _ in range(2)]
+
+    timings = {name: round(value, 1) for name, value in timings.items()}
+    path = save_results("deadlines", {
+        "config": vars(args),
+        "occurrences_per_client": len(occurrences),
+        "events": len(rows),
+        "timings": timings,
+        "refill": refill,
+    }, args.output)
+
+    print(f"правил: {len(rules)}, клиентов: {args.clients}, сроков на клиента: {len(occurrences)}, событий: {len(rows)}")
+    for name, value in timings.items():
+        print(f"{name:10s} {value:10.1f}")
+    print(f"Результаты: {path}")
+    if refill:
+        print(f"заполнение {args.refill_database}: добавлено {refill[0]['created']}, повторно — {refill[1]['created']}")
+        if refill[1]["created"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_fanout.py
+"""
+Время запроса по всем клиентским БД (app.services.tenant_fanout) при разном числе
+одновременно опрашиваемых БД: --workers 1,4,16,32.
+
+Задержка сети до SQL Server имитируется ожиданием --latency-ms перед каждым запросом
+(pyodbc так же отпускает GIL на время сетевого I/O). БД — все клиентские БД из основной,
+например созданные benchmarks.seed.
+
+Запуск из каталога crm_accounting:
+    DB_BACKEND=sqlite python -m benchmarks.seed --tenants 50
+    DB_BACKEND=sqlite python -m benchmarks.bench_fanout --workers 1,8,32 --latency-ms 20
+"""
+import argparse
+import time
+
+from app.core.database import SessionLocal
+from app.services.tenant_fanout import ANALYTICS_QUERIES, TenantFanout
+from benchmarks.common import save_results
+
+
+class _LatencyFanout(TenantFanout):
+    def __init__(self, workers: int, timeout: float, latency: float):
+        super().__init__(workers, timeout)
+        self.latency = latency
+
+    def _run_one(self, target, statement):
+        time.sleep(self.latency)
+        return super()._run_one(target, statement)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="expiring-signatures", choices=sorted(ANALYTICS_QUERIES))
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--workers", default="1,4,16,32", help="через запятую")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--output", default=None, help="путь JSON с результатами (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        targets = TenantFanout.active_tenants(db)
+    statement = ANALYTICS_QUERIES[args.query](args.days)
+
+    runs = {}
+    for workers in [int(w) for w in args.workers.split(",")]:
+        fanout = _LatencyFanout(workers, args.timeout, args.latency_ms / 1000)
+        started = time.perf_counter()
+        first = None
+        rows = failed = 0
+        for result in fanout.stream(statement, targets):
+            first = first or time.perf_counter() - started
+            rows += len(result.rows)
+            failed += result.error is not None
+        runs[workers] = {
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+            "first_result_sec": round(first or 0, 3),
+            "rows": rows,
+            "failed": failed,
+        }
+
+    path = save_results("fanout", {"config": vars(args), "databases": len(targets), "runs": runs}, args.output)
+    print(f"БД: {len(targets)}, запрос: {args.query}, задержка: {args.latency_ms} мс")
+    print(f"{'workers':>8s} {'всего, с':>10s} {'первый, с':>10s} {'строк':>8s} {'ошибок':>7s}")
+    for workers, r in runs.items():
+        print(f"{workers:8d} {r['elapsed_sec']:10.3f} {r['first_result_sec']:10.3f} {r['rows']:8d} {r['failed']:7d}")
+    print(f"Результаты: {path}")
+
+
+if __name__ == "__main__":
+    main()
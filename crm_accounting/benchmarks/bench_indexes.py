@@ -0,0 +1,181 @@
+# benchmarks/bench_indexes.py
+"""
+Планы и время запросов «горячего пути» клиентской БД без вторичных индексов и с ними
+(индексы из app/models/client_template.py, миграции 2 и 3).
+
+БД — временный файл SQLite со схемой клиентской БД и синтетическими данными; сравниваются
+EXPLAIN QUERY PLAN (SCAN — полный просмотр таблицы, SEARCH ... USING INDEX — поиск по индексу)
+и медиана времени выполнения каждого запроса. На SQL Server планы будут другими, но выбор
+между полным просмотром и поиском по индексу — тот же.
+
+Запуск из каталога crm_accounting:
+    python -m benchmarks.bench_indexes --clients 5000 --reports-per-client 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.models.client_template import (
+    CalendarEvent,
+    Client,
+    ClientBase,
+    ClientUser,
+    ClientUserClientAccess,
+    DigitalSignature,
+    Report,
+    ReportPeriod,
+    ReportTemplate,
+)
+from benchmarks.common import save_results
+
+STATUSES = ["сдан", "не сдан", "не сдается", "в работе", "подготовлен", "просрочен"]
+
+# индексы, которые сравниваются (индексы по первичным ключам остаются в обоих прогонах)
+SECONDARY_INDEXES = {
+    index.name: index
+    for table in ClientBase.metadata.sorted_tables
+    for index in table.indexes
+    if not index.name.endswith("_id") or len(index.columns) > 1
+}
+
+
+def _queries(now: datetime) -> dict:
+    today = datetime.combine(now.date(), datetime.min.time())
+    month_start = today.replace(day=1)
+    return {
+        "reports_overdue_count": select(func.count(Report.id)).where(Report.status == "просрочен"),
+        "reports_client_status": select(Report.id, Report.period_id).where(Report.client_id == 42, Report.status == "в работе"),
+        "calendar_month_window": select(CalendarEvent.id, CalendarEvent.client_id).where(
+            CalendarEvent.date >= month_start, CalendarEvent.date < month_start + timedelta(days=31)
+        ),
+        "calendar_client_window": select(CalendarEvent.id).where(
+            CalendarEvent.client_id == 42, CalendarEvent.date >= month_start, CalendarEvent.date < month_start + timedelta(days=31)
+        ),
+        "signatures_expiring_30d": select(func.count(DigitalSignature.id)).where(
+            DigitalSignature.end_date >= today, DigitalSignature.end_date <= today + timedelta(days=30)
+        ),
+        "signatures_for_page": select(DigitalSignature.client_id, func.max(DigitalSignature.end_date)).where(
+            DigitalSignature.client_id.in_(range(100, 150))
+        ).group_by(DigitalSignature.client_id),
+        "clients_new_7d": select(func.count(Client.id)).where(Client.created_at >= today - timedelta(days=7)),
+        "clients_inn_prefix": select(Client.id).where(Client.inn.startswith("77012")),
+        "user_login": select(ClientUser.id).where(ClientUser.login == "user1500"),
+        "user_email": select(ClientUser.id).where(ClientUser.email == "user1500@example.com"),
+        "user_client_access": select(ClientUserClientAccess.id).where(
+            ClientUserClientAccess.user_id == 15, ClientUserClientAccess.client_id == 42
+        ),
+    }
+
+
+def fill(engine, clients: int, reports_per_client: int, events_per_client: int, users: int, rnd: random.Random) -> None:
+    now = datetime.now()
+    ClientBase.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ReportTemplate), [{"id": 1, "name": "Шаблон", "is_active": True}])
+        conn.execute(insert(ReportPeriod), [{"id": p, "name": f"Период {p}", "is_active": True} for p in range(1, 13)])
+        conn.execute(insert(Client), [
+            {
+                "id": c,
+                "short_name": f"Клиент {c}",
+                "full_name": f"ООО Клиент {c}",
+                "inn": f"{rnd.randint(10**9, 10**10 - 1)}",
+                "is_active": True,
+                "created_at": now - timedelta(days=rnd.randint(0, 1500)),
+            }
+            for c in range(1, clients + 1)
+        ])
+        conn.execute(insert(Report), [
+            {"client_id": c, "template_id": 1, "period_id": rnd.randint(1, 12), "status": rnd.choice(STATUSES)}
+            for c in range(1, clients + 1)
+            for _ in range(reports_per_client)
+        ])
+        conn.execute(insert(CalendarEvent), [
+            {"client_id": c, "title": "Срок сдачи", "date": now + timedelta(days=rnd.randint(-730, 365))}
+            for c in range(1, clients + 1)
+            for _ in range(events_per_client)
+        ])
+        conn.execute(insert(DigitalSignature), [
+            {"client_id": c, "owner_name": f"Владелец {c}", "end_date": now + timedelta(days=rnd.randint(-1000, 700))}
+            for c in range(1, clients + 1)
+            for _ in range(2)
+        ])
+        conn.execute(insert(ClientUser), [
+            {"id": u, "full_name": f"Пользователь {u}", "email": f"user{u}@example.com", "login": f"user{u}"}
+            for u in range(1, users + 1)
+        ])
+        conn.execute(insert(ClientUserClientAccess), [
+            {"user_id": u, "client_id": rnd.randint(1, clients)}
+            for u in range(1, users + 1)
+            for _ in range(20)
+        ])
+
+
+def _plan(conn, stmt) -> list[str]:
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+
+
+def _timing(conn, stmt, repeat: int) -> float:
+    conn.execute(stmt).all()  # прогрев кэша страниц
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def measure(engine, queries: dict, repeat: int) -> dict:
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        return {name: {"plan": _plan(conn, stmt), "median_ms": _timing(conn, stmt, repeat)} for name, stmt in queries.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--reports-per-client", type=int, default=20)
+    parser.add_argument("--events-per-client", type=int, default=20)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20, help="повторов каждого запроса")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="путь JSON с результатами (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", future=True)
+        fill(engine, args.clients, args.reports_per_client, args.events_per_client, args.users, random.Random(args.seed))
+        queries = _queries(datetime.now())
+
+        with engine.begin() as conn:
+            for index in SECONDARY_INDEXES.values():
+                index.drop(conn, checkfirst=True)
+        before = measure(engine, queries, args.repeat)
+
+        with engine.begin() as conn:
+            for index in SECONDARY_INDEXES.values():
+                index.create(conn, checkfirst=True)
+        after = measure(engine, queries, args.repeat)
+        engine.dispose()
+
+    path = save_results("indexes", {
+        "config": vars(args),
+        "indexes": sorted(SECONDARY_INDEXES),
+        "queries": {name: {"before": before[name], "after": after[name]} for name in queries},
+    }, args.output)
+
+    print(f"{'query':26s} {'без индексов, мс':>17s} {'с индексами, мс':>16s}  план с индексами")
+    for name in queries:
+        b, a = before[name], after[name]
+        print(f"{name:26s} {b['median_ms']:17.3f} {a['median_ms']:16.3f}  {'; '.join(a['plan'])}")
+    print(f"Результаты: {path}")
+
+
+if __name__ == "__main__":
+    main()
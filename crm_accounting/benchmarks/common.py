@@ -0,0 +1,97 @@
+# benchmarks/common.py
+"""
+Общие функции бенчмарков: перцентили, сохранение результатов в JSON и сравнение двух прогонов.
+"""
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(sorted_values: list[float], p: float) -> float | None:
+    """Перцентиль p (0..100) по уже отсортированному списку, с линейной интерполяцией."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize_latencies(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    """Сводка по задержкам (секунды) -> миллисекунды и req/s."""
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2) if v is not None else None  # noqa: E731
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed > 0 else None,
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def save_results(name: str, payload: dict, path: str | None = None) -> str:
+    """
+    Сохраняет результаты прогона в benchmarks/results/<name>-<дата>-<коммит>.json
+    (или в path). Возвращает путь к файлу.
+    """
+    revision = git_revision()
+    document = {
+        "benchmark": name,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **payload,
+    }
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{name}-{stamp}-{revision or 'norev'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_endpoints(baseline: dict, current: dict, metrics=("p50_ms", "p95_ms", "p99_ms", "throughput_rps")) -> list[str]:
+    """
+    Таблица изменений по эндпоинтам между двумя прогонами (секция "endpoints").
+    Для задержек рост — регрессия, для throughput — улучшение.
+    """
+    lines = [f"{'endpoint':28s}" + "".join(f" {m:>26s}" for m in metrics)]
+    base_endpoints = baseline.get("endpoints", {})
+    for name, stats in current.get("endpoints", {}).items():
+        base = base_endpoints.get(name)
+        if not base:
+            continue
+        row = f"{name:28s}"
+        for m in metrics:
+            old, new = base.get(m), stats.get(m)
+            if old in (None, 0) or new is None:
+                row += f" {'-':>26s}"
+                continue
+            delta = (new - old) / old * 100
+            row += f" {f'{old} -> {new} ({delta:+.0f}%)':>26s}"
+        lines.append(row)
+    return lines
@@ -0,0 +1,248 @@
+# benchmarks/load_test.py
+"""
+Нагрузочный тест клиентского портала: конкурентные «пользователи» входят через /client/login
+и открывают страницы своих организаций (дашборд, отчёты, календарь, клиенты).
+Считает p50/p95/p99, среднее и throughput по каждому эндпоинту и в целом; результат — JSON
+в benchmarks/results/ для сравнения между коммитами.
+
+Запуск из каталога crm_accounting (организации создаются заранее, см. benchmarks.seed):
+    DB_BACKEND=sqlite python -m benchmarks.seed --tenants 20
+    DB_BACKEND=sqlite python -m benchmarks.load_test --start-server --concurrency 32 --duration 30
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --compare benchmarks/results/<прошлый>.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.common import compare_endpoints, load_results, save_results, summarize_latencies
+from benchmarks.seed import DEFAULT_MANIFEST
+
+# эндпоинт -> шаблон пути; вес по умолчанию задаётся в --mix
+PAGES = {
+    "dashboard": "/client/{client_id}/dashboard",
+    "reports": "/client/{client_id}/reports",
+    "calendar": "/client/{client_id}/calendar",
+    "clients": "/client/{client_id}/clients",
+}
+DEFAULT_MIX = "login=1,dashboard=4,reports=2,calendar=2,clients=2"
+
+
+class _Recorder:
+    """Задержки и ошибки по эндпоинтам, общие для всех потоков."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.status_codes: dict[str, dict[int, int]] = {}
+
+    def record(self, endpoint: str, elapsed: float, status: int | None) -> None:
+        ok = status is not None and 200 <= status < 400
+        with self._lock:
+            codes = self.status_codes.setdefault(endpoint, {})
+            codes[status or 0] = codes.get(status or 0, 0) + 1
+            if ok:
+                self.latencies.setdefault(endpoint, []).append(elapsed)
+            else:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+class _VirtualUser:
+    """Один поток-«пользователь» с keep-alive соединением к серверу."""
+
+    def __init__(self, base_url: str, tenant: dict, mix: list[tuple[str, int]], recorder: _Recorder, rnd: random.Random):
+        parts = urlsplit(base_url)
+        self._host, self._port = parts.hostname, parts.port or 80
+        self._conn = None
+        self.tenant = tenant
+        self.mix_names = [name for name, _ in mix]
+        self.mix_weights = [weight for _, weight in mix]
+        self.recorder = recorder
+        self.rnd = rnd
+
+    def _request(self, method: str, path: str, body: bytes | None = None, headers: dict | None = None) -> int | None:
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self._host, self._port, timeout=60)
+            try:
+                self._conn.request(method, path, body=body, headers=headers or {})
+                response = self._conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                # сервер закрыл keep-alive соединение — переподключаемся один раз
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    return None
+        return None
+
+    def call(self, endpoint: str) -> None:
+        if endpoint == "login":
+            body = json.dumps({"login": self.tenant["login"], "password": self.tenant["password"]}).encode()
+            args = ("POST", "/client/login", body, {"Content-Type": "application/json"})
+        else:
+            args = ("GET", PAGES[endpoint].format(client_id=self.tenant["client_id"]))
+        started = time.perf_counter()
+        status = self._request(*args)
+        self.recorder.record(endpoint, time.perf_counter() - started, status)
+
+    def run(self, deadline: float, stop: threading.Event) -> None:
+        self.call("login")
+        while not stop.is_set() and time.perf_counter() < deadline:
+            self.call(self.rnd.choices(self.mix_names, self.mix_weights)[0])
+        if self._conn is not None:
+            self._conn.close()
+
+
+def parse_mix(value: str) -> list[tuple[str, int]]:
+    mix = []
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name != "login" and name not in PAGES:
+            raise ValueError(f"Неизвестный эндпоинт в --mix: {name}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def run_load(base_url: str, tenants: list[dict], concurrency: int, duration: float, warmup: float, mix, seed: int) -> dict:
+    """Прогрев warmup секунд (не учитывается), затем duration секунд нагрузки из concurrency потоков."""
+    if warmup > 0:
+        _drive(base_url, tenants, concurrency, warmup, mix, _Recorder(), seed + 1)
+    recorder = _Recorder()
+    elapsed = _drive(base_url, tenants, concurrency, duration, mix, recorder, seed)
+
+    endpoints = {}
+    all_latencies, all_errors = [], 0
+    for name in ["login", *PAGES]:
+        latencies = recorder.latencies.get(name, [])
+        errors = recorder.errors.get(name, 0)
+        if not latencies and not errors:
+            continue
+        endpoints[name] = summarize_latencies(latencies, elapsed, errors)
+        endpoints[name]["status_codes"] = {str(k): v for k, v in sorted(recorder.status_codes.get(name, {}).items())}
+        all_latencies += latencies
+        all_errors += errors
+    return {"elapsed_sec": round(elapsed, 2), "overall": summarize_latencies(all_latencies, elapsed, all_errors), "endpoints": endpoints}
+
+
+def _drive(base_url, tenants, concurrency, duration, mix, recorder, seed) -> float:
+    stop = threading.Event()
+    started = time.perf_counter()
+    deadline = started + duration
+    users = [
+        _VirtualUser(base_url, tenants[i % len(tenants)], mix, recorder, random.Random(seed + i))
+        for i in range(concurrency)
+    ]
+    threads = [threading.Thread(target=u.run, args=(deadline, stop), daemon=True) for u in users]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
+    return time.perf_counter() - started
+
+
+def _wait_for_port(host: str, port: int, timeout: float, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Сервер завершился с кодом {process.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Сервер не поднялся за {timeout} сек.")
+
+
+def start_server(base_url: str, workers: int, log_path: str) -> subprocess.Popen:
+    """Запускает uvicorn с app.main:app в отдельном процессе (окружение — текущее, включая DB_BACKEND)."""
+    parts = urlsplit(base_url)
+    # StaticFiles требует существующий каталог
+    os.makedirs(os.path.join("app", "static"), exist_ok=True)
+    log = open(log_path, "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", parts.hostname, "--port", str(parts.port or 80),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    _wait_for_port(parts.hostname, parts.port or 80, 60, process)
+    return process
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="манифест организаций из benchmarks.seed")
+    parser.add_argument("--tenants", type=int, default=None, help="использовать только первые N организаций")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="сек. измерения")
+    parser.add_argument("--warmup", type=float, default=3.0, help="сек. прогрева (не учитываются)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="веса эндпоинтов, напр. dashboard=4,reports=2")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--start-server", action="store_true", help="поднять uvicorn с app.main:app на время теста")
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--output", default=None, help="путь JSON с результатами (по умолчанию benchmarks/results/)")
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    tenants = manifest["tenants"][: args.tenants] if args.tenants else manifest["tenants"]
+    mix = parse_mix(args.mix)
+
+    server = None
+    if args.start_server:
+        server = start_server(args.base_url, args.server_workers, os.path.join(os.path.dirname(args.manifest), "server.log"))
+    try:
+        results = run_load(args.base_url, tenants, args.concurrency, args.duration, args.warmup, mix, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+
+    config = {
+        "base_url": args.base_url,
+        "tenants": len(tenants),
+        "scale": manifest.get("scale"),
+        "concurrency": args.concurrency,
+        "duration_sec": args.duration,
+        "warmup_sec": args.warmup,
+        "mix": dict(mix),
+        "server_workers": args.server_workers if server is not None else None,
+        "db_backend": os.getenv("DB_BACKEND", "mssql"),
+    }
+    path = save_results("load_test", {"config": config, **results}, args.output)
+
+    print(f"{'endpoint':12s} {'requests':>9s} {'errors':>7s} {'rps':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for name, s in [*results["endpoints"].items(), ("overall", results["overall"])]:
+        print(f"{name:12s} {s['requests']:9d} {s['errors']:7d} {s['throughput_rps'] or 0:8.1f} "
+              f"{s['p50_ms'] or 0:9.1f} {s['p95_ms'] or 0:9.1f} {s['p99_ms'] or 0:9.1f}")
+    print(f"Результаты: {path}")
+
+    if args.compare:
+        print()
+        print("\n".join(compare_endpoints(load_results(args.compare), results)))
+    return 1 if results["overall"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# benchmarks/seed.py
+"""
+Создание N клиентских организаций с синтетическими данными для нагрузочных тестов.
+
+Каждая организация получает БД (через обычный UserService, как при регистрации), пользователя
+для входа и заданное количество клиентов, отчётов, записей справочника и событий календаря, ЭЦП.
+Повторный запуск переиспользует уже созданные организации (по имени bench-tenant-<n>).
+
+Запуск из каталога crm_accounting (удобнее всего на SQLite):
+    DB_BACKEND=sqlite python -m benchmarks.seed --tenants 20 --clients 200 --reports-per-client 8
+Результат — манифест benchmarks/results/tenants.json (id организаций, логины, пароль) для load_test.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+from app.core.database import SessionLocal, check_and_create_tables
+from app.core.security import get_password_hash
+from app.managers.client_db_manager import client_db_manager
+from app.models.client_template import (
+    CalendarEvent,
+    CalendarHandbook,
+    Client,
+    DigitalSignature,
+    Report,
+    ReportPeriod,
+    ReportTemplate,
+)
+from app.models.main_db import ClientOrganization, ClientUser
+from app.services.dashboard_rollup import DashboardRollup
+from app.services.user_service import UserService
+from benchmarks.common import RESULTS_DIR
+
+logger = logging.getLogger(__name__)
+
+TENANT_PREFIX = "bench-tenant-"
+DEFAULT_PASSWORD = "bench-password"
+DEFAULT_MANIFEST = os.path.join(RESULTS_DIR, "tenants.json")
+
+REPORT_TEMPLATES = ["НДС", "УСН", "6-НДФЛ", "РСВ", "Персонифицированные сведения", "Бухгалтерский баланс", "ЕФС-1"]
+REPORT_STATUSES = ["сдан", "не сдан", "не сдается", "в работе"]
+HANDBOOK_ITEMS = [
+    ("Декларация по НДС", 25, None),
+    ("Уплата НДФЛ", 28, None),
+    ("Уведомление об исчисленных налогах", 25, None),
+    ("Декларация по УСН", 25, 4),
+    ("Бухгалтерская отчётность", 31, 3),
+    ("Расчёт по страховым взносам", 25, None),
+    ("6-НДФЛ", 25, None),
+    ("ЕФС-1", 20, 1),
+]
+
+
+def _bulk_insert(session, model, rows: list[dict], chunk: int = 500) -> None:
+    for i in range(0, len(rows), chunk):
+        session.execute(insert(model), rows[i:i + chunk])
+
+
+def fill_tenant(database_name: str, scale: dict, rnd: random.Random) -> dict:
+    """Заполняет клиентскую БД синтетическими данными, если она ещё пустая. Возвращает число строк."""
+    now = datetime.utcnow()
+    with client_db_manager.get_client_session(database_name) as s:
+        if s.query(func.count(Client.id)).scalar():
+            return {}
+
+        _bulk_insert(s, ReportTemplate, [{"name": n, "is_active": True} for n in REPORT_TEMPLATES])
+        periods = []
+        for year in (now.year - 1, now.year):
+            for q in range(4):
+                start = datetime(year, q * 3 + 1, 1)
+                end = (datetime(year + 1, 1, 1) if q == 3 else datetime(year, q * 3 + 4, 1)) - timedelta(days=1)
+                periods.append({"name": f"{q + 1} квартал {year}", "start_date": start, "end_date": end, "is_closed": end < now})
+        _bulk_insert(s, ReportPeriod, periods)
+        _bulk_insert(s, CalendarHandbook, [
+            {"name": name, "default_day": day, "default_month": month, "is_active": True}
+            for name, day, month in (HANDBOOK_ITEMS * (scale["handbook"] // len(HANDBOOK_ITEMS) + 1))[:scale["handbook"]]
+        ])
+
+        clients = []
+        for n in range(1, scale["clients"] + 1):
+            clients.append({
+                "short_name": f"ООО «Клиент {n}»",
+                "full_name": f"Общество с ограниченной ответственностью «Клиент {n}»",
+                "inn": f"{rnd.randrange(10**9, 10**10)}",
+                "kpp": f"{rnd.randrange(10**8, 10**9)}",
+                "email": f"client{n}@example.com",
+                "phone": f"+7 900 {rnd.randrange(1000000, 9999999)}",
+                "is_active": rnd.random() > 0.1,
+                "created_at": now - timedelta(days=rnd.randrange(0, 720)),
+            })
+        _bulk_insert(s, Client, clients)
+        s.flush()
+
+        client_ids = [row[0] for row in s.query(Client.id).all()]
+        template_ids = [row[0] for row in s.query(ReportTemplate.id).all()]
+        period_ids = [row[0] for row in s.query(ReportPeriod.id).all()]
+        handbook_ids = [row[0] for row in s.query(CalendarHandbook.id).all()]
+
+        reports, events, signatures = [], [], []
+        for client_id in client_ids:
+            for _ in range(scale["reports_per_client"]):
+                reports.append({
+                    "client_id": client_id,
+                    "template_id": rnd.choice(template_ids),
+                    "period_id": rnd.choice(period_ids),
+                    "status": rnd.choice(REPORT_STATUSES),
+                    "created_at": now - timedelta(days=rnd.randrange(0, 365)),
+                })
+            for _ in range(scale["events_per_client"]):
+                events.append({
+                    "title": "Срок сдачи",
+                    "date": now + timedelta(days=rnd.randrange(-90, 180)),
+                    "client_id": client_id,
+                    "handbook_id": rnd.choice(handbook_ids) if handbook_ids else None,
+                })
+            if rnd.random() < scale["signature_share"]:
+                start = now - timedelta(days=rnd.randrange(0, 365))
+                signatures.append({
+                    "client_id": client_id,
+                    "owner_name": f"Директор клиента {client_id}",
+                    "certificate_number": f"{rnd.getrandbits(64):016x}",
+                    "start_date": start,
+                    "end_date": start + timedelta(days=365),
+                    "is_active": True,
+                })
+        _bulk_insert(s, Report, reports)
+        _bulk_insert(s, CalendarEvent, events)
+        _bulk_insert(s, DigitalSignature, signatures)
+        s.commit()
+
+    # массовая вставка идёт в обход ORM-обработчиков — счётчики дашборда пересчитываем целиком
+    DashboardRollup.reconcile(database_name)
+    return {"clients": len(clients), "reports": len(reports), "events": len(events), "signatures": len(signatures)}
+
+
+def seed(tenants: int, scale: dict, password: str = DEFAULT_PASSWORD, seed_value: int = 42) -> list[dict]:
+    """Создаёт (или переиспользует) tenants организаций и возвращает манифест для нагрузочного теста."""
+    check_and_create_tables()
+    rnd = random.Random(seed_value)
+    manifest = []
+    with SessionLocal() as db:
+        for n in range(1, tenants + 1):
+            company_name = f"{TENANT_PREFIX}{n}"
+            login = f"bench{n}"
+            org = db.query(ClientOrganization).filter(ClientOrganization.company_name == company_name).first()
+            if org is None:
+                org, _job = UserService.create_client_organization(db, company_name, notes="нагрузочный тест")
+            org_id = org.id
+            if not db.query(ClientUser).filter(ClientUser.login == login).first():
+                UserService.create_client_user(
+                    db, org_id, email=f"{login}@example.com", login=login,
+                    hashed_password=get_password_hash(password), full_name=f"Бухгалтер {n}"
+                )
+            database_name = UserService.provision_client_database(db, org_id)
+
+            started = time.perf_counter()
+            counts = fill_tenant(database_name, scale, rnd)
+            if counts:
+                logger.info(f"{company_name} ({database_name}): {counts}, {time.perf_counter() - started:.1f} сек.")
+            client_db_manager.dispose_engine(database_name)
+            manifest.append({"client_id": org_id, "database_name": database_name, "login": login, "password": password})
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=100, help="клиентов в каждой организации")
+    parser.add_argument("--reports-per-client", type=int, default=8)
+    parser.add_argument("--events-per-client", type=int, default=4)
+    parser.add_argument("--handbook", type=int, default=24, help="записей справочника календаря")
+    parser.add_argument("--signature-share", type=float, default=0.7, help="доля клиентов с ЭЦП")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+    scale = {
+        "clients": args.clients,
+        "reports_per_client": args.reports_per_client,
+        "events_per_client": args.events_per_client,
+        "handbook": args.handbook,
+        "signature_share": args.signature_share,
+    }
+    manifest = seed(args.tenants, scale, password=args.password, seed_value=args.seed)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump({"scale": scale, "tenants": manifest}, f, ensure_ascii=False, indent=2)
+    print(f"Организаций: {len(manifest)}, манифест: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()